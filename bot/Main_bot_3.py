@@ -32,6 +32,7 @@ COPYRIGHT (c) TheHolyOneZ 2025
 # Libs
 
 import string
+import tempfile
 import traceback
 import typing
 import wave
@@ -44,25 +45,34 @@ import emoji
 from typing import Union
 import asyncio
 import copy
+import gzip
+import hashlib
 import io
+import heapq
 import json
 import logging
+import math
 import os
 import platform
 import random
 import re
 import shlex
-import sqlite3
+import shutil
+import sys
 import time
+import urllib.parse
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 import aiohttp
 import discord
 from discord import ButtonStyle, app_commands
 from discord.ext import commands, tasks
 from discord.ui import View, Button, Select, Modal, TextInput
 from dotenv import load_dotenv
-import requests
 import yt_dlp 
 import wget
 import zipfile
@@ -73,11 +83,11 @@ from io import BytesIO
 import colorsys
 from PIL import Image, ImageDraw, ImageFont
 import io 
-from enum import Enum
+from enum import Enum, Flag, auto
 from dataclasses import dataclass
-from anthropic import Anthropic
 import anthropic
 import uuid
+from types import SimpleNamespace
 from googletrans import Translator
 
 # Local Modules (.py)
@@ -103,7 +113,1630 @@ def analyze_emoji_usage(content):
             emoji_count[char] = emoji_count.get(char, 0) + 1
     return emoji_count
 
-class ZygnalBot(commands.Bot):
+class MessageTraits(Flag):
+    NONE = 0
+    GUILD = auto()
+    DM = auto()
+    HUMAN = auto()
+    BOT = auto()
+    PREFIX = auto()
+    MENTIONS = auto()
+    LINKS = auto()
+    ATTACHMENTS = auto()
+
+
+LINK_PATTERN = re.compile(
+    r'https?://|discord(?:app)?\.(?:gg|com/invite|me|io|link|st|media|new)|\.gg/|dsc\.gg|dis\.gd|invite\.(?:gg|ink)',
+    re.IGNORECASE
+)
+
+
+def message_listener(traits=MessageTraits.NONE, background=False):
+    """Marks a cog method as a message handler for the bot's MessageDispatcher.
+
+    The handler is only called for messages that carry every trait in ``traits``.
+    Handlers that wait on slow network calls should set ``background=True`` so they
+    run in their own task instead of holding up the rest of the fan-out.
+    """
+    def decorator(func):
+        func.__dispatch_traits__ = traits
+        func.__dispatch_background__ = background
+        return func
+    return decorator
+
+
+class MessageDispatcher:
+    def __init__(self, bot):
+        self.bot = bot
+        self.handlers = []
+        self.stats = {}
+        self.messages_seen = 0
+
+    def register_cog(self, cog):
+        seen = set()
+        for base in type(cog).__mro__:
+            for attr, value in vars(base).items():
+                if attr in seen or getattr(value, '__dispatch_traits__', None) is None:
+                    continue
+                seen.add(attr)
+                self.handlers.append((
+                    cog,
+                    cog.qualified_name,
+                    getattr(cog, attr),
+                    value.__dispatch_traits__,
+                    value.__dispatch_background__
+                ))
+                self.stats.setdefault(cog.qualified_name, {
+                    "calls": 0, "skipped": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0
+                })
+
+    def unregister_cog(self, cog):
+        self.handlers = [handler for handler in self.handlers if handler[0] is not cog]
+        self.stats.pop(cog.qualified_name, None)
+
+    def classify(self, message):
+        content = message.content or ""
+        traits = MessageTraits.GUILD if message.guild else MessageTraits.DM
+        traits |= MessageTraits.BOT if message.author.bot else MessageTraits.HUMAN
+
+        prefix = self.bot.command_prefix
+        if isinstance(prefix, str) and content.startswith(prefix):
+            traits |= MessageTraits.PREFIX
+        if (message.mentions or message.role_mentions or message.mention_everyone
+                or message.reference or '<@' in content):
+            traits |= MessageTraits.MENTIONS
+        if LINK_PATTERN.search(content):
+            traits |= MessageTraits.LINKS
+        if message.attachments:
+            traits |= MessageTraits.ATTACHMENTS
+        return traits
+
+    async def dispatch(self, message):
+        self.messages_seen += 1
+        traits = self.classify(message)
+        inline = []
+
+        for cog, name, handler, required, background in self.handlers:
+            if traits & required != required:
+                self.stats[name]["skipped"] += 1
+                continue
+            if background:
+                asyncio.create_task(self._run(name, handler, message))
+            else:
+                inline.append((name, handler))
+
+        if inline:
+            asyncio.create_task(self._run_inline(inline, message))
+        return traits
+
+    async def _run_inline(self, handlers, message):
+        for name, handler in handlers:
+            await self._run(name, handler, message)
+
+    async def _run(self, name, handler, message):
+        stats = self.stats.get(name)
+        started = time.perf_counter()
+        try:
+            await handler(message)
+        except Exception as e:
+            if stats:
+                stats["errors"] += 1
+            print(f"Message handler error in {name}: {e}")
+            traceback.print_exc()
+        finally:
+            if stats:
+                elapsed = time.perf_counter() - started
+                stats["calls"] += 1
+                stats["total_time"] += elapsed
+                stats["max_time"] = max(stats["max_time"], elapsed)
+
+
+class PersistenceManager:
+    """Write-behind JSON persistence shared by the cogs.
+
+    Cogs register a file once with a snapshot callable and afterwards only call
+    ``mark_dirty``. Dirty files are written together every ``flush_interval``
+    seconds in a worker thread, through a temp file + rename so a crash never
+    leaves a half-written file behind. ``ZygnalBot.close`` flushes whatever is left.
+
+    In cluster mode several processes share the same files. Stores registered with
+    ``guild_key_depth`` are merged on write: each cluster only replaces the guild
+    keys it owns and keeps everyone else's entries as they are on disk.
+    """
+
+    def __init__(self, flush_interval=30):
+        self.flush_interval = flush_interval
+        self.stores = {}
+        self.dirty = set()
+        self.flush_count = 0
+        self.last_flush = None
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self.owns_guild = None
+
+    def register(self, key, path, snapshot, indent=4, guild_key_depth=0):
+        self.stores[key] = {"path": path, "snapshot": snapshot, "indent": indent, "guild_key_depth": guild_key_depth}
+
+    def mark_dirty(self, key):
+        if key in self.stores:
+            self.dirty.add(key)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self, keys=None):
+        async with self._flush_lock:
+            pending = set(self.dirty) if keys is None else self.dirty & set(keys)
+            for key in pending:
+                self.dirty.discard(key)
+                store = self.stores[key]
+                try:
+                    # Snapshots are live cog state, so they are serialized here on the loop and only the file I/O runs in the thread
+                    text = json.dumps(store["snapshot"](), indent=store["indent"])
+                    if store["guild_key_depth"] and self.owns_guild is not None:
+                        await asyncio.to_thread(self._write_partitioned, store["path"], json.loads(text), store["indent"], store["guild_key_depth"])
+                    else:
+                        await asyncio.to_thread(self._write_atomic, store["path"], text)
+                    self.flush_count += 1
+                except Exception as e:
+                    self.dirty.add(key)
+                    print(f"Failed to persist {store['path']}: {e}")
+            self.last_flush = time.time()
+
+    @staticmethod
+    def _write_atomic(path, text):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _owned(self, key):
+        try:
+            return self.owns_guild(int(key))
+        except (TypeError, ValueError):
+            return True
+
+    def _merge_partition(self, on_disk, ours, depth):
+        if not isinstance(on_disk, dict):
+            on_disk = {}
+        if depth == 1:
+            merged = {key: value for key, value in on_disk.items() if not self._owned(key)}
+            merged.update({str(key): value for key, value in ours.items() if self._owned(key)})
+            return merged
+        merged = dict(on_disk)
+        for key, value in ours.items():
+            merged[str(key)] = self._merge_partition(on_disk.get(str(key)), value, depth - 1) if isinstance(value, dict) else value
+        return merged
+
+    def _write_partitioned(self, path, data, indent, depth):
+        lock_path = f"{path}.lock"
+        deadline = time.time() + 10
+        while True:
+            try:
+                lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    # A cluster that died mid-write leaves its lock behind
+                    if time.time() - os.path.getmtime(lock_path) > 30:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {lock_path}")
+                time.sleep(0.05)
+        try:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    on_disk = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                on_disk = {}
+            self._write_atomic(path, json.dumps(self._merge_partition(on_disk, data, depth), indent=indent))
+        finally:
+            os.close(lock_fd)
+            os.remove(lock_path)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+class SQLitePool:
+    """Pooled aiosqlite connections for one database file.
+
+    SQLite allows a single writer, so writes share one connection behind a lock
+    while reads are spread over a few ``query_only`` connections; with WAL the
+    readers never wait on a long write batch. Every connection gets the same
+    pragma profile and keeps its own prepared-statement cache.
+    """
+
+    PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        # Cluster workers share files; wait for each other's write locks instead of failing
+        'busy_timeout': 5000,
+        'cache_size': -16000,
+        'temp_store': 'MEMORY'
+    }
+
+    def __init__(self, path, readers=2, pragmas=None, statement_cache=256):
+        self.path = path
+        self.reader_count = readers
+        self.pragmas = {**self.PRAGMAS, **(pragmas or {})}
+        self.statement_cache = statement_cache
+        self.writer = None
+        self.readers = asyncio.Queue()
+        self.write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+        self.stats = {'reads': 0, 'writes': 0, 'migrations': 0, 'imported_rows': 0}
+
+    async def _connect(self, query_only=False):
+        conn = await aiosqlite.connect(self.path, cached_statements=self.statement_cache)
+        for name, value in self.pragmas.items():
+            await conn.execute(f'PRAGMA {name}={value}')
+        if query_only:
+            await conn.execute('PRAGMA query_only=ON')
+        return conn
+
+    async def open(self):
+        if self.writer is not None:
+            return self.writer
+        async with self._open_lock:
+            if self.writer is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                writer = await self._connect()
+                for _ in range(self.reader_count):
+                    self.readers.put_nowait(await self._connect(query_only=True))
+                self.writer = writer
+        return self.writer
+
+    @asynccontextmanager
+    async def read(self):
+        await self.open()
+        if not self.reader_count:
+            yield self.writer
+            return
+        conn = await self.readers.get()
+        self.stats['reads'] += 1
+        try:
+            yield conn
+        finally:
+            self.readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def transaction(self):
+        writer = await self.open()
+        async with self.write_lock:
+            self.stats['writes'] += 1
+            try:
+                yield writer
+                await writer.commit()
+            except BaseException:
+                await writer.rollback()
+                raise
+
+    async def fetchone(self, sql, params=()):
+        async with self.read() as conn, conn.execute(sql, params) as cursor:
+            return await cursor.fetchone()
+
+    async def fetchall(self, sql, params=()):
+        async with self.read() as conn, conn.execute(sql, params) as cursor:
+            return await cursor.fetchall()
+
+    async def execute(self, sql, params=()):
+        async with self.transaction() as conn:
+            cursor = await conn.execute(sql, params)
+            return cursor.rowcount
+
+    async def executemany(self, sql, rows):
+        async with self.transaction() as conn:
+            await conn.executemany(sql, rows)
+
+    async def migrate(self, component, steps):
+        """Apply the ``steps`` of ``component`` that this file hasn't seen yet.
+
+        A step is a SQL string, a list of SQL strings, or an async callable taking
+        the writer connection. Steps are numbered by position, so new schema
+        changes must be appended, never inserted.
+        """
+        async with self.transaction() as conn:
+            await conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    component TEXT,
+                    version INTEGER,
+                    applied_at REAL,
+                    PRIMARY KEY (component, version)
+                )
+            ''')
+            async with conn.execute('SELECT COALESCE(MAX(version), 0) FROM schema_migrations WHERE component = ?', (component,)) as cursor:
+                current = (await cursor.fetchone())[0]
+            for version, step in enumerate(steps, 1):
+                if version <= current:
+                    continue
+                if callable(step):
+                    await step(conn)
+                else:
+                    for statement in ([step] if isinstance(step, str) else step):
+                        await conn.execute(statement)
+                await conn.execute('INSERT INTO schema_migrations VALUES (?, ?, ?)', (component, version, time.time()))
+                self.stats['migrations'] += 1
+        return len(steps)
+
+    async def import_legacy(self, component, source, to_rows, sql):
+        """Bulk-load a cog's legacy JSON store once.
+
+        ``source`` is a JSON path or already-loaded data; ``to_rows`` turns it into
+        parameter tuples for ``sql``. The import is recorded in ``legacy_imports``
+        and is skipped on every later start.
+        """
+        async with self.transaction() as conn:
+            await conn.execute('CREATE TABLE IF NOT EXISTS legacy_imports (component TEXT PRIMARY KEY, imported_at TEXT, row_count INTEGER)')
+            async with conn.execute('SELECT 1 FROM legacy_imports WHERE component = ?', (component,)) as cursor:
+                if await cursor.fetchone():
+                    return 0
+
+        if isinstance(source, str):
+            def load():
+                try:
+                    with open(source, 'r', encoding='utf-8') as f:
+                        return json.load(f)
+                except (FileNotFoundError, json.JSONDecodeError):
+                    return {}
+            source = await asyncio.to_thread(load)
+        rows = list(to_rows(source or {}))
+
+        async with self.transaction() as conn:
+            await conn.executemany(sql, rows)
+            await conn.execute('INSERT OR REPLACE INTO legacy_imports VALUES (?, ?, ?)', (component, datetime.now().isoformat(), len(rows)))
+        self.stats['imported_rows'] += len(rows)
+        if rows:
+            print(f"Imported {len(rows)} legacy {component} rows into {self.path}")
+        return len(rows)
+
+    async def close(self):
+        if self.writer is None:
+            return
+        async with self.write_lock:
+            try:
+                await self.writer.commit()
+                await self.writer.execute('PRAGMA optimize')
+            except Exception as e:
+                print(f"Error optimizing {self.path}: {e}")
+            while not self.readers.empty():
+                await self.readers.get_nowait().close()
+            await self.writer.close()
+            self.writer = None
+
+
+class DatabaseRegistry:
+    # One pool per database file, shared by every cog that uses it (bot.databases)
+    def __init__(self):
+        self.pools = {}
+
+    def get(self, path, **options):
+        pool = self.pools.get(path)
+        if pool is None:
+            pool = self.pools[path] = SQLitePool(path, **options)
+        return pool
+
+    async def close(self):
+        for pool in self.pools.values():
+            try:
+                await pool.close()
+            except Exception as e:
+                print(f"Error closing {pool.path}: {e}")
+
+class HTTPClient:
+    """Bot-wide aiohttp client (bot.http_client) shared by every cog.
+
+    One pooled, keep-alive connector replaces the per-call ClientSession, so
+    repeated requests to a host skip the TCP/TLS handshake. The connector caps
+    concurrent connections overall and per host. Idempotent requests are retried
+    with exponential backoff on connection errors, 429 and 5xx. Latency is
+    tracked per host for ``!httpstats``.
+    """
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    IDEMPOTENT = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+    def __init__(self, limit=100, limit_per_host=10, timeout=30, retries=2, backoff=0.5):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+        self.metrics = {}
+
+    @property
+    def session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=30
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def _record(self, host, elapsed, error=False, retried=False):
+        stats = self.metrics.get(host)
+        if stats is None:
+            stats = self.metrics[host] = {'requests': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0}
+        if retried:
+            stats['retries'] += 1
+            return
+        stats['requests'] += 1
+        stats['errors'] += error
+        stats['total_ms'] += elapsed * 1000
+        stats['max_ms'] = max(stats['max_ms'], elapsed * 1000)
+
+    @asynccontextmanager
+    async def request(self, method, url, retries=None, timeout=None, **kwargs):
+        method = method.upper()
+        if retries is None:
+            retries = self.retries if method in self.IDEMPOTENT else 0
+        if timeout is not None and not isinstance(timeout, aiohttp.ClientTimeout):
+            timeout = aiohttp.ClientTimeout(total=timeout)
+        host = urllib.parse.urlsplit(str(url)).hostname or 'unknown'
+
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = await self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    self._record(host, time.perf_counter() - started, error=True)
+                    raise
+                delay = self.backoff * 2 ** attempt
+            else:
+                if response.status not in self.RETRY_STATUSES or attempt >= retries:
+                    break
+                retry_after = response.headers.get('Retry-After', '')
+                delay = float(retry_after) if retry_after.replace('.', '', 1).isdigit() else self.backoff * 2 ** attempt
+                response.release()
+            self._record(host, 0, retried=True)
+            attempt += 1
+            await asyncio.sleep(min(delay, 30))
+
+        try:
+            yield response
+        finally:
+            self._record(host, time.perf_counter() - started, error=response.status >= 400)
+            response.release()
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    async def fetch_bytes(self, url, **kwargs):
+        async with self.get(url, **kwargs) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def fetch_json(self, url, **kwargs):
+        async with self.get(url, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class Scheduler:
+    """Durable timers shared by every cog (bot.scheduler).
+
+    Jobs are rows in ``data/scheduler.db`` mirrored in a min-heap on run time, and
+    a single task sleeps until the earliest one, so there is no polling and a job
+    fires at its exact time. Cogs ``register`` a handler per job kind and
+    ``schedule`` jobs under a stable key; scheduling an existing key replaces it.
+    Pending jobs are reloaded on start and overdue ones fire right away. A row is
+    only deleted once its handler has run, so a crash mid-job retries it.
+    """
+
+    def __init__(self, bot, path='data/scheduler.db', max_sleep=3600):
+        self.bot = bot
+        self.pool = bot.databases.get(path)
+        self.max_sleep = max_sleep
+        self.handlers = {}
+        self.jobs = {}
+        self.heap = []
+        self.seq = 0
+        self.wakeup = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.running = set()
+        self._task = None
+        self.stats = {'scheduled': 0, 'fired': 0, 'failed': 0, 'cancelled': 0, 'max_late_ms': 0.0}
+
+    def register(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    def owns(self, guild_id):
+        if guild_id is None:
+            return self.bot.shard_layout.is_primary
+        return self.bot.shard_layout.owns_guild(guild_id)
+
+    async def load(self):
+        try:
+            await self.pool.migrate('scheduler', [
+                '''CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    run_at REAL NOT NULL,
+                    guild_id INTEGER,
+                    payload TEXT,
+                    created_at REAL
+                )''',
+                'CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_run_at ON scheduled_jobs (run_at)'
+            ])
+            rows = await self.pool.fetchall('SELECT id, kind, run_at, guild_id, payload FROM scheduled_jobs')
+            for key, kind, run_at, guild_id, payload in rows:
+                if self.owns(guild_id):
+                    self._push(key, kind, run_at, guild_id, json.loads(payload or '{}'))
+            if rows:
+                print(f"Scheduler restored {len(self.jobs)} pending jobs")
+        except Exception as e:
+            print(f"Error loading scheduled jobs: {e}")
+        finally:
+            self.ready.set()
+
+    def _push(self, key, kind, run_at, guild_id, payload):
+        self.seq += 1
+        self.jobs[key] = {'kind': kind, 'run_at': run_at, 'guild_id': guild_id, 'payload': payload, 'seq': self.seq}
+        heapq.heappush(self.heap, (run_at, self.seq, key))
+        # Cancelled and replaced jobs leave stale heap entries behind; rebuild once they dominate
+        if len(self.heap) > 2 * len(self.jobs) + 64:
+            self.heap = [(job['run_at'], job['seq'], k) for k, job in self.jobs.items()]
+            heapq.heapify(self.heap)
+        if self.heap[0][2] == key:
+            self.wakeup.set()
+
+    async def schedule(self, key, kind, run_at, payload=None, guild_id=None):
+        if isinstance(run_at, datetime):
+            run_at = run_at.timestamp()
+        payload = payload or {}
+        await self.ready.wait()
+        await self.pool.execute(
+            'INSERT OR REPLACE INTO scheduled_jobs VALUES (?, ?, ?, ?, ?, ?)',
+            (key, kind, run_at, guild_id, json.dumps(payload), time.time())
+        )
+        self._push(key, kind, run_at, guild_id, payload)
+        self.stats['scheduled'] += 1
+
+    async def update(self, key, payload):
+        job = self.jobs.get(key)
+        if job is None:
+            return False
+        job['payload'] = payload
+        await self.pool.execute('UPDATE scheduled_jobs SET payload = ? WHERE id = ?', (json.dumps(payload), key))
+        return True
+
+    async def cancel(self, key):
+        await self.ready.wait()
+        job = self.jobs.pop(key, None)
+        await self.pool.execute('DELETE FROM scheduled_jobs WHERE id = ?', (key,))
+        if job is not None:
+            self.stats['cancelled'] += 1
+        return job is not None
+
+    def get(self, key):
+        return self.jobs.get(key)
+
+    def pending(self, kind):
+        return {key: job for key, job in self.jobs.items() if job['kind'] == kind}
+
+    async def run(self):
+        await self.load()
+        await self.bot.wait_until_ready()
+        while True:
+            now = time.time()
+            while self.heap and self.heap[0][0] <= now:
+                run_at, seq, key = heapq.heappop(self.heap)
+                job = self.jobs.get(key)
+                if job is None or job['seq'] != seq:
+                    continue
+                del self.jobs[key]
+                self.stats['max_late_ms'] = max(self.stats['max_late_ms'], (now - run_at) * 1000)
+                task = asyncio.create_task(self.fire(key, job))
+                self.running.add(task)
+                task.add_done_callback(self.running.discard)
+
+            self.wakeup.clear()
+            delay = self.max_sleep
+            if self.heap:
+                delay = min(delay, max(self.heap[0][0] - time.time(), 0))
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def fire(self, key, job):
+        handler = self.handlers.get(job['kind'])
+        if handler is None:
+            print(f"No handler registered for scheduled job {key} ({job['kind']})")
+            return
+        try:
+            await handler(job['payload'])
+            self.stats['fired'] += 1
+        except Exception as e:
+            self.stats['failed'] += 1
+            print(f"Error running scheduled job {key}: {e}")
+        try:
+            # The handler may have rescheduled the same key; only drop the row that just ran
+            await self.pool.execute('DELETE FROM scheduled_jobs WHERE id = ? AND run_at = ?', (key, job['run_at']))
+        except Exception as e:
+            print(f"Error clearing scheduled job {key}: {e}")
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+
+
+class BulkJobEngine:
+    """Background runner for bulk guild operations (bot.bulk_jobs).
+
+    A job kind supplies ``batches(guild, job)``, an async generator yielding
+    ``(cursor, items)`` that resumes after ``job['cursor']``, and
+    ``apply(guild, job, items)`` returning ``(done, failed, error)``. The engine
+    paces requests per guild under BULK_JOB_RATE so bulk work leaves room in the
+    route buckets for everything else, checkpoints the cursor so running jobs
+    resume after a restart, and keeps one status message edited with progress.
+    Only the latest ``keep_finished`` finished jobs per guild stay in memory, and
+    finished rows older than ``retention`` seconds are deleted.
+    """
+
+    def __init__(self, bot, path='data/bulk_jobs.db', progress_interval=5, max_failures=10, keep_finished=10, retention=7 * 86400):
+        self.bot = bot
+        self.pool = bot.databases.get(path)
+        self.rate = float(os.getenv('BULK_JOB_RATE', '4'))
+        self.concurrency = int(os.getenv('BULK_JOB_CONCURRENCY', '4'))
+        self.progress_interval = progress_interval
+        self.max_failures = max_failures
+        self.keep_finished = keep_finished
+        self.retention = retention
+        self.kinds = {}
+        self.jobs = {}
+        self.tasks = {}
+        self.next_slot = {}
+        self.ready = asyncio.Event()
+        self._task = None
+
+    def register(self, kind, batches, apply, estimate, label):
+        self.kinds[kind] = SimpleNamespace(batches=batches, apply=apply, estimate=estimate, label=label)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.resume())
+
+    async def resume(self):
+        try:
+            await self.pool.migrate('bulk_jobs', [
+                '''CREATE TABLE IF NOT EXISTS bulk_jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    guild_id INTEGER NOT NULL,
+                    params TEXT,
+                    status TEXT,
+                    cursor INTEGER DEFAULT 0,
+                    total INTEGER DEFAULT 0,
+                    done INTEGER DEFAULT 0,
+                    failed INTEGER DEFAULT 0,
+                    error TEXT,
+                    channel_id INTEGER,
+                    message_id INTEGER,
+                    created_at REAL,
+                    updated_at REAL
+                )''',
+                'CREATE INDEX IF NOT EXISTS idx_bulk_jobs_status ON bulk_jobs (status)'
+            ])
+            rows = await self.pool.fetchall("SELECT * FROM bulk_jobs WHERE status = 'running'")
+        except Exception as e:
+            print(f"Error loading bulk jobs: {e}")
+            rows = []
+        finally:
+            self.ready.set()
+
+        await self.bot.wait_until_ready()
+        columns = ('id', 'kind', 'guild_id', 'params', 'status', 'cursor', 'total', 'done', 'failed',
+                   'error', 'channel_id', 'message_id', 'created_at', 'updated_at')
+        for row in rows:
+            job = dict(zip(columns, row))
+            if not self.bot.shard_layout.owns_guild(job['guild_id']):
+                continue
+            job['params'] = json.loads(job['params'] or '{}')
+            self.jobs[job['id']] = job
+            self.launch(job)
+        if rows:
+            print(f"Resumed {len(self.tasks)} bulk jobs")
+
+    async def pace(self, guild_id):
+        # Spread calls for one guild evenly instead of bursting into its rate limit buckets
+        now = time.monotonic()
+        slot = max(self.next_slot.get(guild_id, 0), now)
+        self.next_slot[guild_id] = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def each(self, job, items, action):
+        async def run(item):
+            await self.pace(job['guild_id'])
+            try:
+                await action(item)
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                return e
+        errors = [e for e in await asyncio.gather(*(run(item) for item in items)) if e is not None]
+        return len(items) - len(errors), len(errors), str(errors[-1]) if errors else None
+
+    async def estimate(self, kind, guild, params):
+        items, requests = await self.kinds[kind].estimate(guild, params)
+        return {'items': items, 'requests': requests, 'seconds': requests / self.rate}
+
+    async def submit(self, kind, guild, params, status_channel=None, estimate=True):
+        await self.ready.wait()
+        total = (await self.estimate(kind, guild, params))['items'] if estimate else 0
+        now = time.time()
+        job = {
+            'id': uuid.uuid4().hex[:8], 'kind': kind, 'guild_id': guild.id, 'params': params,
+            'status': 'running', 'cursor': 0, 'total': total, 'done': 0, 'failed': 0,
+            'error': None, 'channel_id': None, 'message_id': None, 'created_at': now, 'updated_at': now
+        }
+        if status_channel is not None:
+            message = await status_channel.send(embed=self.progress_embed(job))
+            job['channel_id'], job['message_id'] = status_channel.id, message.id
+        self.jobs[job['id']] = job
+        await self.checkpoint(job)
+        self.launch(job)
+        return job
+
+    def launch(self, job):
+        self.tasks[job['id']] = asyncio.create_task(self.run(job))
+
+    async def wait(self, job):
+        task = self.tasks.get(job['id'])
+        if task:
+            await asyncio.shield(task)
+        return job
+
+    async def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if not job or job['status'] != 'running':
+            return False
+        job['status'] = 'cancelled'
+        return True
+
+    async def run(self, job):
+        kind = self.kinds.get(job['kind'])
+        guild = self.bot.get_guild(job['guild_id'])
+        last_report = time.monotonic()
+        try:
+            if kind is None or guild is None:
+                raise ValueError("Job kind or server is no longer available")
+            async for cursor, items in kind.batches(guild, job):
+                if job['status'] != 'running':
+                    break
+                done, failed, error = await kind.apply(guild, job, items)
+                job['cursor'] = cursor
+                job['done'] += done
+                job['failed'] += failed
+                if error:
+                    job['error'] = error
+                if not job['done'] and job['failed'] >= self.max_failures:
+                    raise RuntimeError(f"Stopped after {job['failed']} failures: {job['error']}")
+                if time.monotonic() - last_report >= self.progress_interval:
+                    last_report = time.monotonic()
+                    await self.checkpoint(job)
+                    await self.report(job)
+            if job['status'] == 'running':
+                job['status'] = 'done'
+        except asyncio.CancelledError:
+            # Shutdown: keep the job 'running' so it resumes from the last cursor
+            await self.checkpoint(job)
+            raise
+        except Exception as e:
+            job['status'] = 'failed'
+            job['error'] = str(e)
+            print(f"Bulk job {job['id']} ({job['kind']}) failed: {e}")
+        finally:
+            self.tasks.pop(job['id'], None)
+        await self.checkpoint(job)
+        await self.report(job)
+        await self.prune(job['guild_id'])
+
+    async def prune(self, guild_id):
+        # Periodic purges finish a job every few minutes, so old ones must not pile up
+        finished = sorted(
+            (job for job in self.jobs.values() if job['guild_id'] == guild_id and job['status'] != 'running'),
+            key=lambda job: job['updated_at'], reverse=True
+        )
+        for job in finished[self.keep_finished:]:
+            self.jobs.pop(job['id'], None)
+        try:
+            await self.pool.execute(
+                "DELETE FROM bulk_jobs WHERE status != 'running' AND updated_at < ?",
+                (time.time() - self.retention,)
+            )
+        except Exception as e:
+            print(f"Error pruning bulk jobs: {e}")
+
+    async def checkpoint(self, job):
+        job['updated_at'] = time.time()
+        try:
+            await self.pool.execute(
+                'INSERT OR REPLACE INTO bulk_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (job['id'], job['kind'], job['guild_id'], json.dumps(job['params']), job['status'], job['cursor'],
+                 job['total'], job['done'], job['failed'], job['error'], job['channel_id'], job['message_id'],
+                 job['created_at'], job['updated_at'])
+            )
+        except Exception as e:
+            print(f"Error checkpointing bulk job {job['id']}: {e}")
+
+    def progress_embed(self, job):
+        kind = self.kinds.get(job['kind'])
+        processed = job['done'] + job['failed']
+        total = max(job['total'], processed, 1)
+        filled = int(20 * processed / total)
+        colors = {
+            'running': discord.Color.blue(),
+            'done': discord.Color.green(),
+            'cancelled': discord.Color.orange(),
+            'failed': discord.Color.red()
+        }
+        remaining = max(job['total'] - processed, 0) / self.rate
+        embed = EmbedBuilder(
+            f"⚙️ {kind.label if kind else job['kind']}",
+            f"`{'█' * filled}{'░' * (20 - filled)}` {processed}/{job['total']}\n"
+            f"Status: **{job['status']}** | Done: **{job['done']}** | Failed: **{job['failed']}**"
+        ).set_color(colors.get(job['status'], discord.Color.blue()))
+        if job['status'] == 'running':
+            embed.add_field("Remaining", f"~{humanize.naturaldelta(remaining)}")
+        if job['error']:
+            embed.add_field("Last error", job['error'][:1000], inline=False)
+        embed.set_footer(f"Job {job['id']} • !bulkjobs cancel {job['id']}")
+        return embed.build()
+
+    async def report(self, job):
+        if not job['message_id']:
+            return
+        channel = self.bot.get_channel(job['channel_id'])
+        if not channel:
+            return
+        try:
+            await channel.get_partial_message(job['message_id']).edit(embed=self.progress_embed(job))
+        except discord.HTTPException:
+            job['message_id'] = None
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+class HistoryScanner:
+    """Concurrent channel history paging under one request budget (bot.history_scanner).
+
+    Each history page is one API call, so ``history`` fetches page by page and
+    waits for a slot of the global HISTORY_SCAN_RATE budget before each one.
+    ``map`` and ``scan`` work on up to HISTORY_SCAN_CONCURRENCY channels at a
+    time, so a guild-wide scan takes about as long as its busiest channel
+    rather than the sum of all of them.
+    """
+
+    def __init__(self):
+        self.rate = float(os.getenv('HISTORY_SCAN_RATE', '20'))
+        self.concurrency = int(os.getenv('HISTORY_SCAN_CONCURRENCY', '6'))
+        self.next_slot = 0
+        self.stats = {'scans': 0, 'channels': 0, 'pages': 0, 'messages': 0, 'last_rate': 0.0}
+
+    async def acquire(self):
+        now = time.monotonic()
+        slot = max(self.next_slot, now)
+        self.next_slot = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    async def pages(self, channel, limit=None, after=None, before=None, oldest_first=None):
+        if oldest_first is None:
+            oldest_first = after is not None
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = 100 if remaining is None else min(remaining, 100)
+            await self.acquire()
+            page = [message async for message in channel.history(limit=size, after=after, before=before, oldest_first=oldest_first)]
+            self.stats['pages'] += 1
+            self.stats['messages'] += len(page)
+            if page:
+                yield page
+            if len(page) < size:
+                return
+            if remaining is not None:
+                remaining -= len(page)
+            if oldest_first:
+                after = page[-1]
+            else:
+                before = page[-1]
+
+    async def history(self, channel, **kwargs):
+        """Drop-in for ``channel.history`` that pages through the budget."""
+        async for page in self.pages(channel, **kwargs):
+            for message in page:
+                yield message
+
+    async def map(self, channels, func):
+        """Await ``func(channel)`` for every channel, a few at a time.
+
+        Integer results are summed as the message count; channels the bot
+        can't read are skipped and listed in the report.
+        """
+        queue = deque(channels)
+        report = {'channels': len(queue), 'skipped': [], 'messages': 0}
+        started = time.monotonic()
+
+        async def worker():
+            while queue:
+                channel = queue.popleft()
+                try:
+                    result = await func(channel)
+                except (discord.Forbidden, discord.HTTPException) as e:
+                    report['skipped'].append(channel.id)
+                    if not isinstance(e, discord.Forbidden):
+                        print(f"Error scanning history of {channel.id}: {e}")
+                    continue
+                if isinstance(result, int):
+                    report['messages'] += result
+
+        await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(queue)))))
+        report['seconds'] = time.monotonic() - started
+        report['rate'] = report['messages'] / report['seconds'] if report['seconds'] else 0.0
+        self.stats['scans'] += 1
+        self.stats['channels'] += report['channels']
+        self.stats['last_rate'] = report['rate']
+        return report
+
+    async def scan(self, channels, callback, **history):
+        """Stream every channel's history to ``callback(channel, messages)`` page by page."""
+        async def scan_channel(channel):
+            count = 0
+            async for page in self.pages(channel, **history):
+                result = callback(channel, page)
+                if asyncio.iscoroutine(result):
+                    await result
+                count += len(page)
+            return count
+
+        return await self.map(channels, scan_channel)
+
+
+class SlidingWindowCounter:
+    """Memory-bounded sliding-window event counter keyed by (guild, user, action).
+
+    Each key holds a small ring buffer of recent timestamps. Keys are kept in
+    last-hit order so idle keys are evicted once their window has passed, and the
+    total number of keys is capped so memory stays flat regardless of how many
+    users the bot has ever seen.
+    """
+
+    def __init__(self, max_keys=100000, max_events=64, sweep_interval=60):
+        self.max_keys = max_keys
+        self.max_events = max_events
+        self.sweep_interval = sweep_interval
+        self.windows = OrderedDict()
+        self.evictions = 0
+        self._last_sweep = time.monotonic()
+
+    def hit(self, guild_id, user_id, action, window, now=None):
+        now = time.monotonic() if now is None else now
+        key = (guild_id, user_id, action)
+        entry = self.windows.get(key)
+        if entry is None:
+            entry = self.windows[key] = [deque(maxlen=self.max_events), window]
+            if len(self.windows) > self.max_keys:
+                self.windows.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.windows.move_to_end(key)
+            entry[1] = window
+
+        events = entry[0]
+        events.append(now)
+        while events and now - events[0] > window:
+            events.popleft()
+
+        if now - self._last_sweep > self.sweep_interval:
+            self.sweep(now)
+        return len(events)
+
+    def count(self, guild_id, user_id, action, window, now=None):
+        now = time.monotonic() if now is None else now
+        entry = self.windows.get((guild_id, user_id, action))
+        if entry is None:
+            return 0
+        return sum(1 for stamp in entry[0] if now - stamp <= window)
+
+    def last_hit(self, guild_id, user_id, action):
+        entry = self.windows.get((guild_id, user_id, action))
+        return entry[0][-1] if entry and entry[0] else None
+
+    def reset(self, guild_id=None, user_id=None, action=None):
+        for key in [key for key in self.windows
+                    if (guild_id is None or key[0] == guild_id)
+                    and (user_id is None or key[1] == user_id)
+                    and (action is None or key[2] == action)]:
+            del self.windows[key]
+
+    def active_keys(self, guild_id=None, action=None, now=None):
+        now = time.monotonic() if now is None else now
+        return [key for key, (events, window) in self.windows.items()
+                if (guild_id is None or key[0] == guild_id)
+                and (action is None or key[2] == action)
+                and events and now - events[-1] <= window]
+
+    def sweep(self, now=None):
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        while self.windows:
+            key, (events, window) = next(iter(self.windows.items()))
+            if events and now - events[-1] <= window:
+                break
+            self.windows.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self.windows)
+
+
+class BoundedTTLCache:
+    """Size- and age-bounded LRU cache with optional per-group caps.
+
+    Entries expire ``ttl`` seconds after they were stored. When the cache (or a
+    single group, e.g. one guild) is full, the least recently used entry is evicted.
+    Hit/miss/eviction counters are kept for diagnostics.
+    """
+
+    def __init__(self, max_size=10000, ttl=3600, max_per_group=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.max_per_group = max_per_group
+        self.entries = OrderedDict()
+        self.groups = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _remove(self, key):
+        value, expires_at, group = self.entries.pop(key)
+        group_keys = self.groups.get(group)
+        if group_keys is not None:
+            group_keys.pop(key, None)
+            if not group_keys:
+                del self.groups[group]
+        return value
+
+    def _expire_oldest(self, now):
+        while self.entries:
+            key, (value, expires_at, group) = next(iter(self.entries.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def set(self, key, value, group=None):
+        now = time.monotonic()
+        if key in self.entries:
+            self._remove(key)
+        self._expire_oldest(now)
+
+        self.entries[key] = (value, now + self.ttl, group)
+        group_keys = self.groups.setdefault(group, OrderedDict())
+        group_keys[key] = None
+
+        if self.max_per_group and group is not None and len(group_keys) > self.max_per_group:
+            self._remove(next(iter(group_keys)))
+            self.evictions += 1
+        while len(self.entries) > self.max_size:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[1] <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        self.entries.move_to_end(key)
+        self.groups[entry[2]].move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        if key in self.entries:
+            self._remove(key)
+        return value
+
+    def __contains__(self, key):
+        entry = self.entries.get(key)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def group_size(self, group):
+        return len(self.groups.get(group, ()))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "groups": len(self.groups),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class ShardLayout:
+    """Where this process sits in the bot's shard layout.
+
+    ``SHARD_MODE`` picks ``single`` (one plain Bot, the default), ``auto`` (one
+    AutoShardedBot owning every shard) or ``cluster``. In cluster mode the process
+    started by the user is only a launcher: it spawns ``CLUSTER_COUNT`` workers that
+    each own a contiguous range of the ``SHARD_COUNT`` shards.
+    """
+
+    MODES = ("single", "auto", "cluster")
+
+    def __init__(self, mode="single", shard_count=None, cluster_count=1, cluster_id=None):
+        if mode not in self.MODES:
+            print(f"Unknown SHARD_MODE '{mode}', falling back to single")
+            mode = "single"
+        self.mode = mode
+        self.shard_count = shard_count
+        self.cluster_count = max(1, cluster_count)
+        self.cluster_id = cluster_id
+
+    @classmethod
+    def from_env(cls):
+        def env_int(name):
+            value = os.getenv(name, "").split("#")[0].strip()
+            return int(value) if value.isdigit() else None
+
+        return cls(
+            mode=os.getenv("SHARD_MODE", "single").split("#")[0].strip().lower() or "single",
+            shard_count=env_int("SHARD_COUNT"),
+            cluster_count=env_int("CLUSTER_COUNT") or 1,
+            cluster_id=env_int("CLUSTER_ID"),
+        )
+
+    @property
+    def is_sharded(self):
+        return self.mode != "single"
+
+    @property
+    def is_launcher(self):
+        return self.mode == "cluster" and self.cluster_id is None
+
+    @property
+    def is_worker(self):
+        return self.mode == "cluster" and self.cluster_id is not None
+
+    @property
+    def is_primary(self):
+        return not self.cluster_id
+
+    def shard_ranges(self):
+        count = self.shard_count or 1
+        per_cluster, extra = divmod(count, self.cluster_count)
+        ranges, start = [], 0
+        for index in range(self.cluster_count):
+            size = per_cluster + (1 if index < extra else 0)
+            ranges.append(list(range(start, start + size)))
+            start += size
+        return ranges
+
+    @property
+    def shard_ids(self):
+        if not self.is_worker:
+            return None
+        return self.shard_ranges()[self.cluster_id]
+
+    def shard_for(self, guild_id):
+        return (int(guild_id) >> 22) % (self.shard_count or 1)
+
+    def owns_guild(self, guild_id):
+        if not self.is_worker:
+            return True
+        return self.shard_for(guild_id) in self.shard_ids
+
+    def bot_options(self):
+        if self.is_worker:
+            return {"shard_count": self.shard_count, "shard_ids": self.shard_ids}
+        if self.mode == "auto" and self.shard_count:
+            return {"shard_count": self.shard_count}
+        return {}
+
+
+SHARD_LAYOUT = ShardLayout.from_env()
+
+
+class ClusterIPC:
+    """Line-delimited JSON channel between a cluster worker and the launcher.
+
+    Workers register named async handlers. ``request`` fans a call out to every
+    cluster through the launcher and returns ``{cluster_id: result}``. Outside
+    cluster mode (or while disconnected) the call is answered locally, so callers
+    never have to special-case the run mode.
+    """
+
+    def __init__(self, bot, layout, host="127.0.0.1", port=None, secret=None):
+        self.bot = bot
+        self.layout = layout
+        self.host = host
+        self.port = port or int(os.getenv("IPC_PORT", 47321))
+        self.secret = secret or os.getenv("CLUSTER_IPC_SECRET", "")
+        self.handlers = {}
+        self.pending = {}
+        self.writer = None
+        self._task = None
+
+    def register(self, name, handler):
+        self.handlers[name] = handler
+
+    def start(self):
+        if self.layout.is_worker and self._task is None:
+            self._task = asyncio.create_task(self._connect_loop())
+
+    async def _connect_loop(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                self.writer = writer
+                await self._send({"op": "hello", "cluster": self.layout.cluster_id, "secret": self.secret})
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    await self._handle(json.loads(line))
+            except (OSError, ValueError) as e:
+                print(f"Cluster IPC connection error: {e}")
+            finally:
+                self.writer = None
+                for future in self.pending.values():
+                    if not future.done():
+                        future.set_result({})
+                self.pending.clear()
+            await asyncio.sleep(5)
+
+    async def _handle(self, message):
+        op = message.get("op")
+        if op == "call":
+            asyncio.create_task(self._answer(message))
+        elif op == "response":
+            future = self.pending.pop(message.get("id"), None)
+            if future and not future.done():
+                future.set_result({int(cluster): data for cluster, data in message.get("results", {}).items()})
+
+    async def _answer(self, message):
+        data = await self._call_local(message.get("type"), message.get("data"))
+        if self.writer is not None:
+            await self._send({"op": "reply", "id": message["id"], "cluster": self.layout.cluster_id, "data": data})
+
+    async def _call_local(self, name, data):
+        handler = self.handlers.get(name)
+        if handler is None:
+            return None
+        try:
+            return await handler(data)
+        except Exception as e:
+            print(f"Cluster IPC handler '{name}' failed: {e}")
+            return None
+
+    async def _send(self, message):
+        self.writer.write((json.dumps(message) + "\n").encode())
+        await self.writer.drain()
+
+    async def request(self, name, data=None, timeout=5):
+        if self.writer is None:
+            return {self.layout.cluster_id or 0: await self._call_local(name, data)}
+
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            await self._send({"op": "request", "id": request_id, "type": name, "data": data, "timeout": timeout})
+            return await asyncio.wait_for(future, timeout + 1)
+        except (asyncio.TimeoutError, OSError):
+            return {}
+        finally:
+            self.pending.pop(request_id, None)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+class ClusterLauncher:
+    """Spawns and supervises the cluster workers and relays IPC calls between them."""
+
+    def __init__(self, layout, token):
+        self.layout = layout
+        self.token = token
+        self.port = int(os.getenv("IPC_PORT", 47321))
+        self.secret = uuid.uuid4().hex
+        self.processes = {}
+        self.started_at = {}
+        self.backoff = {}
+        self.exited_at = {}
+        self.clients = {}
+        self.calls = {}
+
+    async def resolve_shard_count(self):
+        if self.layout.shard_count:
+            return self.layout.shard_count
+        http_client = HTTPClient()
+        try:
+            data = await http_client.fetch_json(
+                "https://discord.com/api/v10/gateway/bot",
+                headers={"Authorization": f"Bot {self.token}"},
+                timeout=10
+            )
+            shards = data["shards"]
+        except Exception as e:
+            print(f"Could not fetch recommended shard count, using one per cluster: {e}")
+            shards = self.layout.cluster_count
+        finally:
+            await http_client.close()
+        self.layout.shard_count = max(shards, self.layout.cluster_count)
+        return self.layout.shard_count
+
+    def spawn(self, cluster_id):
+        env = dict(os.environ)
+        env.update({
+            "SHARD_MODE": "cluster",
+            "SHARD_COUNT": str(self.layout.shard_count),
+            "CLUSTER_COUNT": str(self.layout.cluster_count),
+            "CLUSTER_ID": str(cluster_id),
+            "IPC_PORT": str(self.port),
+            "CLUSTER_IPC_SECRET": self.secret,
+        })
+        script = os.path.abspath(sys.argv[0])
+        self.processes[cluster_id] = subprocess.Popen([sys.executable, script], env=env, cwd=os.getcwd())
+        self.started_at[cluster_id] = time.time()
+        shard_ids = self.layout.shard_ranges()[cluster_id]
+        print(f"✓ Started cluster {cluster_id} (shards {shard_ids[0]}-{shard_ids[-1]}, pid {self.processes[cluster_id].pid})")
+
+    async def run(self):
+        await self.resolve_shard_count()
+        print(f"Launching {self.layout.cluster_count} clusters for {self.layout.shard_count} shards")
+        server = await asyncio.start_server(self._serve_client, "127.0.0.1", self.port)
+        try:
+            for cluster_id in range(self.layout.cluster_count):
+                self.spawn(cluster_id)
+            await self._supervise()
+        finally:
+            server.close()
+            for process in self.processes.values():
+                if process.poll() is None:
+                    process.terminate()
+            for process in self.processes.values():
+                try:
+                    process.wait(timeout=15)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    async def _supervise(self):
+        while True:
+            await asyncio.sleep(5)
+            for cluster_id, process in list(self.processes.items()):
+                code = process.poll()
+                if code is None:
+                    continue
+                if cluster_id not in self.exited_at:
+                    # Crash loops (bad token, missing intents) back off instead of hammering the gateway
+                    ran_for = time.time() - self.started_at[cluster_id]
+                    self.backoff[cluster_id] = min(300, self.backoff.get(cluster_id, 2.5) * 2) if ran_for < 60 else 5
+                    self.exited_at[cluster_id] = time.time()
+                    print(f"Cluster {cluster_id} exited with code {code}, restarting in {self.backoff[cluster_id]:.0f}s")
+                if time.time() - self.exited_at[cluster_id] >= self.backoff[cluster_id]:
+                    del self.exited_at[cluster_id]
+                    self.spawn(cluster_id)
+
+    async def _serve_client(self, reader, writer):
+        cluster_id = None
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+            if hello.get("op") != "hello" or hello.get("secret") != self.secret:
+                return
+            cluster_id = hello["cluster"]
+            self.clients[cluster_id] = writer
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message.get("op") == "request":
+                    asyncio.create_task(self._fan_out(cluster_id, message))
+                elif message.get("op") == "reply":
+                    call = self.calls.get(message.get("id"))
+                    if call:
+                        results, targets, done = call
+                        results[message.get("cluster")] = message.get("data")
+                        if targets <= set(results):
+                            done.set()
+        except (OSError, ValueError) as e:
+            print(f"Cluster IPC client error: {e}")
+        finally:
+            if cluster_id is not None and self.clients.get(cluster_id) is writer:
+                del self.clients[cluster_id]
+            writer.close()
+
+    async def _fan_out(self, origin, message):
+        results, targets, done = {}, set(self.clients), asyncio.Event()
+        self.calls[message["id"]] = (results, targets, done)
+        call = {"op": "call", "id": message["id"], "type": message.get("type"), "data": message.get("data")}
+        try:
+            for cluster_id in targets:
+                writer = self.clients.get(cluster_id)
+                if writer is not None:
+                    writer.write((json.dumps(call) + "\n").encode())
+            await asyncio.wait_for(done.wait(), message.get("timeout", 5))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self.calls.pop(message["id"], None)
+
+        writer = self.clients.get(origin)
+        if writer is not None:
+            response = {"op": "response", "id": message["id"], "results": {str(k): v for k, v in results.items()}}
+            writer.write((json.dumps(response) + "\n").encode())
+            await writer.drain()
+
+
+class GatewayRecorder:
+    """Records raw gateway dispatches to a JSONL file and replays them locally.
+
+    Recording is enabled with ``GATEWAY_RECORD=<path>``. Replaying is a separate run
+    mode (``GATEWAY_REPLAY=<path>``): the bot never logs in, every Discord HTTP
+    request is refused, and the cogs work on a scratch copy of the state files.
+    The saved payloads are then fed through the connection state's parsers as if
+    the gateway had sent them, so listener changes can be exercised against real
+    traffic without touching real guilds.
+    """
+
+    SKIPPED_EVENTS = {"READY", "RESUMED"}
+
+    def __init__(self, bot, path=None):
+        self.bot = bot
+        self.path = path
+        self.recorded = 0
+        self.blocked_requests = 0
+        self._file = None
+
+    def record(self, raw):
+        if not self.path or not isinstance(raw, str):
+            return
+        payload = json.loads(raw)
+        if payload.get("op") != 0:
+            return
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"ts": time.time(), "t": payload.get("t"), "d": payload.get("d")}) + "\n")
+        self.recorded += 1
+        if self.recorded % 100 == 0:
+            self._file.flush()
+
+    async def offline_request(self, route, **kwargs):
+        self.blocked_requests += 1
+        raise RuntimeError(f"Offline replay, {route.method} {route.path} was not sent")
+
+    async def run_offline(self, path, speed=0.0, guild_id=None):
+        path = os.path.abspath(path)
+        workdir = tempfile.mkdtemp(prefix="zygnal-replay-")
+        for name in os.listdir("."):
+            if name == "data":
+                shutil.copytree(name, os.path.join(workdir, name))
+            elif name.endswith((".json", ".db")):
+                shutil.copy2(name, workdir)
+        sys.path.insert(0, os.getcwd())
+        os.chdir(workdir)
+        print(f"⏯️ Replaying {path} offline in {workdir}")
+
+        self.bot.offline = True
+        self.bot.http.request = self.offline_request
+        async with self.bot:
+            await self.bot.setup_cogs()
+            started = time.perf_counter()
+            counts = await self.replay(path, speed=speed, guild_id=guild_id)
+            elapsed = time.perf_counter() - started
+        print(f"Replayed {sum(counts.values())} events in {elapsed:.2f}s, {self.blocked_requests} Discord requests refused")
+        for name, count in sorted(counts.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {name}: {count}")
+        return counts
+
+    async def replay(self, path, speed=0.0, guild_id=None):
+        if not getattr(self.bot, "offline", False):
+            raise RuntimeError("Gateway replay only runs in offline mode (GATEWAY_REPLAY)")
+        parsers = self.bot._connection.parsers
+        counts = {}
+        previous_ts = None
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                event = json.loads(line)
+                name, data = event.get("t"), event.get("d")
+                if name in self.SKIPPED_EVENTS or name not in parsers:
+                    continue
+                event_guild = data.get("guild_id") if isinstance(data, dict) else None
+                if guild_id and str(event_guild) != str(guild_id):
+                    continue
+                if event_guild and not self.bot.shard_layout.owns_guild(event_guild):
+                    continue
+
+                if speed and previous_ts is not None:
+                    await asyncio.sleep(max(0, event["ts"] - previous_ts) / speed)
+                previous_ts = event.get("ts")
+
+                try:
+                    parsers[name](data)
+                    counts[name] = counts.get(name, 0) + 1
+                except Exception as e:
+                    print(f"Replay of {name} failed: {e}")
+                await asyncio.sleep(0)
+        return counts
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ZygnalBot(commands.AutoShardedBot if SHARD_LAYOUT.is_sharded else commands.Bot):
     def print_banner(self):
         banner = """
     \033[93m
@@ -123,6 +1756,9 @@ class ZygnalBot(commands.Bot):
     def __init__(self):
 
         command_prefix = str(os.getenv('CMD_PREFIX', '!'))
+        record_path = os.getenv('GATEWAY_RECORD', '').split('#')[0].strip()
+        if record_path.lower() == 'none':
+            record_path = None
         
         super().__init__(
 
@@ -133,9 +1769,32 @@ class ZygnalBot(commands.Bot):
                 type=discord.ActivityType.watching,
                 name=str("⚡ Server Protection")
             ),
-            help_command=None
+            help_command=None,
+            enable_debug_events=bool(record_path),
+            **SHARD_LAYOUT.bot_options()
         )
         self.webhook_logger = None
+        self.shard_layout = SHARD_LAYOUT
+        self.ipc = ClusterIPC(self, SHARD_LAYOUT)
+        self.ipc.register("stats", self.local_stats)
+        self.gateway_recorder = GatewayRecorder(self, record_path)
+        self.offline = False
+        self.message_dispatcher = MessageDispatcher(self)
+        self.persistence = PersistenceManager()
+        self.databases = DatabaseRegistry()
+        self.http_client = HTTPClient()
+        self.ai_client = AIClient(self)
+        self.scheduler = Scheduler(self)
+        self.bulk_jobs = BulkJobEngine(self)
+        self.history_scanner = HistoryScanner()
+        self.cog_timings = {}
+        self.lazy_cogs = {}
+        self.lazy_lock = asyncio.Lock()
+        self.startup_seconds = None
+        self.analytics_db = None
+        if SHARD_LAYOUT.is_worker:
+            self.persistence.owns_guild = SHARD_LAYOUT.owns_guild
+        self.rate_windows = SlidingWindowCounter()
         self.ticket_counter = 0
         self.start_time = time.time()
         self.mod_logs = {}
@@ -163,229 +1822,174 @@ class ZygnalBot(commands.Bot):
         self.status_url = "https://zygnalbot.de/status.php"                                 # Website to see Tracking: https://zygnalbot.de/status.html | We are not tracking you only if the bot is online etc. like mee6 shows on what servers its online on.
         self.status_update_task = tasks.loop(minutes=0.1)(self.periodic_status_update)      
 
+    async def add_cog(self, cog, **kwargs):
+        await super().add_cog(cog, **kwargs)
+        self.message_dispatcher.register_cog(cog)
+
+    async def remove_cog(self, name, **kwargs):
+        cog = await super().remove_cog(name, **kwargs)
+        if cog is not None:
+            self.message_dispatcher.unregister_cog(cog)
+        return cog
+
+    async def load_cog(self, cog_class, *args, **kwargs):
+        started = time.perf_counter()
+        cog = cog_class(self, *args, **kwargs)
+        built = time.perf_counter()
+        await self.add_cog(cog)
+        loaded = time.perf_counter()
+        # init is time spent blocking the loop in __init__, load is wall time until add_cog (and cog_load) finished
+        self.cog_timings[cog.qualified_name] = {"init": (built - started) * 1000, "load": (loaded - built) * 1000, "lazy": False}
+        print(f"✓ Loaded {cog.qualified_name} ({(loaded - started) * 1000:.0f}ms)")
+        return cog
+
+    @staticmethod
+    def lazy_eligible(cog_class):
+        # Cogs with listeners, slash commands or their own cog_load have to be live from the start
+        return (
+            not cog_class.__cog_listeners__
+            and not cog_class.__cog_app_commands__
+            and cog_class.cog_load is commands.Cog.cog_load
+            and not any(isinstance(command, (commands.HybridCommand, commands.HybridGroup)) for command in cog_class.__cog_commands__)
+        )
+
+    def add_lazy_cog(self, cog_class):
+        # Only placeholders under the cog's top-level command names are registered, the cog is built on first use
+        self.lazy_cogs[cog_class.__cog_name__] = cog_class
+        for command in cog_class.__cog_commands__:
+            if command.parent is None:
+                self.add_command(commands.Command(
+                    self.lazy_placeholder(cog_class.__cog_name__),
+                    name=command.name,
+                    aliases=list(command.aliases),
+                    help=command.help,
+                    brief=command.brief,
+                    hidden=command.hidden,
+                    ignore_extra=True
+                ))
+
+    def lazy_placeholder(self, name):
+        async def activate(ctx):
+            await self.activate_cog(name)
+            await self.invoke(await self.get_context(ctx.message))
+        return activate
+
+    async def activate_cog(self, name):
+        async with self.lazy_lock:
+            cog_class = self.lazy_cogs.pop(name, None)
+            if cog_class is None:
+                return self.get_cog(name)
+            for command in cog_class.__cog_commands__:
+                if command.parent is None:
+                    self.remove_command(command.name)
+            cog = await self.load_cog(cog_class)
+            self.cog_timings[cog.qualified_name]["lazy"] = True
+            return cog
+
     async def setup_cogs(self):
-        await self.add_cog(CommandErrorHandler(self))
-        print("✓ Loaded CommandErrorHandler")
-        await self.add_cog(ModerationCommands(self))
-        print("✓ Loaded ModerationCommands")
-        await self.add_cog(TicketSystem(self))
-        print("✓ Loaded TicketSystem")
-        await self.add_cog(ServerManagement(self))
-        print("✓ Loaded ServerManagement")
-        await self.add_cog(ServerInfo(self))
-        print("✓ Loaded ServerInfo")
-        await self.add_cog(HelpSystem(self))
-        print("✓ Loaded HelpSystem")
-        await self.add_cog(AutoMod(self))
-        print("✓ Loaded AutoMod")
-        await self.add_cog(WelcomeSystem(self))
-        print("✓ Loaded WelcomeSystem")
-        await self.add_cog(RoleManager(self))
-        print("✓ Loaded RoleManager")
-        await self.add_cog(UserTracker(self))
-        print("✓ Loaded UserTracker")
-        await self.add_cog(BackupSystem(self))
-        print("✓ Loaded BackupSystem")
-        await self.add_cog(Config(self))
-        print("✓ Loaded Config")
-        await self.add_cog(OwnerOnly(self))
-        print("✓ Loaded OwnerOnly")
-        await self.add_cog(MinigamesCog(self))
-        print("✓ Loaded MinigamesCog")
-        await self.add_cog(Analytics(self))
-        print("✓ Loaded Analytics")
-        await self.add_cog(AdvancedInviteTracker(self))
-        print("✓ Loaded AdvancedInviteTracker")
-        await self.add_cog(Snipe(self))
-        print("✓ Loaded Snipe")
-        await self.add_cog(ReminderSystem(self))
-        print("✓ Loaded ReminderSystem")
-        await self.add_cog(MessagePurge(self))
-        print("✓ Loaded MessagePurge")
-        await self.add_cog(CustomLogging(self))
-        print("✓ Loaded CustomLogging")
-        await self.add_cog(LevelingSystem(self))
-        print("✓ Loaded LevelingSystem")
-        await self.add_cog(MuteSystem(self))
-        print("✓ Loaded MuteSystem")
-        await self.add_cog(VerificationSetup(self))
-        print("✓ Loaded VerificationSystem")
-        await self.add_cog(BotVerificationSystem(self))
-        print("✓ Loaded BotVerificationSystem")
-        await self.add_cog(RatingSystem(self))
-        print("✓ Loaded RatingSystem")
-        await self.add_cog(MoodTracker(self))
-        print("✓ Loaded MoodTracker")
-        await self.add_cog(IdeaSystem(self))
-        print("✓ Loaded IdeaSystem")
-        await self.add_cog(MusicPlayer(self))
-        print("✓ Loaded MusicPlayer")
-        await self.add_cog(ChannelManager(self))
-        print("✓ Loaded ChannelManager")
-        await self.add_cog(RoleBackup(self))
-        print("✓ Loaded RoleBackup")
-        # await self.add_cog(AiCommands(self))
-        # print("✓ Loaded AiCommands")
-        await self.add_cog(EnhancedMinigames(self))
-        print("✓ Loaded EnhancedMinigames")
-        await self.add_cog(AFKSystem(self))
-        print("✓ Loaded AFKSystem")
-        await self.add_cog(JSONEmbeds(self))
-        print("✓ Loaded JSONEmbeds")
-        await self.add_cog(TempChannels(self))
-        print("✓ Loaded TempChannels")
-        await self.add_cog(ProfileSystem(self))
-        print("✓ Loaded ProfileSystem")
-        await self.add_cog(WebhookManager(self))
-        print("✓ Loaded WebhookManager")
-        await self.add_cog(CustomVerification(self))
-        print("✓ Loaded CustomVerification")
-        await self.add_cog(ServerAdsHub(self))
-        print("✓ Loaded ServerAdsHub")
-        await self.add_cog(AdvancedUserAnalytics(self))
-        print("✓ Loaded AdvancedUserAnalytics")
-        await self.add_cog(AI_CHAT(self))
-        print("✓ Loaded AI_CHAT")
-        await self.add_cog(BMICalculator(self))
-        print("✓ Loaded BMICalculator")
-        await self.add_cog(MathPhysicsTools(self))
-        print("✓ Loaded MathPhysicsTools")
-        await self.add_cog(TimeTools(self))
-        print("✓ Loaded TimeTools")
-        await self.add_cog(CodingTools(self))
-        print("✓ Loaded CodingTools")
-        await self.add_cog(StudyTools(self))
-        print("✓ Loaded StudyTools")
-        await self.add_cog(URLShortener(self))
-        print("✓ Loaded URLShortener")
-        await self.add_cog(PasswordGenerator(self))
-        print("✓ Loaded PasswordGenerator")
-        await self.add_cog(MorseCodeTools(self))
-        print("✓ Loaded MorseCodeTools")
-        await self.add_cog(ASCIIArtGenerator(self))
-        print("✓ Loaded ASCIIArtGenerator")
-        await self.add_cog(URLStatusChecker(self))
-        print("✓ Loaded URLStatusChecker")
-        await self.add_cog(IPLookupTools(self))
-        print("✓ Loaded IPLookupTools")
-        await self.add_cog(FileSizeConverter(self))
-        print("✓ Loaded FileSizeConverter")
-        await self.add_cog(FileTypeIdentifier(self))
-        print("✓ Loaded FileTypeIdentifier")
-        await self.add_cog(DownloadCalculator(self))
-        print("✓ Loaded DownloadCalculator")
-        await self.add_cog(WordAnalytics(self))
-        print("✓ Loaded WordAnalytics")
-        await self.add_cog(AdvancedRNG(self))
-        print("✓ Loaded AdvancedRNG")
-        await self.add_cog(ChemicalElements(self))
-        print("✓ Loaded ChemicalElements")
-        await self.add_cog(ISBNLookup(self))
-        print("✓ Loaded ISBNLookup")
-        await self.add_cog(CitationGenerator(self))
-        print("✓ Loaded CitationGenerator")
-        await self.add_cog(AdvancedPollSystem(self))
-        print("✓ Loaded AdvancedPollSystem")
-        await self.add_cog(HackerCommands(self))
-        print("✓ Loaded HackerCommands")
-        await self.add_cog(RoastCommands(self))
-        print("✓ Loaded RoastCommands")
-        await self.add_cog(BotSassResponses(self))
-        print("✓ Loaded BotSassResponses")
-        await self.add_cog(AntiGhostPing(self))
-        print("✓ Loaded AntiGhostPing")
-        await self.add_cog(ClaudeAI(self))
-        print("✓ Loaded ClaudeAI")
-        await self.add_cog(Announcements(self))
-        print("✓ Loaded Announcements")
-        await self.add_cog(BeatUpCommands(self))
-        print("✓ Loaded BeatUpCommands")
-        await self.add_cog(ShootingCommands(self))
-        print("✓ Loaded ShootingCommands")
-        await self.add_cog(LoveCommands(self))
-        print("✓ Loaded LoveCommands")
-        await self.add_cog(TeamFightCommands(self))
-        print("✓ Loaded TeamFightCommands")
-        await self.add_cog(BlackjackGame(self))
-        print("✓ Loaded BlackjackGame")
-        await self.add_cog(RiotGamesAPI(self))
-        print("✓ Loaded RiotGamesAPI")
-        await self.add_cog(ClearChannel(self))
-        print ("✓ Loaded ClearChannel Function")
-        await self.add_cog(AntiNukeSystem(self))
-        print("✓ Loaded AntiNukeSystem")
-        await self.add_cog(TranslationSystem(self))
-        print("✓ Loaded TranslationSystem")
-        await self.add_cog(SecurityAudit(self))
-        print("✓ Loaded SecurityAudit")
-        await self.add_cog(Sudo(self))
-        print("✓ Loaded sudo")
-        await self.add_cog(GiveawaySystem(self))
-        print("✓ Loaded GiveawaySystem")
-        await self.add_cog(SocialMediaManager(self))
-        print("✓ Loaded SocialMediaManager | Only Framework")
-        await self.add_cog(BirthdayReminder(self))
-        print("✓ Loaded BirthdayReminder")
-        await self.add_cog(CustomCommands(self))
-        print("✓ Loaded CustomCommands")
-        await self.add_cog(CommandAliases(self))
-        print("✓ Loaded CommandAliases")
-        await self.add_cog(UserNotebook(self))
-        print("✓ Loaded UserNotebook")
-        await self.add_cog(EmotionalSupportCog(self))
-        await bot.add_cog(UpdateChecker(bot))
-        print("✓ Loaded UpdateChecker")
-        await bot.add_cog(CogManager(bot))
-        print("✓ Loaded CogManager")
-        await bot.add_cog(ZSortCommands(bot))
-        print("✓ Loaded ZSortCommands")
-        self.config_manager = ConfigManager(self)  
-        await self.add_cog(ServerConfig(self))
-        print("✓ Loaded ServerConfig | Not Done | in Development")
-        await self.add_cog(CreatorResponseCog(self))
-        await bot.add_cog(AutoConfigLoader(bot))
-        print("✓ AutoConfigLoader")
+        started = time.perf_counter()
+        self.config_manager = ConfigManager(self)
+        eager = [
+            CommandErrorHandler, ModerationCommands, TicketSystem, ServerManagement, ServerInfo, HelpSystem,
+            AutoMod, WelcomeSystem, RoleManager, UserTracker, BackupSystem, Config, OwnerOnly, MinigamesCog,
+            Analytics, AdvancedInviteTracker, Snipe, ReminderSystem, MessagePurge, CustomLogging, LevelingSystem,
+            MuteSystem, VerificationSetup, BotVerificationSystem, RatingSystem, MoodTracker, IdeaSystem, MusicPlayer,
+            ChannelManager, RoleBackup, EnhancedMinigames, AFKSystem, JSONEmbeds, TempChannels, ProfileSystem,
+            WebhookManager, CustomVerification, ServerAdsHub, AdvancedUserAnalytics, AI_CHAT, WordAnalytics,
+            AdvancedPollSystem, RoastCommands, BotSassResponses, AntiGhostPing, ClaudeAI, Announcements,
+            BlackjackGame, ClearChannel, AntiNukeSystem, TranslationSystem, SecurityAudit, Sudo, GiveawaySystem,
+            SocialMediaManager, BirthdayReminder, CustomCommands, CommandAliases, UserNotebook, EmotionalSupportCog,
+            UpdateChecker, CogManager, ZSortCommands, ServerConfig, CreatorResponseCog, AutoConfigLoader, RuleMaker,
+            ExtensionMarketplace
+        ]
+        # Command-only utility and fun cogs, built the first time one of their commands is used
+        lazy = [
+            BMICalculator, MathPhysicsTools, TimeTools, CodingTools, StudyTools, URLShortener, PasswordGenerator,
+            MorseCodeTools, ASCIIArtGenerator, URLStatusChecker, IPLookupTools, FileSizeConverter, FileTypeIdentifier,
+            DownloadCalculator, AdvancedRNG, ChemicalElements, ISBNLookup, CitationGenerator, HackerCommands,
+            BeatUpCommands, ShootingCommands, LoveCommands, TeamFightCommands, RiotGamesAPI
+        ]
+        # await self.load_cog(AiCommands)
+        if os.getenv('LAZY_COGS', 'true').lower() in ('true', '1', 'yes', 'on'):
+            for cog_class in lazy:
+                if self.lazy_eligible(cog_class):
+                    self.add_lazy_cog(cog_class)
+                else:
+                    eager.append(cog_class)
+        else:
+            eager += lazy
+
+        # Constructors still run one after another in list order, only their cog_load I/O overlaps
+        await asyncio.gather(
+            *(self.load_cog(cog_class) for cog_class in eager),
+            self.load_cog(TrollFriend, target_user_id=524385308662562826)
+        )
         await bot.load_extension("extension_loader")
         print("✓ Loaded ExtensionLoader")
-        await self.add_cog(RuleMaker(self))
-        print("✓ Loaded RuleMaker")
-        await self.add_cog(ExtensionMarketplace(bot))
-        print("✓ Loaded Ext. Marketplace")
-        
-        await self.add_cog(TrollFriend(self, target_user_id=524385308662562826))
-        print("All Cogs Loaded!")
+
+        self.startup_seconds = time.perf_counter() - started
+        slowest = sorted(self.cog_timings.items(), key=lambda item: item[1]["init"], reverse=True)[:5]
+        print(f"All Cogs Loaded! {len(self.cog_timings)} cogs in {self.startup_seconds:.2f}s, {len(self.lazy_cogs)} deferred until first use")
+        print("Slowest __init__: " + ", ".join(f"{name} {timing['init']:.0f}ms" for name, timing in slowest))
         print("-------------------------------------------------------")
         print("Waiting for bot to be ready...")
         print("-------------------------------------------------------")
         
     async def setup_hook(self):
+        self.persistence.start()
+        self.ipc.start()
+        self.scheduler.start()
+        self.bulk_jobs.start()
+        self.analytics_db = AnalyticsDatabase(self.databases)
         await self.setup_cogs()
         self.add_view(PersistentVerifyView())    
         self.config_manager = ConfigManager()
-        await bot.tree.sync()
+        if self.shard_layout.is_primary:
+            await self.sync_tree()
                                    
         await self.send_status_update("online")
                                     
+    async def sync_tree(self, path='data/tree_sync.json'):
+        # Syncing is rate limited by Discord, so it only runs when the global command signatures changed
+        commands_data = sorted((command.to_dict() for command in self.tree.get_commands()), key=lambda data: (data.get('type', 1), data['name']))
+        digest = hashlib.sha256(json.dumps([self.application_id, commands_data], sort_keys=True).encode()).hexdigest()
+        try:
+            with open(path, 'r') as f:
+                if json.load(f).get('hash') == digest:
+                    print("✓ Slash commands unchanged, skipping tree sync")
+                    return False
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        synced = await self.tree.sync()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'hash': digest, 'commands': len(synced), 'synced_at': time.time()}, f)
+        print(f"✓ Synced {len(synced)} slash commands")
+        return True
+
     async def send_status_update(self, status):                                         
+        if self.offline or not self.shard_layout.is_primary:
+            return
+        totals = await self.cluster_stats(include_guild_ids=True)
         data = {                                                                        
             "token": self.instance_token,                                               
-            "server_id": [str(g.id) for g in self.guilds],                              
+            "server_id": totals["guild_ids"],                              
             "status": status,                                                           
             "version": ZygnalBot_Version,                                              
             "uptime": time.time() - self.start_time,                                    
-            "servers_count": len(self.guilds),                                         
-            "members_count": sum(g.member_count for g in self.guilds),                  
+            "servers_count": totals["guilds"],                                         
+            "members_count": totals["members"],                  
             "timestamp": datetime.now(timezone.utc).isoformat()                         
         }
         
-        async with aiohttp.ClientSession() as session:                                  
-            try:
-                async with session.post(self.status_url, json=data) as response:                            
+        try:
+            async with self.http_client.post(self.status_url, json=data, timeout=10) as response:                            
 
-                    if response.status != 200:
-                        print(f"Status update failed with code: {response.status}")                             
-            except Exception as e:                                                                  
-                print(f"Failed to send status update: {e}")                             
+                if response.status != 200:
+                    print(f"Status update failed with code: {response.status}")                             
+        except Exception as e:                                                                  
+            print(f"Failed to send status update: {e}")                             
 
     async def on_ready(self):
         self.webhook_logger = WebhookLogger(self)
@@ -413,11 +2017,12 @@ class ZygnalBot(commands.Bot):
                 await self.change_presence(activity=activity)
                 await asyncio.sleep(10)
                 
+            totals = await self.cluster_stats()
             stats_messages = [
                 ("listening", "🎶 Get ZygnalBot → zygnalbot.com"),
-                ("playing", f"⚡ Protecting {len(self.guilds)} servers!"),
+                ("playing", f"⚡ Protecting {totals['guilds']} servers!"),
                 ("listening", "🎤 Join the community → .gg/U8sssc6xbv"),
-                ("watching", f"👀 {sum(g.member_count for g in self.guilds)} members online!"),
+                ("watching", f"👀 {totals['members']} members online!"),
                 ("listening", "❤️ Support ZygnalBot → zygnalbot.com/support.html"), 
             ]
             
@@ -431,13 +2036,43 @@ class ZygnalBot(commands.Bot):
 
     async def periodic_status_update(self):                         
         await self.send_status_update("online")                     
+
+    async def local_stats(self, data=None):
+        stats = {
+            "cluster": self.shard_layout.cluster_id or 0,
+            "shards": sorted(self.shards) if self.shard_layout.is_sharded else [0],
+            "guilds": len(self.guilds),
+            "members": sum(g.member_count or 0 for g in self.guilds),
+            "channels": sum(len(g.channels) for g in self.guilds),
+            "latency": None if math.isnan(self.latency) else round(self.latency * 1000),
+            "uptime": time.time() - self.start_time,
+        }
+        if data and data.get("guild_ids"):
+            stats["guild_ids"] = [str(g.id) for g in self.guilds]
+        return stats
+
+    async def cluster_stats(self, include_guild_ids=False):
+        per_cluster = await self.ipc.request("stats", {"guild_ids": include_guild_ids})
+        results = [stats for stats in per_cluster.values() if stats]
+        totals = {
+            "clusters": per_cluster,
+            "guilds": sum(stats["guilds"] for stats in results),
+            "members": sum(stats["members"] for stats in results),
+            "channels": sum(stats["channels"] for stats in results),
+        }
+        if include_guild_ids:
+            totals["guild_ids"] = [guild_id for stats in results for guild_id in stats.get("guild_ids", [])]
+        return totals
+
+    async def on_socket_raw_receive(self, msg):
+        self.gateway_recorder.record(msg)
+
     async def on_message(self, message):
-        if message.guild:  
-            return      
         if isinstance(message.content, bytes):
             message.content = str(message.content.decode('utf-8'))
         if self.webhook_logger:
             await self.webhook_logger.log_message(message)
+        await self.message_dispatcher.dispatch(message)
         await self.process_commands(message)
 
     async def on_command(self, ctx):
@@ -446,7 +2081,20 @@ class ZygnalBot(commands.Bot):
 
     async def close(self):
         await self.send_status_update("offline")                    
+        await self.persistence.close()
+        await self.scheduler.close()
+        await self.bulk_jobs.close()
+        if self.analytics_db:
+            await self.analytics_db.close()
+        await self.ipc.close()
+        self.gateway_recorder.close()
+        if self.webhook_logger:
+            await self.webhook_logger.close()
         await super().close()  
+        # Cogs flush their last batches while being removed above
+        await self.databases.close()
+        await self.ai_client.close()
+        await self.http_client.close()
                                              
 bot = ZygnalBot()
 
@@ -6333,6 +7981,7 @@ class CommandAliases(commands.Cog):
         self.bot = bot
         self.aliases_file = "data/command_aliases.json"
         self.command_aliases = {}
+        self.bot.persistence.register(self.aliases_file, self.aliases_file, lambda: self.command_aliases, guild_key_depth=1)
         self.load_aliases()
         
     def load_aliases(self):
@@ -6349,8 +7998,7 @@ class CommandAliases(commands.Cog):
             self.save_aliases()
     
     def save_aliases(self):
-        with open(self.aliases_file, 'w') as f:
-            json.dump(self.command_aliases, f, indent=4)
+        self.bot.persistence.mark_dirty(self.aliases_file)
     
     @commands.group(name="alias", aliases=["aliases"], invoke_without_command=True)
     async def alias_group(self, ctx):
@@ -6559,12 +8207,8 @@ class CommandAliases(commands.Cog):
         embed.set_footer(text="ZygnalBot Command Aliases | © TheHolyOneZ")
         await ctx.send(embed=embed)
     
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN | MessageTraits.PREFIX)
     async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
-        if message.guild:  
-            return           
         guild_id = str(message.guild.id)
         
         if guild_id not in self.command_aliases:
@@ -6606,6 +8250,7 @@ class CustomCommands(commands.Cog):
         self.bot = bot
         self.commands_file = "data/custom_commands.json"
         self.custom_commands = {}
+        self.bot.persistence.register(self.commands_file, self.commands_file, lambda: self.custom_commands, guild_key_depth=1)
         self.load_commands()
         
     def load_commands(self):
@@ -6623,8 +8268,7 @@ class CustomCommands(commands.Cog):
             self.save_commands()
     
     def save_commands(self):
-        with open(self.commands_file, 'w') as f:
-            json.dump(self.custom_commands, f, indent=4)
+        self.bot.persistence.mark_dirty(self.commands_file)
     
     @commands.group(name="custom", aliases=["cc"], invoke_without_command=True)
     async def custom_command_group(self, ctx):
@@ -7234,12 +8878,8 @@ class CustomCommands(commands.Cog):
         except asyncio.TimeoutError:
             await ctx.send("⏱️ Command edit timed out.")
     
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN | MessageTraits.PREFIX)
     async def on_message(self, message):
-        if message.author.bot or not message.guild:
-            return
-        if message.guild:  
-            return           
         guild_id = str(message.guild.id)
         
         if guild_id not in self.custom_commands:
@@ -7441,6 +9081,7 @@ class BirthdayReminder(commands.Cog):
         os.makedirs("data", exist_ok=True)
         
         self.load_data()
+        self.bot.scheduler.register('birthdays', self.run_birthday_check)
     
     def load_data(self):
         
@@ -7507,6 +9148,7 @@ class BirthdayReminder(commands.Cog):
             self.birthdays[str(guild_id)][str(user_id)]["year"] = year
         
         self.save_data()
+        await self.schedule_check(guild_id)
     
     async def remove_birthday(self, guild_id: str, user_id: str):
         
@@ -7683,26 +9325,46 @@ class BirthdayReminder(commands.Cog):
                 await interaction.followup.send(f"Error posting embed: {e}", ephemeral=True)
 
     
-    @tasks.loop(hours=24)
-    async def check_birthdays(self):
+    async def schedule_check(self, guild_id, replace=False):
+        # One job per guild at the next local midnight; the job re-arms itself for the day after
+        key = f"birthdays:{guild_id}"
+        if not replace and self.bot.scheduler.get(key):
+            return
+        midnight = (datetime.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        await self.bot.scheduler.schedule(key, 'birthdays', midnight, {"guild_id": str(guild_id)}, guild_id=int(guild_id))
+
+    async def schedule_checks(self):
+        await self.bot.scheduler.ready.wait()
+        for guild_id in list(self.birthdays):
+            if self.bot.scheduler.owns(int(guild_id)):
+                await self.schedule_check(guild_id)
+
+    async def run_birthday_check(self, job):
+        try:
+            await self.check_birthdays(job["guild_id"])
+        finally:
+            await self.schedule_check(job["guild_id"], replace=True)
+
+    async def check_birthdays(self, guild_id):
         today = datetime.now()
         current_month = today.month
         current_day = today.day
         
-        for guild_id, guild_birthdays in self.birthdays.items():
+        guild_birthdays = self.get_guild_birthdays(guild_id)
+        if guild_birthdays:
             config = self.get_guild_config(guild_id)
             
             if not config["enabled"] or not config["announcement_channel"]:
-                continue
+                return
             
             try:
                 guild = self.bot.get_guild(int(guild_id))
                 if not guild:
-                    continue
+                    return
                 
                 channel = guild.get_channel(int(config["announcement_channel"]))
                 if not channel:
-                    continue
+                    return
                 
                 for user_id, birthday_data in guild_birthdays.items():
                     if birthday_data["month"] == current_month and birthday_data["day"] == current_day:
@@ -8519,13 +10181,9 @@ class BirthdayReminder(commands.Cog):
         
         await ctx.send("The customization UI is only available through the setup dashboard. Please use `!birthday_setup` instead.")
     
-    def cog_unload(self):
-        
-        self.check_birthdays.cancel()
-    
     async def cog_load(self):
        
-        self.check_birthdays.start()
+        asyncio.create_task(self.schedule_checks())
 
 from typing import Dict, List, Optional, Union
 
@@ -10285,14 +11943,38 @@ class GiveawayEntryView(discord.ui.View):
             
             giveaway_data["entries"].add(user_id)
             await interaction.response.send_message("You have entered the giveaway! Good luck! 🍀", ephemeral=True)
+            await giveaway_cog.save_entries(message_id)
+            giveaway_cog.entries_changed(message_id)
 
 class GiveawaySystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_giveaways = {}
-        self.giveaway_task = self.bot.loop.create_task(self.check_giveaways())
-        self.entry_update_task = self.bot.loop.create_task(self.update_giveaway_entries())
+        self.entry_updates = {}
+        self.entry_debounce = 5
         self.use_buttons = True  
+        self.bot.scheduler.register('giveaway', self.end_scheduled_giveaway)
+
+    async def cog_load(self):
+        self.bot.add_view(GiveawayEntryView(self.bot))
+        asyncio.create_task(self.restore_giveaways())
+
+    def cog_unload(self):
+        for task in self.entry_updates.values():
+            task.cancel()
+
+    async def restore_giveaways(self):
+        await self.bot.scheduler.ready.wait()
+        for job in self.bot.scheduler.pending('giveaway').values():
+            data = dict(job["payload"])
+            data["entries"] = set(data.get("entries", []))
+            self.active_giveaways[data.pop("message_id")] = data
+
+    def to_payload(self, giveaway_id, data):
+        payload = dict(data)
+        payload["message_id"] = giveaway_id
+        payload["entries"] = list(data.get("entries", ()))
+        return payload
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
@@ -10339,55 +12021,80 @@ class GiveawaySystem(commands.Cog):
        
         channel_select.callback = channel_callback
 
-    async def update_giveaway_entries(self):
-        await self.bot.wait_until_ready()
-        while not self.bot.is_closed():
-            try:
-                for giveaway_id, data in list(self.active_giveaways.items()):
-                    channel = self.bot.get_channel(data["channel_id"])
-                    if not channel:
-                        continue
-                        
-                    try:
-                        message = await channel.fetch_message(giveaway_id)
-                        
-                        if data.get("use_buttons", False):
-                            entry_count = len(data.get("entries", set()))
-                        else:
-                            reactions = message.reactions
-                            if reactions:
-                                entry_count = reactions[0].count - 1  
-                            else:
-                                entry_count = 0
-                        
-                        embed = message.embeds[0]
-                        embed_desc_lines = embed.description.split('\n')
-                        
-                        for i, line in enumerate(embed_desc_lines):
-                            if line.startswith("**Entries:**"):
-                                embed_desc_lines[i] = f"**Entries:** {entry_count}"
-                                break
-                        else:
-                            
-                            embed_desc_lines.insert(-2, f"**Entries:** {entry_count}")
-                        
-                        embed.description = '\n'.join(embed_desc_lines)
-                        
-                        if data.get("use_buttons", False):
-                            await message.edit(embed=embed)
-                        else:
-                            await message.edit(embed=embed)
-                            
-                    except discord.NotFound:
-                        
-                        continue
-                    except Exception as e:
-                        print(f"Error updating giveaway entries: {e}")
-                        
-                await asyncio.sleep(30)  
-            except Exception as e:
-                print(f"Error in entry update task: {e}")
-                await asyncio.sleep(30)
+    async def save_entries(self, giveaway_id):
+        # Button entries live only in memory, so persist each one before the debounced edit
+        data = self.active_giveaways.get(giveaway_id)
+        if not data:
+            return
+        try:
+            await self.bot.scheduler.update(f"giveaway:{giveaway_id}", self.to_payload(giveaway_id, data))
+        except Exception as e:
+            print(f"Error saving giveaway entries: {e}")
+
+    def entries_changed(self, giveaway_id):
+        # Entries arriving within the debounce window collapse into a single edit
+        if giveaway_id in self.active_giveaways and giveaway_id not in self.entry_updates:
+            self.entry_updates[giveaway_id] = asyncio.create_task(self.update_giveaway_entries(giveaway_id))
+
+    async def update_giveaway_entries(self, giveaway_id):
+        try:
+            await asyncio.sleep(self.entry_debounce)
+        finally:
+            self.entry_updates.pop(giveaway_id, None)
+
+        data = self.active_giveaways.get(giveaway_id)
+        if not data:
+            return
+        use_buttons = data.get("use_buttons", False)
+        if use_buttons and len(data.get("entries", ())) == data.get("shown_entries", 0):
+            return
+
+        channel = self.bot.get_channel(data["channel_id"])
+        if not channel:
+            return
+        try:
+            message = await channel.fetch_message(giveaway_id)
+            
+            if use_buttons:
+                entry_count = len(data.get("entries", set()))
+            else:
+                reactions = message.reactions
+                if reactions:
+                    entry_count = reactions[0].count - 1  
+                else:
+                    entry_count = 0
+            if entry_count == data.get("shown_entries", 0):
+                return
+            
+            embed = message.embeds[0]
+            embed_desc_lines = embed.description.split('\n')
+            
+            for i, line in enumerate(embed_desc_lines):
+                if line.startswith("**Entries:**"):
+                    embed_desc_lines[i] = f"**Entries:** {entry_count}"
+                    break
+            else:
+                
+                embed_desc_lines.insert(-2, f"**Entries:** {entry_count}")
+            
+            embed.description = '\n'.join(embed_desc_lines)
+            await message.edit(embed=embed)
+            data["shown_entries"] = entry_count
+                
+        except discord.NotFound:
+            pass
+        except Exception as e:
+            print(f"Error updating giveaway entries: {e}")
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        if payload.message_id in self.active_giveaways and str(payload.emoji) == "🎉" and payload.user_id != self.bot.user.id:
+            self.entries_changed(payload.message_id)
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        if payload.message_id in self.active_giveaways and str(payload.emoji) == "🎉":
+            self.entries_changed(payload.message_id)
 
     @commands.command()
     @commands.has_permissions(administrator=True)
@@ -10443,49 +12150,22 @@ class GiveawaySystem(commands.Cog):
             "use_buttons": use_buttons,
             "entries": set()
         }
+        data = self.active_giveaways[giveaway_msg.id]
+        await self.bot.scheduler.schedule(
+            f"giveaway:{giveaway_msg.id}",
+            'giveaway',
+            data["end_time"],
+            self.to_payload(giveaway_msg.id, data),
+            guild_id=channel.guild.id
+        )
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
     async def gend(self, ctx, message_id: int):
         if message_id in self.active_giveaways:
-            data = self.active_giveaways[message_id]
-            channel = self.bot.get_channel(data["channel_id"])
-            message = await channel.fetch_message(message_id)
-            
-            if data.get("use_buttons", False):
-                
-                user_ids = data.get("entries", set())
-                users = [self.bot.get_user(user_id) for user_id in user_ids if self.bot.get_user(user_id)]
-            else:
-                
-                users = [user async for user in message.reactions[0].users() if not user.bot]
-            
-            if not users:
-                await channel.send("No valid entries for the giveaway!")
-                return
-                
-            winners = random.sample(users, min(data["winners"], len(users)))
-            winner_text = ", ".join(w.mention for w in winners)
-            note_text = f"\n\n📝 **Note:** {data['note']}" if data.get('note') else ""
-            await channel.send(f"🎉 Congratulations {winner_text}! You won: {data['prize']}{note_text}")
-            
-            try:
-                embed = message.embeds[0]
-                embed.description = embed.description.replace("React with 🎉 to enter!", "**GIVEAWAY ENDED**").replace("Click the Enter button below to enter!", "**GIVEAWAY ENDED**")
-                embed.color = discord.Color.red()
-                
-                if data.get("use_buttons", False):
-                
-                    view = discord.ui.View.from_message(message)
-                    for child in view.children:
-                        child.disabled = True
-                    await message.edit(embed=embed, view=view)
-                else:
-                    await message.edit(embed=embed)
-            except:
-                pass
-                
-            del self.active_giveaways[message_id]
+            data = self.active_giveaways.pop(message_id)
+            await self.bot.scheduler.cancel(f"giveaway:{message_id}")
+            await self.end_giveaway(message_id, data)
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
@@ -10518,87 +12198,78 @@ class GiveawaySystem(commands.Cog):
         except Exception as e:
             await ctx.send(f"Error rerolling giveaway: {str(e)}")
 
-    async def check_giveaways(self):
-        await self.bot.wait_until_ready()
-        while not self.bot.is_closed():
+    async def end_scheduled_giveaway(self, payload):
+        giveaway_id = payload["message_id"]
+        data = self.active_giveaways.pop(giveaway_id, None)
+        if data is None:
+            data = dict(payload)
+            data["entries"] = set(data.get("entries", []))
+        await self.end_giveaway(giveaway_id, data)
+
+    async def end_giveaway(self, giveaway_id, data):
+        update = self.entry_updates.pop(giveaway_id, None)
+        if update:
+            update.cancel()
+        channel = self.bot.get_channel(data["channel_id"])
+        if channel:
             try:
-                current_time = time.time()
-                ended_giveaways = []
-                
-                for giveaway_id, data in list(self.active_giveaways.items()):
-                    if current_time >= data["end_time"]:
-                        channel = self.bot.get_channel(data["channel_id"])
-                        if channel:
-                            try:
-                                message = await channel.fetch_message(giveaway_id)
+                message = await channel.fetch_message(giveaway_id)
                                 
-                                users = []
-                                if data.get("use_buttons", False):
+                users = []
+                if data.get("use_buttons", False):
                                    
-                                    user_ids = data.get("entries", set())
-                                    users = [self.bot.get_user(user_id) for user_id in user_ids if self.bot.get_user(user_id)]
-                                else:
+                    user_ids = data.get("entries", set())
+                    users = [self.bot.get_user(user_id) for user_id in user_ids if self.bot.get_user(user_id)]
+                else:
                                     
-                                    try:
+                    try:
                                     
-                                        if message.reactions:
+                        if message.reactions:
                                             
-                                            for reaction in message.reactions:
-                                                if str(reaction.emoji) == "🎉":
+                            for reaction in message.reactions:
+                                if str(reaction.emoji) == "🎉":
                                                     
-                                                    reaction_users = [user async for user in reaction.users() if not user.bot]
-                                                    users = reaction_users
-                                                    break
-                                    except Exception as e:
-                                        print(f"Error getting reactions: {e}")
+                                    reaction_users = [user async for user in reaction.users() if not user.bot]
+                                    users = reaction_users
+                                    break
+                    except Exception as e:
+                        print(f"Error getting reactions: {e}")
                                 
-                                if not users:
-                                    await channel.send("No valid entries for the giveaway!")
-                                else:
+                if not users:
+                    await channel.send("No valid entries for the giveaway!")
+                else:
                                    
-                                    winners = random.sample(users, min(data["winners"], len(users)))
-                                    winner_text = ", ".join(w.mention for w in winners)
-                                    note_text = f"\n\n📝 **Note:** {data['note']}" if data.get('note') else ""
-                                    await channel.send(f"🎉 Congratulations {winner_text}! You won: {data['prize']}{note_text}")
+                    winners = random.sample(users, min(data["winners"], len(users)))
+                    winner_text = ", ".join(w.mention for w in winners)
+                    note_text = f"\n\n📝 **Note:** {data['note']}" if data.get('note') else ""
+                    await channel.send(f"🎉 Congratulations {winner_text}! You won: {data['prize']}{note_text}")
                                 
-                                try:
-                                    embed = message.embeds[0]
+                try:
+                    embed = message.embeds[0]
                                     
-                                    embed.description = embed.description.replace("React with 🎉 to enter!", "**GIVEAWAY ENDED**").replace("Click the Enter button below to enter!", "**GIVEAWAY ENDED**")
-                                    embed.color = discord.Color.red()
+                    embed.description = embed.description.replace("React with 🎉 to enter!", "**GIVEAWAY ENDED**").replace("Click the Enter button below to enter!", "**GIVEAWAY ENDED**")
+                    embed.color = discord.Color.red()
                                     
-                                    if data.get("use_buttons", False):
-                                        try:
-                                            view = discord.ui.View.from_message(message)
-                                            for child in view.children:
-                                                child.disabled = True
-                                            await message.edit(embed=embed, view=view)
-                                        except Exception as e:
-                                            print(f"Error updating view: {e}")
-                                            await message.edit(embed=embed)
-                                    else:
-                                        await message.edit(embed=embed)
-                                except Exception as e:
-                                    print(f"Error updating ended giveaway message: {e}")
+                    if data.get("use_buttons", False):
+                        try:
+                            view = discord.ui.View.from_message(message)
+                            for child in view.children:
+                                child.disabled = True
+                            await message.edit(embed=embed, view=view)
+                        except Exception as e:
+                            print(f"Error updating view: {e}")
+                            await message.edit(embed=embed)
+                    else:
+                        await message.edit(embed=embed)
+                except Exception as e:
+                    print(f"Error updating ended giveaway message: {e}")
                                 
-                                ended_giveaways.append(giveaway_id)
-                            except discord.NotFound:
-                                print(f"Message {giveaway_id} not found, removing giveaway")
-                                ended_giveaways.append(giveaway_id)
-                            except Exception as e:
-                                print(f"Error ending giveaway {giveaway_id}: {e}")
-                                ended_giveaways.append(giveaway_id)
-                        else:
-                            print(f"Channel for giveaway {giveaway_id} not found, removing giveaway")
-                            ended_giveaways.append(giveaway_id)
-                
-                for giveaway_id in ended_giveaways:
-                    self.active_giveaways.pop(giveaway_id, None)
-                
-                await asyncio.sleep(10)  
+            except discord.NotFound:
+                print(f"Message {giveaway_id} not found, removing giveaway")
             except Exception as e:
-                print(f"Error in giveaway check task: {e}")
-                await asyncio.sleep(10)
+                print(f"Error ending giveaway {giveaway_id}: {e}")
+        else:
+            print(f"Channel for giveaway {giveaway_id} not found, removing giveaway")
 
 class Sudo(commands.Cog):
     def __init__(self, bot):
@@ -11033,10 +12704,189 @@ class SecurityAudit(commands.Cog):
         new_index = risk_levels.index(new_risk)
         return risk_levels[max(current_index, new_index)]
 
+@dataclass
+class TranslationResult:
+    text: str
+    src: str
+
+
+class TranslationPipeline:
+    """Cached, micro-batched front end for the auto-translate channels.
+
+    Results are cached per (text, target) in an LRU+TTL cache. Concurrent requests
+    for the same pair share one lookup. Messages arriving within ``batch_window``
+    of each other for the same target language go upstream as one newline-joined
+    call and are split back apart, or translated one by one if the line count
+    doesn't survive. Only messages whose source language ``guess_language`` is
+    sure of are batched, one batch per source language, so every cached result
+    keeps its own message's source; the rest go upstream on their own.
+    ``translator`` is anything with an async ``translate(text, dest=...)``
+    returning ``.text`` and ``.src`` (googletrans, or a local stub).
+    """
+
+    # Script ranges that identify a language on their own
+    SCRIPTS = (
+        ('ja', re.compile(r'[぀-ヿ]')),
+        ('ko', re.compile(r'[가-힯ᄀ-ᇿ]')),
+        ('zh-cn', re.compile(r'[一-鿿]')),
+        ('ru', re.compile(r'[Ѐ-ӿ]')),
+        ('ar', re.compile(r'[؀-ۿ]')),
+        ('hi', re.compile(r'[ऀ-ॿ]'))
+    )
+    # Function words for the Latin-script languages the UI offers
+    STOPWORDS = {
+        'en': {'the', 'and', 'is', 'are', 'you', 'this', 'that', 'what', 'with', 'have', 'not', 'for', 'was', 'it', 'i', 'my', 'to', 'of'},
+        'de': {'der', 'die', 'das', 'und', 'ist', 'nicht', 'ich', 'du', 'ein', 'eine', 'mit', 'auf', 'wie', 'was', 'aber', 'auch', 'es', 'sie'},
+        'fr': {'le', 'la', 'les', 'et', 'est', 'je', 'tu', 'un', 'une', 'des', 'pas', 'que', 'pour', 'avec', 'sur', 'dans', 'il', 'ce'},
+        'es': {'el', 'la', 'los', 'las', 'y', 'es', 'yo', 'que', 'un', 'una', 'por', 'para', 'con', 'no', 'pero', 'como', 'del', 'muy'},
+        'it': {'il', 'lo', 'la', 'gli', 'e', 'che', 'non', 'sono', 'un', 'una', 'per', 'con', 'mi', 'ma', 'come', 'del', 'della', 'anche'},
+        'pt': {'o', 'os', 'as', 'e', 'que', 'não', 'um', 'uma', 'para', 'com', 'eu', 'você', 'mas', 'como', 'do', 'da', 'muito', 'está'},
+        'nl': {'de', 'het', 'een', 'en', 'is', 'ik', 'je', 'niet', 'dat', 'van', 'met', 'voor', 'maar', 'ook', 'wat', 'zijn', 'op', 'er'},
+        'tr': {'bir', 've', 'bu', 'ne', 'için', 'ben', 'sen', 'değil', 'çok', 'ama', 'gibi', 'var', 'yok', 'mi', 'da', 'de', 'o', 'ile'},
+        'vi': {'là', 'và', 'của', 'không', 'có', 'tôi', 'bạn', 'này', 'được', 'một', 'những', 'cho', 'với', 'người', 'đã', 'rất', 'các', 'thì'}
+    }
+    NOISE = re.compile(r'<a?:\w+:\d+>|<[@#&!]*\d+>|https?://\S+')
+    WORD = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+    def __init__(self, translator, cache_size=5000, ttl=6 * 3600, batch_window=0.3, max_batch=16, max_batch_chars=3000, min_length=3):
+        self.translator = translator
+        self.cache = BoundedTTLCache(max_size=cache_size, ttl=ttl)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_batch_chars = max_batch_chars
+        self.min_length = min_length
+        self.inflight = {}
+        self.queues = {}
+        self.flush_tasks = {}
+        self.stats = {'requests': 0, 'skipped': 0, 'upstream_calls': 0, 'batched_texts': 0, 'batch_fallbacks': 0}
+
+    @classmethod
+    def guess_language(cls, text):
+        for lang, pattern in cls.SCRIPTS:
+            if pattern.search(text):
+                return lang
+        words = cls.WORD.findall(text.lower())
+        if not words:
+            return None
+        scores = {lang: sum(word in stopwords for word in words) for lang, stopwords in cls.STOPWORDS.items()}
+        best = max(scores, key=scores.get)
+        runner_up = max(score for lang, score in scores.items() if lang != best)
+        # Only trust a clear winner; short or mixed messages go upstream
+        if scores[best] >= 2 and scores[best] >= 2 * runner_up:
+            return best
+        return None
+
+    def skip_reason(self, text, target):
+        content = self.NOISE.sub(' ', text).strip()
+        if not self.WORD.search(content):
+            return 'no_text'
+        if len(content) < self.min_length:
+            return 'short'
+        guessed = self.guess_language(content)
+        if guessed and guessed.split('-')[0] == target.split('-')[0]:
+            return 'target_language'
+        return None
+
+    async def translate(self, text, dest):
+        key = (text.strip(), dest)
+        self.stats['requests'] += 1
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        future = self.inflight.get(key)
+        if future is None:
+            future = self.inflight[key] = asyncio.get_running_loop().create_future()
+            queue = self.queues.setdefault(dest, [])
+            queue.append(key)
+            if len(queue) >= self.max_batch or sum(len(text) for text, _ in queue) >= self.max_batch_chars:
+                self._schedule(dest, 0)
+            else:
+                self._schedule(dest, self.batch_window)
+        return await asyncio.shield(future)
+
+    def _schedule(self, dest, delay):
+        task = self.flush_tasks.get(dest)
+        if task is not None and not task.done():
+            if delay:
+                return
+            task.cancel()
+        self.flush_tasks[dest] = asyncio.create_task(self._flush_after(dest, delay))
+
+    async def _flush_after(self, dest, delay):
+        if delay:
+            await asyncio.sleep(delay)
+        keys = self.queues.pop(dest, [])
+        self.flush_tasks.pop(dest, None)
+        if not keys:
+            return
+        # Multi-line messages would break the newline split, and upstream detects a
+        # single source per call, so only lines of one known language share a batch
+        groups = {}
+        singles = []
+        for key in keys:
+            src = None if '\n' in key[0] else self.guess_language(key[0])
+            if src:
+                groups.setdefault(src, []).append(key)
+            else:
+                singles.append(key)
+        jobs = []
+        for src, batch in groups.items():
+            if len(batch) == 1:
+                singles.extend(batch)
+            else:
+                jobs.append(self._translate_batch(batch, dest, src))
+        jobs.extend(self._translate_one(key, dest) for key in singles)
+        await asyncio.gather(*jobs)
+
+    def _resolve(self, key, result=None, error=None):
+        future = self.inflight.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+            return
+        self.cache.set(key, result)
+        future.set_result(result)
+
+    async def _translate_one(self, key, dest):
+        try:
+            self.stats['upstream_calls'] += 1
+            translation = await self.translator.translate(key[0], dest=dest)
+            self._resolve(key, TranslationResult(translation.text, translation.src))
+        except Exception as e:
+            self._resolve(key, error=e)
+
+    async def _translate_batch(self, keys, dest, src):
+        try:
+            self.stats['upstream_calls'] += 1
+            translation = await self.translator.translate('\n'.join(text for text, _ in keys), dest=dest)
+            lines = translation.text.split('\n')
+        except Exception as e:
+            lines, translation = [], None
+            print(f"Batched translation failed, retrying individually: {e}")
+        if len(lines) != len(keys) or translation.src.split('-')[0] != src.split('-')[0]:
+            self.stats['batch_fallbacks'] += 1
+            await asyncio.gather(*(self._translate_one(key, dest) for key in keys))
+            return
+        self.stats['batched_texts'] += len(keys)
+        for key, line in zip(keys, lines):
+            self._resolve(key, TranslationResult(line.strip(), translation.src))
+
+    def close(self):
+        for task in self.flush_tasks.values():
+            task.cancel()
+        for future in self.inflight.values():
+            if not future.done():
+                future.cancel()
+        self.inflight.clear()
+        self.queues.clear()
+
+
 class TranslationSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.translator = Translator()
+        self.pipeline = TranslationPipeline(self.translator)
         self.auto_translate_channels = {}
         self.selected_manual_lang = None
         self.selected_auto_lang = None
@@ -11052,15 +12902,16 @@ class TranslationSystem(commands.Cog):
     async def translate(self, ctx):
         await self.create_translation_ui(ctx)
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN, background=True)
     async def on_message(self, message):
-        if message.guild:  
-            return   
-        if message.channel.id in self.auto_translate_channels and not message.author.bot:
+        if message.channel.id in self.auto_translate_channels:
             target_lang = self.auto_translate_channels[message.channel.id]
+            if self.pipeline.skip_reason(message.content, target_lang):
+                self.pipeline.stats['skipped'] += 1
+                return
             try:
-                translation = await self.translator.translate(message.content, dest=target_lang)
-                if translation.src != target_lang:
+                translation = await self.pipeline.translate(message.content, dest=target_lang)
+                if translation.src != target_lang and translation.text.strip().lower() != message.content.strip().lower():
                     embed = discord.Embed(
                         title="🌐 Auto Translation",
                         description=f"**Original** ({translation.src}):\n{message.content}\n\n**Translation** ({target_lang}):\n{translation.text}",
@@ -11126,7 +12977,7 @@ class TranslationSystem(commands.Cog):
                 if not self.manual_lang:
                     await interaction.response.send_message("Please select a target language first!", ephemeral=True)
                     return
-                modal = TranslationModal(self.cog.translator, self.manual_lang)
+                modal = TranslationModal(self.cog.pipeline, self.manual_lang)
                 await interaction.response.send_modal(modal)
 
             @discord.ui.button(label="Auto-Translate: Off", style=discord.ButtonStyle.red, emoji="🤖")
@@ -11167,6 +13018,22 @@ class TranslationSystem(commands.Cog):
         view = TranslationView(self, timeout=180)
         await ctx.send(embed=embed, view=view)
 
+    @commands.command(name="translatestats")
+    @commands.has_permissions(manage_channels=True)
+    async def translate_stats(self, ctx):
+        stats = self.pipeline.stats
+        cache = self.pipeline.cache.stats()
+        embed = discord.Embed(title="🌐 Translation Pipeline", color=discord.Color.blue())
+        embed.add_field(name="Requests", value=f"{stats['requests']:,}")
+        embed.add_field(name="Skipped", value=f"{stats['skipped']:,}")
+        embed.add_field(name="Upstream Calls", value=f"{stats['upstream_calls']:,}")
+        embed.add_field(name="Cache", value=f"{cache['size']:,} entries | {cache['hit_rate']:.0%} hit rate")
+        embed.add_field(name="Batched Texts", value=f"{stats['batched_texts']:,} ({stats['batch_fallbacks']} fallbacks)")
+        await ctx.send(embed=embed)
+
+    def cog_unload(self):
+        self.pipeline.close()
+
 
 class TranslationModal(discord.ui.Modal):
     def __init__(self, translator, target_lang):
@@ -11743,7 +13610,7 @@ class ResetConfirmationView(discord.ui.View):
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild_id = interaction.guild_id
         self.system.settings[guild_id] = {}
-        self.system.violation_counts[guild_id] = {}
+        self.system.reset_violation_counts(guild_id)
         
         embed = discord.Embed(
             title="🔄 Settings Reset",
@@ -11752,10 +13619,184 @@ class ResetConfirmationView(discord.ui.View):
         )
         await interaction.response.edit_message(embed=embed, view=None)
 
+class AuditLogCorrelator:
+    """Matches gateway events to audit-log entries without one REST call per event.
+
+    Entries pushed through ``on_audit_log_entry_create`` are buffered per guild for a
+    few seconds and handed to whichever pending event they belong to, regardless of
+    which of the two arrives first. Events that see no pushed entry within
+    ``push_timeout`` fall back to a per-guild poll that is shared by every event still
+    waiting, so a burst of deletions during a nuke costs one audit-log fetch instead
+    of one per event.
+    """
+
+    def __init__(self, entry_ttl=15, push_timeout=2.0, poll_delay=0.5, poll_limit=50):
+        self.entry_ttl = entry_ttl
+        self.push_timeout = push_timeout
+        self.poll_delay = poll_delay
+        self.poll_limit = poll_limit
+        self.recent = {}
+        self.pending = {}
+        self.poll_tasks = {}
+        self.consumed = OrderedDict()
+        self.latencies = deque(maxlen=500)
+        self.stats = {"pushed": 0, "matched_push": 0, "matched_poll": 0, "missed": 0, "fetches": 0}
+
+    @staticmethod
+    def _matches(entry, action, target_id):
+        if entry.action != action:
+            return False
+        return target_id is None or getattr(entry.target, 'id', None) == target_id
+
+    def _consume(self, entry):
+        self.consumed[entry.id] = True
+        if len(self.consumed) > 2000:
+            self.consumed.popitem(last=False)
+
+    def _take_buffered(self, guild_id, action, target_id):
+        buffer = self.recent.get(guild_id)
+        if not buffer:
+            return None
+        now = time.monotonic()
+        while buffer and now - buffer[0][1] > self.entry_ttl:
+            buffer.popleft()
+        for entry, received_at in buffer:
+            if entry.id not in self.consumed and self._matches(entry, action, target_id):
+                self._consume(entry)
+                return entry
+        return None
+
+    def feed(self, entry, polled=False):
+        if entry.id in self.consumed:
+            return False
+        if not polled:
+            self.stats["pushed"] += 1
+        guild_id = entry.guild.id
+        for waiter in self.pending.get(guild_id, []):
+            action, target_id, future, created_at = waiter
+            if not future.done() and self._matches(entry, action, target_id):
+                future.set_result(entry)
+                self._consume(entry)
+                self.stats["matched_poll" if polled else "matched_push"] += 1
+                return True
+        if not polled:
+            self.recent.setdefault(guild_id, deque(maxlen=200)).append((entry, time.monotonic()))
+        return False
+
+    def _schedule_poll(self, guild):
+        task = self.poll_tasks.get(guild.id)
+        if task is None or task.done():
+            self.poll_tasks[guild.id] = asyncio.create_task(self._poll(guild))
+
+    async def _poll(self, guild):
+        await asyncio.sleep(self.poll_delay)
+        fetch_started = time.monotonic()
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.entry_ttl)
+        try:
+            self.stats["fetches"] += 1
+            entries = [entry async for entry in guild.audit_logs(limit=self.poll_limit)]
+        except discord.HTTPException:
+            entries = []
+
+        for entry in reversed(entries):
+            if entry.created_at >= cutoff:
+                self.feed(entry, polled=True)
+
+        for action, target_id, future, created_at in self.pending.get(guild.id, []):
+            if not future.done() and created_at <= fetch_started:
+                future.set_result(None)
+
+    async def wait_for(self, guild, action, target_id=None, poll=True):
+        started = time.monotonic()
+        entry = self._take_buffered(guild.id, action, target_id)
+        if entry is not None:
+            self.stats["matched_push"] += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            waiter = (action, target_id, future, started)
+            self.pending.setdefault(guild.id, []).append(waiter)
+            try:
+                try:
+                    entry = await asyncio.wait_for(asyncio.shield(future), self.push_timeout)
+                except asyncio.TimeoutError:
+                    if poll:
+                        self._schedule_poll(guild)
+                        try:
+                            entry = await asyncio.wait_for(asyncio.shield(future), self.poll_delay + 5)
+                        except asyncio.TimeoutError:
+                            entry = None
+            finally:
+                waiters = self.pending.get(guild.id, [])
+                if waiter in waiters:
+                    waiters.remove(waiter)
+                if not waiters:
+                    self.pending.pop(guild.id, None)
+
+        if entry is None:
+            self.stats["missed"] += 1
+        else:
+            self.latencies.append(time.monotonic() - started)
+        return entry
+
+    async def simulate(self, events=100, push_delay=0.05, drop_rate=0.2):
+        """Replays a synthetic nuke (a burst of channel deletions) against this correlator.
+
+        ``drop_rate`` of the entries are never pushed and can only be found by polling.
+        Returns detection counts, latency percentiles and the number of audit-log fetches.
+        """
+        dropped = []
+
+        class SimulatedGuild:
+            id = 0
+
+            async def audit_logs(self, limit=50, **kwargs):
+                for entry in list(reversed(dropped))[:limit]:
+                    yield entry
+
+        guild = SimulatedGuild()
+        rng = random.Random(7)
+        fetches_before = self.stats["fetches"]
+
+        async def push_later(entry):
+            await asyncio.sleep(push_delay * rng.random() * 2)
+            self.feed(entry)
+
+        async def timed_wait(target_id):
+            started = time.monotonic()
+            entry = await self.wait_for(guild, discord.AuditLogAction.channel_delete, target_id)
+            return entry, time.monotonic() - started
+
+        tasks = []
+        for i in range(events):
+            entry = SimpleNamespace(
+                id=-(i + 1), guild=guild, action=discord.AuditLogAction.channel_delete,
+                target=SimpleNamespace(id=i), user=None, user_id=0,
+                created_at=datetime.now(timezone.utc)
+            )
+            if rng.random() < drop_rate:
+                dropped.append(entry)
+            else:
+                tasks.append(asyncio.create_task(push_later(entry)))
+            tasks.append(asyncio.create_task(timed_wait(i)))
+
+        results = [result for result in await asyncio.gather(*tasks) if result is not None]
+        latencies = sorted(latency for entry, latency in results if entry is not None)
+        return {
+            "events": events,
+            "detected": len(latencies),
+            "missed": sum(1 for entry, latency in results if entry is None),
+            "avg_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "p95_latency": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+            "max_latency": latencies[-1] if latencies else 0.0,
+            "fetches": self.stats["fetches"] - fetches_before,
+        }
+
+
 class AntiNukeSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.violation_counts = {}
+        self.violation_window = 60
+        self.audit_correlator = AuditLogCorrelator()
         self.action_cooldowns = {}
         self.settings = {}
         self.thresholds = {
@@ -11770,7 +13811,6 @@ class AntiNukeSystem(commands.Cog):
         }
         self.action_logs = {}
         self.whitelist = set()
-        self.violation_counts = {}
         self.protected_roles = set()
         self.alert_channels = {}  
         self.action_cooldowns = {}
@@ -11854,6 +13894,16 @@ class AntiNukeSystem(commands.Cog):
         )
         await ctx.send(embed=embed)
 
+    def active_violations(self, guild_id, user_id=None):
+        return [
+            key for key in self.bot.rate_windows.active_keys(guild_id)
+            if key[2].startswith("antinuke:") and (user_id is None or key[1] == user_id)
+        ]
+
+    def reset_violation_counts(self, guild_id, user_id=None):
+        for key in self.active_violations(guild_id, user_id):
+            self.bot.rate_windows.reset(*key)
+
     async def get_alert_channel(self, guild_id):
         channel_id = self.alert_channels.get(guild_id)
         if not channel_id:
@@ -11869,17 +13919,7 @@ class AntiNukeSystem(commands.Cog):
         if not self.settings[guild.id].get(protection_type, False):
             return False
             
-        if guild.id not in self.violation_counts:
-            self.violation_counts[guild.id] = {}
-            
-        if user.id not in self.violation_counts[guild.id]:
-            self.violation_counts[guild.id][user.id] = {}
-            
-        if violation_type not in self.violation_counts[guild.id][user.id]:
-            self.violation_counts[guild.id][user.id][violation_type] = 0
-            
-        self.violation_counts[guild.id][user.id][violation_type] += 1
-        count = self.violation_counts[guild.id][user.id][violation_type]
+        count = self.bot.rate_windows.hit(guild.id, user.id, f"antinuke:{violation_type}", self.violation_window)
         
         guild_thresholds = self.thresholds.get(guild.id, self.thresholds)
         threshold = guild_thresholds.get(violation_type, self.thresholds[violation_type])
@@ -11960,54 +14000,37 @@ class AntiNukeSystem(commands.Cog):
                 await alert_channel.send(f"⚠️ Error taking action: {str(e)}")
             print(f"[DEBUG] Error taking action: {e}")
 
+    async def resolve_actor(self, guild, action, target_id=None, poll=True):
+        entry = await self.audit_correlator.wait_for(guild, action, target_id, poll=poll)
+        if entry is None:
+            return None
+        actor = entry.user or guild.get_member(entry.user_id)
+        if actor is None or actor.id in self.whitelist or actor.id == self.bot.user.id:
+            return None
+        return actor
+
+    @commands.Cog.listener()
+    async def on_audit_log_entry_create(self, entry):
+        self.audit_correlator.feed(entry)
+
     @commands.Cog.listener()
     async def on_member_ban(self, guild, user):
-       
-        if self.bot.user.id == getattr(guild.me, "id", None):
-            return
-            
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.ban):
-                if entry.target.id == user.id:
-              
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "ban_limit")
-                    break
-        except discord.HTTPException:
-            pass
+        actor = await self.resolve_actor(guild, discord.AuditLogAction.ban, user.id)
+        if actor:
+            await self.handle_violation(guild, actor, "ban_limit")
 
     @commands.Cog.listener()
     async def on_member_remove(self, member):
-       
-        guild = member.guild
-        
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.kick):
-                if entry.target.id == member.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                   
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "kick_limit")
-                    break
-        except discord.HTTPException:
-            pass
+        # Most removals are plain leaves without an audit entry, so only pushed kick entries are used here.
+        actor = await self.resolve_actor(member.guild, discord.AuditLogAction.kick, member.id, poll=False)
+        if actor:
+            await self.handle_violation(member.guild, actor, "kick_limit")
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel):
-        guild = channel.guild
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.channel_delete):
-                if entry.target.id == channel.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                  
-                    if entry.user.id in self.whitelist:
-                        return
-                    await self.handle_violation(guild, entry.user, "channel_delete_limit")
-                    break
-        except discord.HTTPException:
-            pass
+        actor = await self.resolve_actor(channel.guild, discord.AuditLogAction.channel_delete, channel.id)
+        if actor:
+            await self.handle_violation(channel.guild, actor, "channel_delete_limit")
 
     @commands.Cog.listener()
     async def on_guild_role_delete(self, role):
@@ -12015,88 +14038,39 @@ class AntiNukeSystem(commands.Cog):
         guild = role.guild
         
         if role.id in self.protected_roles:
-            
-            try:
-                async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.role_delete):
-                    if entry.target.id == role.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                       
-                        await self.take_action(guild, entry.user, "role_delete_limit")
-                        break
-            except discord.HTTPException:
-                pass
+            entry = await self.audit_correlator.wait_for(guild, discord.AuditLogAction.role_delete, role.id)
+            actor = (entry.user or guild.get_member(entry.user_id)) if entry else None
+            if actor:
+                await self.take_action(guild, actor, "role_delete_limit")
             return
             
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.role_delete):
-                if entry.target.id == role.id and entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "role_delete_limit")
-                    break
-        except discord.HTTPException:
-            pass
+        actor = await self.resolve_actor(guild, discord.AuditLogAction.role_delete, role.id)
+        if actor:
+            await self.handle_violation(guild, actor, "role_delete_limit")
 
     @commands.Cog.listener()
     async def on_webhook_update(self, channel):
-     
-        guild = channel.guild
-        
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.webhook_create):
-                if entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                    
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "webhook_create_limit")
-                    break
-        except discord.HTTPException:
-            pass
+        # Webhook updates also fire for edits and deletions, so don't poll when nothing was pushed.
+        actor = await self.resolve_actor(channel.guild, discord.AuditLogAction.webhook_create, poll=False)
+        if actor:
+            await self.handle_violation(channel.guild, actor, "webhook_create_limit")
 
     @commands.Cog.listener()
     async def on_guild_emojis_update(self, guild, before, after):
 
         if len(before) > len(after):
-            
-            try:
-                async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.emoji_delete):
-                    if entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                      
-                        if entry.user.id in self.whitelist:
-                            return
-                            
-                        await self.handle_
-                      
-                        await self.handle_violation(guild, entry.user, "emoji_delete_limit")
-                        break
-            except discord.HTTPException:
-                pass
+            actor = await self.resolve_actor(guild, discord.AuditLogAction.emoji_delete)
+            if actor:
+                await self.handle_violation(guild, actor, "emoji_delete_limit")
 
     @commands.Cog.listener()
     async def on_guild_integrations_update(self, guild):
-   
-    
-        try:
-            async for entry in guild.audit_logs(limit=1, action=discord.AuditLogAction.bot_add):
-                if entry.created_at.timestamp() > datetime.now().timestamp() - 5:
-                    
-                    if entry.user.id in self.whitelist:
-                        return
-                        
-                    await self.handle_violation(guild, entry.user, "bot_add_limit")
-                    break
-        except discord.HTTPException:
-            pass
+        actor = await self.resolve_actor(guild, discord.AuditLogAction.bot_add, poll=False)
+        if actor:
+            await self.handle_violation(guild, actor, "bot_add_limit")
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN | MessageTraits.MENTIONS)
     async def on_message(self, message):
-        if message.guild:  
-            return           
-        if message.author.bot or not message.guild:
-            return
-            
         if message.author.id in self.whitelist:
             return
             
@@ -12150,19 +14124,51 @@ class AntiNukeSystem(commands.Cog):
       
         if user:
             
-            if ctx.guild.id in self.violation_counts and user.id in self.violation_counts[ctx.guild.id]:
-                self.violation_counts[ctx.guild.id][user.id] = {}
+            if self.active_violations(ctx.guild.id, user.id):
+                self.reset_violation_counts(ctx.guild.id, user.id)
                 await ctx.send(f"✅ Reset violation counts for {user.mention}")
             else:
                 await ctx.send(f"No violation counts found for {user.mention}")
         else:
             
-            if ctx.guild.id in self.violation_counts:
-                self.violation_counts[ctx.guild.id] = {}
+            if self.active_violations(ctx.guild.id):
+                self.reset_violation_counts(ctx.guild.id)
                 await ctx.send("✅ Reset all violation counts for this server")
             else:
                 await ctx.send("No violation counts found for this server")
 
+    @commands.command(name="antinukesim")
+    @commands.has_permissions(administrator=True)
+    async def antinuke_simulation(self, ctx, events: int = 100):
+      
+        events = max(10, min(events, 1000))
+        results = await AuditLogCorrelator(push_timeout=0.5).simulate(events)
+        live = self.audit_correlator.stats
+
+        embed = discord.Embed(
+            title="🧪 Anti-Nuke Detection Simulation",
+            description=f"Simulated {results['events']} channel deletions, ~20% without a pushed audit entry.",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Detected", value=f"{results['detected']}/{results['events']}", inline=True)
+        embed.add_field(name="Audit Log Fetches", value=str(results['fetches']), inline=True)
+        embed.add_field(
+            name="Detection Latency",
+            value=f"Avg: {results['avg_latency'] * 1000:.0f}ms\n"
+                  f"P95: {results['p95_latency'] * 1000:.0f}ms\n"
+                  f"Max: {results['max_latency'] * 1000:.0f}ms",
+            inline=False
+        )
+        embed.add_field(
+            name="Live Correlator",
+            value=f"Pushed: {live['pushed']} | Matched (push/poll): {live['matched_push']}/{live['matched_poll']}\n"
+                  f"Missed: {live['missed']} | Fetches: {live['fetches']}",
+            inline=False
+        )
+        embed.set_footer(text="© ZygnalBot Anti-Nuke System | Created by TheZ")
+        await ctx.send(embed=embed)
+
     @commands.command(name="antinukestatus")
     @commands.has_permissions(administrator=True)
     async def antinuke_status(self, ctx):
@@ -12203,10 +14209,7 @@ class AntiNukeSystem(commands.Cog):
         protected_roles_count = sum(1 for role_id in self.protected_roles if ctx.guild.get_role(role_id))
         embed.add_field(name="Protected Roles", value=str(protected_roles_count), inline=True)
         
-        violations_count = 0
-        if guild_id in self.violation_counts:
-            for user_id, violations in self.violation_counts[guild_id].items():
-                violations_count += sum(1 for v in violations.values() if v > 0)
+        violations_count = len(self.active_violations(guild_id))
         embed.add_field(name="Active Violations", value=str(violations_count), inline=True)
         
         embed.set_footer(text="© ZygnalBot Anti-Nuke System | Created by TheZ")
@@ -12221,7 +14224,7 @@ class ResetConfirmationView(discord.ui.View):
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild_id = interaction.guild_id
         self.antinuke.settings[guild_id] = {}  
-        self.antinuke.violation_counts[guild_id] = {}  
+        self.antinuke.reset_violation_counts(guild_id)
         
         embed = discord.Embed(
             title="🔄 Settings Reset",
@@ -12453,6 +14456,7 @@ class ClearChannel(commands.Cog):
         self.excluded_channels = {}
         self.log_channel = {}
         self.active_clear_tasks = {}  
+        self.bot.bulk_jobs.register('purge', self.purge_batches, self.purge_apply, self.purge_estimate, "Channel Purge")
         
     def get_task_key(self, guild_id, channel_id):
         return f"{guild_id}_{channel_id}"
@@ -12461,10 +14465,64 @@ class ClearChannel(commands.Cog):
         for task, _ in self.auto_clear_tasks.values():
             task.cancel()
 
+    def bulk_cutoff(self):
+        # Bulk delete rejects messages older than 14 days; keep a minute of margin
+        return discord.utils.time_snowflake(datetime.now(timezone.utc) - timedelta(days=14, minutes=-1))
+
+    async def purge_estimate(self, guild, params, scan_limit=5000):
+        channel = guild.get_channel(params["channel_id"])
+        if not channel:
+            return 0, 0
+        cutoff = self.bulk_cutoff()
+        recent = old = 0
+        async for message in channel.history(limit=scan_limit, before=discord.Object(params["before"])):
+            if message.id > cutoff:
+                recent += 1
+            else:
+                old += 1
+        return recent + old, math.ceil(recent / 100) + old
+
+    async def purge_batches(self, guild, job):
+        channel = guild.get_channel(job["params"]["channel_id"])
+        if not channel:
+            raise ValueError("The channel no longer exists")
+        before = job["cursor"] or job["params"]["before"]
+        while True:
+            page = [message async for message in channel.history(limit=100, before=discord.Object(before))]
+            if not page:
+                return
+            before = page[-1].id
+            yield before, page
+
+    async def purge_apply(self, guild, job, messages):
+        channel = guild.get_channel(job["params"]["channel_id"])
+        cutoff = self.bulk_cutoff()
+        recent = [message for message in messages if message.id > cutoff]
+        old = [message for message in messages if message.id <= cutoff]
+        done = failed = 0
+        error = None
+        if len(recent) > 1:
+            await self.bot.bulk_jobs.pace(guild.id)
+            try:
+                await channel.delete_messages(recent)
+                done = len(recent)
+            except discord.HTTPException as e:
+                failed, error = len(recent), str(e)
+        else:
+            old = recent + old
+        single_done, single_failed, single_error = await self.bot.bulk_jobs.each(job, old, lambda message: message.delete())
+        return done + single_done, failed + single_failed, single_error or error
+
     async def clear_channel_periodic(self, channel, interval):
         while True:
             try:
-                await channel.purge(limit=None)
+                params = {"channel_id": channel.id, "before": discord.utils.time_snowflake(datetime.now(timezone.utc))}
+                job = await self.bot.bulk_jobs.submit('purge', channel.guild, params, estimate=False)
+                try:
+                    await self.bot.bulk_jobs.wait(job)
+                except asyncio.CancelledError:
+                    await self.bot.bulk_jobs.cancel(job["id"])
+                    raise
                 await asyncio.sleep(interval)
             except Exception as e:
                 print(f"Error in periodic clear for {channel.name}: {e}")
@@ -12573,9 +14631,8 @@ class RiotGamesAPI(commands.Cog):
         
         url = f"https://{region}.api.riotgames.com/lol/summoner/v4/summoners/by-name/{summoner_name}"
         headers = {"X-Riot-Token": self.api_key}
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                return await response.json() if response.status == 200 else None
+        async with self.bot.http_client.get(url, headers=headers) as response:
+            return await response.json() if response.status == 200 else None
 
     @lol.command(name="profile")
     async def lol_profile(self, ctx, region: str, *, summoner_name: str):
@@ -12600,7 +14657,7 @@ class TrollFriend(commands.Cog):
         self.bot = bot
         self.target_user_id = target_user_id
 
-    @commands.Cog.listener()
+    @message_listener()
     async def on_message(self, message):
         if message.author.id == self.target_user_id and message.content.lower() == "yes":
             await message.channel.send("What are you Talkin about? you little brat")
@@ -14096,18 +16153,16 @@ class ClaudeInterface(discord.ui.View):
     @discord.ui.button(label="Memory Mode", style=ButtonStyle.blurple, emoji="🧠")
     async def toggle_memory(self, interaction: discord.Interaction, button: discord.ui.Button):
         guild_id = interaction.guild_id
+        memory_enabled = self.cog.memory_enabled
+        memory_enabled[guild_id] = not memory_enabled.get(guild_id, True)
         
-        if not hasattr(self, 'memory_enabled'):
-            self.memory_enabled = {}
-        self.memory_enabled[guild_id] = not self.memory_enabled.get(guild_id, False)
-        
-        button.style = ButtonStyle.green if self.memory_enabled[guild_id] else ButtonStyle.red
-        button.label = "Memory Mode (On)" if self.memory_enabled[guild_id] else "Memory Mode (Off)"
+        button.style = ButtonStyle.green if memory_enabled[guild_id] else ButtonStyle.red
+        button.label = "Memory Mode (On)" if memory_enabled[guild_id] else "Memory Mode (Off)"
         
         embed = discord.Embed(
             title="🧠 Memory Status Updated",
-            description=f"Memory mode is now {'enabled' if self.memory_enabled[guild_id] else 'disabled'}",
-            color=discord.Color.green() if self.memory_enabled[guild_id] else discord.Color.red()
+            description=f"Memory mode is now {'enabled' if memory_enabled[guild_id] else 'disabled'}",
+            color=discord.Color.green() if memory_enabled[guild_id] else discord.Color.red()
         )
         
         await interaction.response.edit_message(view=self)
@@ -14165,10 +16220,230 @@ class ClaudeSettingsView(discord.ui.View):
         
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+class ConversationMemory:
+    """Bounded per-channel chat history for the AI cogs.
+
+    Each conversation is a ring buffer of turns trimmed to a token budget (estimated
+    at ~4 characters per token). Turns that fall out of the budget are handed to an
+    optional async ``summarizer(summary, turns) -> summary`` so their gist survives
+    as a short system note. Idle conversations expire, the number of conversations
+    is capped, and ``snapshot``/``load`` let PersistenceManager keep them on disk.
+    """
+
+    def __init__(self, max_turns=20, token_budget=1500, idle_ttl=3600, max_conversations=500, summarizer=None, sweep_interval=300):
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.idle_ttl = idle_ttl
+        self.max_conversations = max_conversations
+        self.summarizer = summarizer
+        self.sweep_interval = sweep_interval
+        self.conversations = OrderedDict()
+        self._summary_tasks = {}
+        self._last_sweep = time.time()
+        self.evictions = 0
+        self.trimmed_turns = 0
+
+    @staticmethod
+    def estimate_tokens(text):
+        return len(text) // 4 + 4
+
+    def _conversation(self, key):
+        conversation = self.conversations.get(key)
+        if conversation is None:
+            conversation = self.conversations[key] = {'turns': deque(), 'tokens': 0, 'summary': '', 'last_active': time.time()}
+            while len(self.conversations) > self.max_conversations:
+                self.drop(next(iter(self.conversations)))
+                self.evictions += 1
+        else:
+            self.conversations.move_to_end(key)
+        return conversation
+
+    def append(self, key, role, content):
+        if time.time() - self._last_sweep > self.sweep_interval:
+            self.sweep()
+        conversation = self._conversation(key)
+        tokens = self.estimate_tokens(content)
+        conversation['turns'].append((role, content, tokens))
+        conversation['tokens'] += tokens
+        conversation['last_active'] = time.time()
+
+        trimmed = []
+        if conversation['tokens'] > self.token_budget or len(conversation['turns']) > self.max_turns:
+            # Trim to 3/4 of the limits so the summarizer sees several turns at once, not one per message
+            token_target, turn_target = self.token_budget * 3 // 4, max(self.max_turns * 3 // 4, 1)
+            # Always keep the newest turn, even if it alone is over budget
+            while len(conversation['turns']) > 1 and (
+                    conversation['tokens'] > token_target or len(conversation['turns']) > turn_target):
+                turn = conversation['turns'].popleft()
+                conversation['tokens'] -= turn[2]
+                trimmed.append(turn)
+        if trimmed:
+            self.trimmed_turns += len(trimmed)
+            if self.summarizer:
+                self._summarize(key, conversation, trimmed)
+
+    def _summarize(self, key, conversation, turns):
+        async def run(previous):
+            try:
+                await previous
+            except Exception:
+                pass
+            try:
+                summary = await self.summarizer(conversation['summary'], [(role, content) for role, content, _ in turns])
+                if summary:
+                    conversation['summary'] = summary[:2000]
+            except Exception as e:
+                print(f"Conversation summary failed for {key}: {e}")
+
+        previous = self._summary_tasks.get(key)
+        # Summaries of one conversation are chained so they apply in order
+        self._summary_tasks[key] = asyncio.create_task(run(previous or asyncio.sleep(0)))
+
+    def messages(self, key, system=None):
+        conversation = self.conversations.get(key)
+        messages = []
+        if system:
+            messages.append({"role": "system", "content": system})
+        if conversation:
+            if conversation['summary']:
+                messages.append({"role": "system", "content": f"Summary of the earlier conversation: {conversation['summary']}"})
+            messages.extend({"role": role, "content": content} for role, content, _ in conversation['turns'])
+        return messages
+
+    def summary(self, key):
+        conversation = self.conversations.get(key)
+        return conversation['summary'] if conversation else ''
+
+    def drop(self, key):
+        self.conversations.pop(key, None)
+        task = self._summary_tasks.pop(key, None)
+        if task:
+            task.cancel()
+
+    def sweep(self, now=None):
+        now = now or time.time()
+        self._last_sweep = now
+        cutoff = now - self.idle_ttl
+        for key in [key for key, conversation in self.conversations.items() if conversation['last_active'] < cutoff]:
+            self.drop(key)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            'conversations': len(self.conversations),
+            'turns': sum(len(conversation['turns']) for conversation in self.conversations.values()),
+            'tokens': sum(conversation['tokens'] for conversation in self.conversations.values()),
+            'trimmed_turns': self.trimmed_turns,
+            'evictions': self.evictions
+        }
+
+    def snapshot(self):
+        return {
+            str(key): {
+                'turns': [[role, content] for role, content, _ in conversation['turns']],
+                'summary': conversation['summary'],
+                'last_active': conversation['last_active']
+            } for key, conversation in self.conversations.items()
+        }
+
+    def load(self, data):
+        for key, saved in sorted(data.items(), key=lambda item: item[1].get('last_active', 0)):
+            conversation = self._conversation(int(key) if key.isdigit() else key)
+            conversation['summary'] = saved.get('summary', '')
+            for role, content in saved.get('turns', []):
+                self.append(int(key) if key.isdigit() else key, role, content)
+            conversation['last_active'] = saved.get('last_active', time.time())
+        self.sweep()
+
+
+class AIClient:
+    """One shared client for the chat-completion providers (bot.ai_client).
+
+    OpenAI calls go through the bot's pooled HTTP client and Anthropic calls through
+    a single AsyncAnthropic instance per key. Each provider has its own concurrency
+    limit (AI_MAX_CONCURRENCY), and identical requests already in flight are
+    coalesced into one upstream call.
+    """
+
+    OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+
+    def __init__(self, bot, max_concurrency=None):
+        self.bot = bot
+        max_concurrency = max_concurrency or int(os.getenv('AI_MAX_CONCURRENCY', '4'))
+        self.limits = {'openai': asyncio.Semaphore(max_concurrency), 'anthropic': asyncio.Semaphore(max_concurrency)}
+        self.anthropic_clients = {}
+        self.inflight = {}
+        self.stats = {'requests': 0, 'coalesced': 0, 'upstream': 0, 'errors': 0}
+
+    def anthropic_client(self, api_key):
+        client = self.anthropic_clients.get(api_key)
+        if client is None:
+            client = self.anthropic_clients[api_key] = anthropic.AsyncAnthropic(api_key=api_key)
+        return client
+
+    async def _coalesced(self, key, call):
+        self.stats['requests'] += 1
+        task = self.inflight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(task)
+
+        async def run():
+            provider = key[0]
+            try:
+                async with self.limits[provider]:
+                    self.stats['upstream'] += 1
+                    return await call()
+            except Exception:
+                self.stats['errors'] += 1
+                raise
+            finally:
+                self.inflight.pop(key, None)
+
+        task = self.inflight[key] = asyncio.create_task(run())
+        return await asyncio.shield(task)
+
+    async def openai_chat(self, api_key, model, messages, temperature=0.7):
+        """Returns ``(status, data)`` so callers can react to 402/429 themselves."""
+        async def call():
+            async with self.bot.http_client.post(
+                self.OPENAI_URL,
+                headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+                json={"model": model, "messages": messages, "temperature": temperature},
+                timeout=60
+            ) as response:
+                return response.status, await response.json(content_type=None)
+
+        key = ('openai', model, json.dumps(messages, sort_keys=True), temperature)
+        return await self._coalesced(key, call)
+
+    async def anthropic_chat(self, api_key, model, messages, system=None, max_tokens=1000):
+        async def call():
+            kwargs = {"system": system} if system else {}
+            response = await self.anthropic_client(api_key).messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                messages=messages,
+                **kwargs
+            )
+            return response.content[0].text
+
+        key = ('anthropic', model, json.dumps(messages, sort_keys=True), system, max_tokens)
+        return await self._coalesced(key, call)
+
+    async def close(self):
+        for client in self.anthropic_clients.values():
+            try:
+                await client.close()
+            except Exception as e:
+                print(f"Error closing Anthropic client: {e}")
+        self.anthropic_clients.clear()
+
+
 class ClaudeAI(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.conversations = {}
+        self.memory = ConversationMemory(idle_ttl=1800)
         self.settings = {}
         self.api_key = os.getenv('ANTHROPIC_API_KEY', None)
         self.client = None
@@ -14185,15 +16460,13 @@ class ClaudeAI(commands.Cog):
         if not self.api_key:
             return False
         try:
-            self.client = Anthropic(api_key=self.api_key)
+            self.client = self.bot.ai_client.anthropic_client(self.api_key)
             return True
         except:
             return False
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN, background=True)
     async def on_message(self, message):
-        if message.guild:  
-            return   
         if not isinstance(message.channel, discord.TextChannel):
             return
 
@@ -14290,17 +16563,28 @@ class ClaudeAI(commands.Cog):
                         await message.channel.send(response)
                         return
 
-                response = self.client.messages.create(
-                    model="claude-3-haiku-20240307", # Type: NOTE: BUDGET CLAUDE 3
-                    max_tokens=1000,
-                    messages=[{
-                        "role": "user",
-                        "content": f"{personality_prompts[personality]}{message.content}"
-                    }],
-                    stream=False
+                channel_id = message.channel.id
+                if self.memory_enabled.get(message.guild.id, True):
+                    self.memory.append(channel_id, "user", message.content)
+                    # Claude takes system text separately and the history has to open with a user turn
+                    history = [turn for turn in self.memory.messages(channel_id) if turn["role"] != "system"]
+                    while history and history[0]["role"] != "user":
+                        history.pop(0)
+                else:
+                    history = [{"role": "user", "content": message.content}]
+                system = personality_prompts[personality]
+                if self.memory.summary(channel_id):
+                    system += f"\nSummary of the earlier conversation: {self.memory.summary(channel_id)}"
+
+                ai_response = await self.bot.ai_client.anthropic_chat(
+                    self.api_key,
+                    "claude-3-haiku-20240307", # Type: NOTE: BUDGET CLAUDE 3
+                    history,
+                    system=system,
+                    max_tokens=1000
                 )
-
-                ai_response = response.content[0].text
+                if self.memory_enabled.get(message.guild.id, True):
+                    self.memory.append(channel_id, "assistant", ai_response)
               
                 chunks = [ai_response[i:i+1900] for i in range(0, len(ai_response), 1900)]
 
@@ -14363,6 +16647,7 @@ class ClaudeAI(commands.Cog):
     def unregister_chat_channel(self, channel_id: int):
         if channel_id in self.active_channels:
             del self.active_channels[channel_id]
+        self.memory.drop(channel_id)
 
     @commands.Cog.listener()
     async def on_guild_channel_delete(self, channel):
@@ -14470,9 +16755,8 @@ class CreativePromptModal(discord.ui.Modal):
 class AntiGhostPing(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self._cached_messages = {}
+        self._cached_messages = BoundedTTLCache(max_size=50000, ttl=3600, max_per_group=5000)
         self._edited_messages = {}
-        self._deletion_history = {}
         self._rapid_delete_threshold = 5
         self._rapid_delete_timeframe = 60
         self.ghost_ping_counts = {}  
@@ -14481,6 +16765,8 @@ class AntiGhostPing(commands.Cog):
         
 
         self.settings = self.load_settings()
+        self.bot.persistence.register('ghost_ping_settings.json', 'ghost_ping_settings.json', lambda: self.settings, guild_key_depth=1)
+        self.bot.scheduler.register('ghost_unmute', self.unmute_expired)
 
 
     def load_settings(self):
@@ -14496,12 +16782,29 @@ class AntiGhostPing(commands.Cog):
             return {}
 
     def save_settings(self):
-        settings_file = 'ghost_ping_settings.json'
-        with open(settings_file, 'w') as f:
-            json.dump(self.settings, f, indent=4)
+        self.bot.persistence.mark_dirty('ghost_ping_settings.json')
 
     async def _unmute_user(self, user, role, channel):
-        await asyncio.sleep(1800)  
+        await self.bot.scheduler.schedule(
+            f"ghost_unmute:{user.guild.id}:{user.id}",
+            'ghost_unmute',
+            time.time() + 1800,
+            {"guild_id": user.guild.id, "user_id": user.id, "role_id": role.id, "channel_id": channel.id},
+            guild_id=user.guild.id
+        )
+
+    async def unmute_expired(self, job):
+        guild = self.bot.get_guild(job["guild_id"])
+        if not guild:
+            return
+        role = guild.get_role(job["role_id"])
+        channel = guild.get_channel(job["channel_id"])
+        try:
+            user = guild.get_member(job["user_id"]) or await guild.fetch_member(job["user_id"])
+        except discord.NotFound:
+            return
+        if not role:
+            return
         try:
             await user.remove_roles(role)
             embed = discord.Embed(
@@ -14509,7 +16812,8 @@ class AntiGhostPing(commands.Cog):
                 description=f"{user.mention} mute duration has expired.",
                 color=discord.Color.green()
             )
-            await channel.send(embed=embed)
+            if channel:
+                await channel.send(embed=embed)
         except discord.HTTPException:
             if self.mod_log_channel:
                 await self.mod_log_channel.send(f"Failed to unmute {user.mention} - please check manually.")
@@ -14612,8 +16916,7 @@ class AntiGhostPing(commands.Cog):
                 if muted_role:
                     await user.add_roles(muted_role)
                     await channel.send(f"{user.mention} has been muted for 30 minutes due to repeated ghost pings.")
-                    await asyncio.sleep(1800)  
-                    await user.remove_roles(muted_role)
+                    await self._unmute_user(user, muted_role, channel)
             except discord.Forbidden:
                 await channel.send(f"Warning: Unable to mute {user.mention}. Missing permissions.")
         elif count == 2:
@@ -14637,13 +16940,8 @@ class AntiGhostPing(commands.Cog):
 
         return member and member.guild_permissions.administrator
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN | MessageTraits.MENTIONS)
     async def on_message(self, message):
-        if message.author.bot:
-            return
-        if message.guild is None:
-            return
-        
         server_id = str(message.guild.id)
         if server_id in self.settings and not self.settings[server_id].get("ghost_ping_enabled", True):
             return  
@@ -14657,43 +16955,39 @@ class AntiGhostPing(commands.Cog):
         ])
         
         if has_ping:
-            print("Message cached for ghost ping detection")
-            self._cached_messages[message.id] = {
-                'content': message.content,
-                'author': message.author,
+            self._cached_messages.set(message.id, {
+                'content': message.content[:1000],
+                'author_id': message.author.id,
                 'mentions': [user.id for user in message.mentions],
                 'role_mentions': [role.id for role in message.role_mentions],
                 'everyone': True if (message.mention_everyone or
                                 '@everyone' in message.content.lower() or
                                 '@here' in message.content.lower()) else False,
                 'reference': message.reference.message_id if message.reference else None,
-                'timestamp': message.created_at,
+                'timestamp': message.created_at.timestamp(),
                 'channel': message.channel.id,
                 'attachments': [att.url for att in message.attachments]
-            }
-            print(f"Cached message data: {self._cached_messages[message.id]}")
+            }, group=message.guild.id)
 
     @commands.Cog.listener()
     async def on_message_delete(self, message):
       
+        if message.guild is None:
+            return
         server_id = str(message.guild.id)
         if server_id in self.settings and not self.settings[server_id].get("ghost_ping_enabled", True):
             return  
-        if message.guild:  
-            return               
-        if message.id in self._cached_messages:
-            cached = self._cached_messages[message.id]
+        cached = self._cached_messages.pop(message.id)
+        if cached:
+            author = message.guild.get_member(cached['author_id']) or message.author
 
-            if self.is_admin(cached['author']):
-                del self._cached_messages[message.id]
+            if self.is_admin(author):
                 return          
 
-            author_id = cached['author'].id
-            current_time = datetime.now()
-            
-            if author_id not in self._deletion_history:
-                self._deletion_history[author_id] = []
-            self._deletion_history[author_id].append(current_time)
+            author_id = cached['author_id']
+            recent_deletions = self.bot.rate_windows.hit(
+                message.guild.id, author_id, "ghost_ping_delete", self._rapid_delete_timeframe
+            )
             
             if author_id not in self.ghost_ping_counts:
                 self.ghost_ping_counts[author_id] = 1
@@ -14702,7 +16996,7 @@ class AntiGhostPing(commands.Cog):
 
             embed = discord.Embed(
                 title="🚨 GHOST PING ALERT 🚨",
-                description=f"**{cached['author'].name}** ({cached['author'].id}) tried to ghost ping!\nThis is ghost ping #{self.ghost_ping_counts[author_id]}",
+                description=f"**{author.name}** ({author.id}) tried to ghost ping!\nThis is ghost ping #{self.ghost_ping_counts[author_id]}",
                 color=discord.Color.red()
             )
             
@@ -14747,17 +17041,15 @@ class AntiGhostPing(commands.Cog):
                     inline=False
                 )
             
-            recent_deletions = [t for t in self._deletion_history[author_id]
-                            if (current_time - t).seconds < self._rapid_delete_timeframe]
-            if len(recent_deletions) >= self._rapid_delete_threshold:
+            if recent_deletions >= self._rapid_delete_threshold:
                 embed.add_field(
                     name="⚠️ WARNING",
                     value="User showing suspicious rapid deletion pattern!",
                     inline=False
                 )
             
-            embed.set_thumbnail(url=cached['author'].avatar.url if cached['author'].avatar else cached['author'].default_avatar.url)
-            embed.set_footer(text=f"Message sent at {cached['timestamp'].strftime('%Y-%m-%d %H:%M:%S')}")
+            embed.set_thumbnail(url=author.avatar.url if author.avatar else author.default_avatar.url)
+            embed.set_footer(text=f"Message sent at {datetime.fromtimestamp(cached['timestamp'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S')}")
             
             channel = self.bot.get_channel(cached['channel'])
             await channel.send(embed=embed)
@@ -14780,18 +17072,18 @@ class AntiGhostPing(commands.Cog):
                             await ch.set_permissions(muted_role, send_messages=False, add_reactions=False)
                     
                     self.ghost_ping_counts[author_id] = 0
-                    await cached['author'].add_roles(muted_role)
+                    await author.add_roles(muted_role)
                     
                     embed = discord.Embed(
                         title="🔇 Ghost Ping Mute",
-                        description=f"{cached['author'].mention} has been muted for 30 minutes.",
+                        description=f"{author.mention} has been muted for 30 minutes.",
                         color=discord.Color.red()
                     )
                     embed.add_field(name="Reason", value="Repeated ghost pinging (3+ times)")
                     embed.add_field(name="Duration", value="30 minutes")
                     await channel.send(embed=embed)
                     
-                    self.bot.loop.create_task(self._unmute_user(cached['author'], muted_role, channel))
+                    await self._unmute_user(author, muted_role, channel)
                     
                     if self.mod_log_channel:
                         await self.mod_log_channel.send(embed=embed)
@@ -14801,14 +17093,12 @@ class AntiGhostPing(commands.Cog):
             elif self.ghost_ping_counts[author_id] == 2:
                 embed = discord.Embed(
                     title="⚠️ Ghost Ping Warning",
-                    description=f"{cached['author'].mention} This is your second warning.",
+                    description=f"{author.mention} This is your second warning.",
                     color=discord.Color.yellow()
                 )
                 embed.add_field(name="Next Offense", value="One more ghost ping will result in a 30-minute mute")
                 await channel.send(embed=embed)
 
-            del self._cached_messages[message.id]
-
     @commands.Cog.listener()
     async def on_message_edit(self, before, after):
         if before.guild is None:
@@ -14852,6 +17142,22 @@ class AntiGhostPing(commands.Cog):
             
             await before.channel.send(embed=embed)
             
+    @commands.command(name='ghostcache')
+    @commands.has_permissions(administrator=True)
+    async def ghost_cache_stats(self, ctx):
+        stats = self._cached_messages.stats()
+        embed = discord.Embed(
+            title="👻 Ghost Ping Cache",
+            description=f"Tracking up to {self._cached_messages.max_size} messages "
+                        f"({self._cached_messages.max_per_group} per server) for "
+                        f"{self._cached_messages.ttl // 60} minutes.",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="Cached Messages", value=f"{stats['size']} total\n{self._cached_messages.group_size(ctx.guild.id)} in this server")
+        embed.add_field(name="Lookups", value=f"Hits: {stats['hits']}\nMisses: {stats['misses']}\nHit Rate: {stats['hit_rate']:.1%}")
+        embed.add_field(name="Removals", value=f"Evicted: {stats['evictions']}\nExpired: {stats['expirations']}")
+        await ctx.send(embed=embed)
+
     @commands.command(name='test_antighost')
     @commands.has_permissions(administrator=True)
     async def test_antighost(self, ctx):
@@ -14915,12 +17221,10 @@ class BotSassResponses(commands.Cog):
             "Did mommy not give you enough attention? 👶"
         ]
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.HUMAN, background=True)
     async def on_message(self, message):
         if not self.enabled:
             return
-        if message.author.bot:
-            return              
         if (self.bot.user in message.mentions) or (str(self.bot.user.id) in ''.join(message.content.split())):
             sass = random.choice(self.sass_responses)
             
@@ -15012,12 +17316,8 @@ class RoastCommands(commands.Cog):
             "Cannot compute: Target too awesome 🌟"
         ]
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.DM | MessageTraits.HUMAN)
     async def on_message(self, message):
-        if message.author.bot:
-            return
-        if message.guild:  
-            return               
         if any(trigger in message.content.lower() for trigger in self.triggers):
             roast = random.choice(self.roasts)
             embed = discord.Embed(
@@ -15245,8 +17545,10 @@ class AdvancedPollSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.active_polls: Dict[str, 'PollData'] = {}
-        self.vote_locks: Dict[str, asyncio.Lock] = {}
-        self.poll_tasks: Dict[str, asyncio.Task] = {}
+        self.embed_updates: Dict[str, asyncio.Task] = {}
+        self.shown_counts: Dict[str, tuple] = {}
+        self.embed_debounce = 5
+        self.data_file = "data/polls.json"
         self.poll_types = {
             "single": "Single Choice ✨",
             "multiple": "Multiple Choice 📝", 
@@ -15255,6 +17557,96 @@ class AdvancedPollSystem(commands.Cog):
             "weighted": "Weighted Voting 🎯",
             "ranked": "Ranked Choice 🏆"
         }
+        self.bot.persistence.register(self.data_file, self.data_file, self.build_snapshot, guild_key_depth=1)
+        self.bot.scheduler.register('poll_end', self.end_scheduled_poll)
+        self.load_polls()
+
+    async def cog_load(self):
+        for poll_data in self.active_polls.values():
+            self.bot.add_view(self.AdvancedPollView(poll_data, self), message_id=poll_data['message_id'])
+
+    def load_polls(self):
+        if not os.path.exists(self.data_file):
+            return
+        try:
+            with open(self.data_file, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except Exception as e:
+            print(f"Error loading polls: {e}")
+            return
+        for polls in stored.values():
+            for poll_data in polls.values():
+                poll_data['created_at'] = datetime.fromisoformat(poll_data['created_at'])
+                self.track_poll(poll_data)
+
+    def build_snapshot(self):
+        snapshot = {}
+        for poll_id, poll_data in self.active_polls.items():
+            data = copy.deepcopy({key: value for key, value in poll_data.items() if key not in ('counts', 'options', 'created_at')})
+            data['options'] = [option.text if isinstance(option, PollOption) else str(option) for option in poll_data['options']]
+            data['created_at'] = poll_data['created_at'].isoformat()
+            snapshot.setdefault(str(poll_data.get('guild_id')), {})[poll_id] = data
+        return snapshot
+
+    def track_poll(self, poll_data: Dict):
+        # Per-option tallies are rebuilt once here and then kept current by apply_vote
+        counts = [0] * len(poll_data['options'])
+        for vote_list in poll_data['votes'].values():
+            for index in vote_list:
+                counts[index] += 1
+        poll_data['counts'] = counts
+        self.active_polls[poll_data['id']] = poll_data
+        self.shown_counts[poll_data['id']] = tuple(counts)
+
+    def apply_vote(self, poll_data: Dict, user_id: str, option_index: int):
+        votes = poll_data['votes']
+        counts = poll_data['counts']
+        current = votes.get(user_id, [])
+
+        if poll_data['settings']['type'] == 'single':
+            if current == [option_index]:
+                return "✅ Vote recorded!", False
+            for index in current:
+                counts[index] -= 1
+            votes[user_id] = [option_index]
+            counts[option_index] += 1
+            return "✅ Vote recorded!", True
+
+        if option_index in current:
+            current.remove(option_index)
+            counts[option_index] -= 1
+            if not current:
+                votes.pop(user_id)
+            return "❌ Vote removed!", True
+        if len(current) >= int(poll_data['settings'].get('max_votes', len(counts))):
+            return "⚠️ Maximum votes reached!", False
+        votes[user_id] = current + [option_index]
+        counts[option_index] += 1
+        return "✅ Vote added!", True
+
+    def votes_changed(self, poll_id: str):
+        # Votes arriving within the debounce window collapse into a single edit
+        self.bot.persistence.mark_dirty(self.data_file)
+        if poll_id in self.active_polls and poll_id not in self.embed_updates:
+            self.embed_updates[poll_id] = asyncio.create_task(self.update_poll_embed(poll_id))
+
+    async def update_poll_embed(self, poll_id: str):
+        try:
+            await asyncio.sleep(self.embed_debounce)
+        finally:
+            self.embed_updates.pop(poll_id, None)
+
+        poll_data = self.active_polls.get(poll_id)
+        if not poll_data or tuple(poll_data['counts']) == self.shown_counts.get(poll_id):
+            return
+        channel = self.bot.get_channel(poll_data['channel_id'])
+        if not channel:
+            return
+        self.shown_counts[poll_id] = tuple(poll_data['counts'])
+        try:
+            await channel.get_partial_message(poll_data['message_id']).edit(embed=self.create_poll_embed(poll_data))
+        except discord.HTTPException as e:
+            print(f"Error updating poll {poll_id}: {e}")
 
     class PollSettingsModal(discord.ui.Modal):
         def __init__(self, poll_data: Dict):
@@ -15319,22 +17711,9 @@ class AdvancedPollSystem(commands.Cog):
                     row=i // 4
                 )
                 async def vote_callback(interaction, button=vote_button, option_index=i):
-                    user_id = str(interaction.user.id)
-                    if poll_data['settings']['type'] == 'single':
-                        poll_data['votes'][user_id] = [option_index]
-                        message = "✅ Vote recorded!"
-                    else:
-                        if user_id not in poll_data['votes']:
-                            poll_data['votes'][user_id] = []
-                        if option_index in poll_data['votes'][user_id]:
-                            poll_data['votes'][user_id].remove(option_index)
-                            message = "❌ Vote removed!"
-                        else:
-                            poll_data['votes'][user_id].append(option_index)
-                            message = "✅ Vote added!"
-                    
-                    embed = cog.create_poll_embed(poll_data)
-                    await interaction.message.edit(embed=embed)
+                    message, changed = cog.apply_vote(poll_data, str(interaction.user.id), option_index)
+                    if changed:
+                        cog.votes_changed(poll_data['id'])
                     await interaction.response.send_message(message, ephemeral=True)
                 
                 vote_button.callback = vote_callback
@@ -15381,6 +17760,7 @@ class AdvancedPollSystem(commands.Cog):
             'advanced': {'end_time': duration, 'required_role': 0},
             'author_id': interaction.user.id,
             'author': str(interaction.user),
+            'guild_id': interaction.guild_id,
             'channel_id': interaction.channel_id,
             'created_at': datetime.now(),
             'votes': {},
@@ -15395,10 +17775,7 @@ class AdvancedPollSystem(commands.Cog):
         await interaction.response.send_message(embed=embed, view=view)
         message = await interaction.original_response()
         poll_data['message_id'] = message.id
-        
-        self.active_polls[poll_id] = poll_data
-        self.vote_locks[poll_id] = asyncio.Lock()
-        self.poll_tasks[poll_id] = asyncio.create_task(self.start_poll_timer(poll_data))
+        await self.start_poll(poll_data)
         
         return message
             
@@ -15408,12 +17785,18 @@ class AdvancedPollSystem(commands.Cog):
             description=self.get_poll_description(poll_data),
             color=discord.Color(poll_data['settings'].get('color', 0x3498db))
         )
+        counts = poll_data.get('counts') or [0] * len(poll_data['options'])
+        total_votes = len(poll_data['votes'])
+        show_counts = not poll_data['settings'].get('hide_results', False)
         
         for i, option in enumerate(poll_data['options']):
             option_text = option.text if isinstance(option, PollOption) else str(option)
             emoji = option.emoji if isinstance(option, PollOption) else None
             
             value = f"{emoji} {option_text}" if emoji else option_text
+            if show_counts:
+                percentage = (counts[i] / total_votes * 100) if total_votes > 0 else 0
+                value += f"\n{self.generate_progress_bar(percentage, 10)} ({counts[i]} votes)"
             embed.add_field(
                 name=f"Option {i+1}",
                 value=value,
@@ -15453,7 +17836,7 @@ class AdvancedPollSystem(commands.Cog):
        
     async def cog_unload(self):
         
-        for task in self.poll_tasks.values():
+        for task in self.embed_updates.values():
             task.cancel()
         
     async def create_poll(self, ctx, question: str, options: List[str],
@@ -15464,10 +17847,12 @@ class AdvancedPollSystem(commands.Cog):
         
         if isinstance(ctx, discord.Interaction):
             user = ctx.user
+            guild_id = ctx.guild_id
             channel_id = ctx.channel_id
             send = ctx.response.send_message
         else:
             user = ctx.author
+            guild_id = ctx.guild.id
             channel_id = ctx.channel.id
             send = ctx.send
 
@@ -15481,6 +17866,7 @@ class AdvancedPollSystem(commands.Cog):
             'advanced': {'end_time': duration, 'required_role': 0},
             'author_id': user.id,
             'author': str(user),
+            'guild_id': guild_id,
             'channel_id': channel_id,
             'created_at': datetime.now(),
             'votes': {},
@@ -15495,11 +17881,7 @@ class AdvancedPollSystem(commands.Cog):
         try:
             message = await send(embed=embed, view=view)
             poll_data['message_id'] = message.id
-            self.active_polls[poll_id] = poll_data
-            
-            self.poll_tasks[poll_id] = asyncio.create_task(
-                self.start_poll_timer(poll_data)
-            )
+            await self.start_poll(poll_data)
             
             return message
         except Exception as e:
@@ -15516,13 +17898,29 @@ class AdvancedPollSystem(commands.Cog):
             'hide_results': False,
             'color': 0x3498db
         }
-    async def start_poll_timer(self, poll_data: Dict):
+    async def start_poll(self, poll_data: Dict):
         duration = self.parse_duration(poll_data['advanced']['end_time'])
-        end_time = datetime.now() + timedelta(seconds=duration)
-        poll_data['end_timestamp'] = end_time.timestamp()
-        
-        await asyncio.sleep(duration)
-        
+        poll_data['end_timestamp'] = time.time() + duration
+        self.track_poll(poll_data)
+        self.bot.persistence.mark_dirty(self.data_file)
+        await self.bot.scheduler.schedule(
+            f"poll:{poll_data['id']}", 'poll_end', poll_data['end_timestamp'],
+            {"poll_id": poll_data['id']}, guild_id=poll_data.get('guild_id')
+        )
+
+    async def end_scheduled_poll(self, payload):
+        poll_data = self.active_polls.get(payload["poll_id"])
+        if poll_data:
+            await self.finish_poll(poll_data)
+
+    async def finish_poll(self, poll_data: Dict):
+        self.active_polls.pop(poll_data['id'], None)
+        self.shown_counts.pop(poll_data['id'], None)
+        update = self.embed_updates.pop(poll_data['id'], None)
+        if update:
+            update.cancel()
+        self.bot.persistence.mark_dirty(self.data_file)
+
         channel = self.bot.get_channel(poll_data['channel_id'])
         if channel:
             try:
@@ -15540,8 +17938,7 @@ class AdvancedPollSystem(commands.Cog):
                 
                 total_votes = len(poll_data.get('votes', {}))
                 for i, option in enumerate(poll_data['options']):
-                    votes = sum(1 for vote_list in poll_data.get('votes', {}).values() 
-                            if isinstance(vote_list, list) and i in vote_list)
+                    votes = poll_data['counts'][i]
                     percentage = (votes / total_votes * 100) if total_votes > 0 else 0
                     results_embed.add_field(
                         name=option,
@@ -15586,7 +17983,7 @@ class AdvancedPollSystem(commands.Cog):
             await channel.send(embed=results_embed)
             
             self.active_polls.pop(poll_data['id'], None)
-            self.vote_locks.pop(poll_data['id'], None)
+            self.bot.persistence.mark_dirty(self.data_file)
             
         except discord.NotFound:
             print(f"Poll message not found: {poll_data['id']}")
@@ -15683,27 +18080,10 @@ class AdvancedPollSystem(commands.Cog):
             poll_data = self.view.poll_data
             user_id = str(interaction.user.id)
             
-            async with self.view.cog.get_vote_lock(poll_data['id']):
-                if user_id not in poll_data['votes']:
-                    poll_data['votes'][user_id] = []
-
-                if self.poll_type == 'single':
-                    poll_data['votes'][user_id] = [self.option_num]
-                    message = "✅ Vote recorded!"
-                else:
-                    current_votes = poll_data['votes'][user_id]
-                    if self.option_num in current_votes:
-                        current_votes.remove(self.option_num)
-                        message = "❌ Vote removed!"
-                    elif len(current_votes) < poll_data['settings']['max_votes']:
-                        current_votes.append(self.option_num)
-                        message = "✅ Vote added!"
-                    else:
-                        message = "⚠️ Maximum votes reached!"
-
-                embed = self.view.cog.create_poll_embed(poll_data)
-                await interaction.message.edit(embed=embed)
-                await interaction.response.send_message(message, ephemeral=True)
+            message, changed = self.view.cog.apply_vote(poll_data, user_id, self.option_num)
+            if changed:
+                self.view.cog.votes_changed(poll_data['id'])
+            await interaction.response.send_message(message, ephemeral=True)
 
 
     class ResultsButton(discord.ui.Button):
@@ -15834,6 +18214,7 @@ class AdvancedPollSystem(commands.Cog):
                     'advanced': {'end_time': self.children[3].value, 'required_role': 0},
                     'author_id': interaction.user.id,
                     'author': str(interaction.user),
+                    'guild_id': interaction.guild_id,
                     'channel_id': interaction.channel_id,
                     'created_at': datetime.now(),
                     'votes': {},
@@ -15848,9 +18229,7 @@ class AdvancedPollSystem(commands.Cog):
                 
                 message = await interaction.original_response()
                 poll_data['message_id'] = message.id
-                self.cog.active_polls[poll_id] = poll_data
-                self.cog.vote_locks[poll_id] = asyncio.Lock()
-                self.cog.poll_tasks[poll_id] = asyncio.create_task(self.cog.start_poll_timer(poll_data))
+                await self.cog.start_poll(poll_data)
 
             except Exception as e:
                 print(f"Poll creation error: {e}")
@@ -15931,8 +18310,7 @@ class AdvancedPollSystem(commands.Cog):
             return f"{option}\n📊 {points} points"
         
         else:
-            votes = len([1 for vote_list in poll_data.get('votes', {}).values()
-                        if option_index in vote_list])
+            votes = poll_data['counts'][option_index]
             percentage = (votes / total_votes * 100) if total_votes > 0 else 0
             bar = self.generate_progress_bar(percentage)
             return f"{option}\n{bar} ({votes} votes)"
@@ -15952,11 +18330,10 @@ class AdvancedPollSystem(commands.Cog):
 class ISBNLookup(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
         
     @commands.command(name="isbn")
     async def isbn_lookup(self, ctx, isbn: str):
-        async with self.session.get(f"https://openlibrary.org/api/books?bibkeys=ISBN:{isbn}&format=json&jscmd=data") as response:
+        async with self.bot.http_client.get(f"https://openlibrary.org/api/books?bibkeys=ISBN:{isbn}&format=json&jscmd=data") as response:
             if response.status == 200:
                 data = await response.json()
                 book_data = data.get(f"ISBN:{isbn}")
@@ -16498,12 +18875,262 @@ class RNGRangeModal(discord.ui.Modal, title="Change RNG Range"):
             await interaction.response.send_message(f"Error: {str(e)}", ephemeral=True)
 
 
+class SpaceSavingCounter:
+    """Heavy-hitters counter that never tracks more than ``capacity`` items.
+
+    When full, a new item replaces the current minimum and inherits its count
+    (the Space-Saving algorithm), so frequent items are kept with a bounded
+    overestimate while the long tail costs no memory. A lazy min-heap finds the
+    item to evict.
+    """
+
+    __slots__ = ('capacity', 'counts', 'heap')
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}
+        self.heap = []
+
+    def __len__(self):
+        return len(self.counts)
+
+    def add(self, item, amount=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += amount
+            return
+        if len(counts) < self.capacity:
+            counts[item] = amount
+            heapq.heappush(self.heap, (amount, item))
+            return
+
+        # Heap entries go stale as counts grow; re-push them until the true minimum surfaces
+        while True:
+            count, victim = heapq.heappop(self.heap)
+            current = counts.get(victim)
+            if current is None:
+                continue
+            if current != count:
+                heapq.heappush(self.heap, (current, victim))
+                continue
+            break
+        del counts[victim]
+        counts[item] = count + amount
+        heapq.heappush(self.heap, (count + amount, item))
+
+    def merge(self, other):
+        for item, count in other.counts.items():
+            self.add(item, count)
+
+    def top(self, limit=10):
+        return heapq.nlargest(limit, self.counts.items(), key=lambda entry: entry[1])
+
+
+class DistinctCounter:
+    """HyperLogLog estimate of how many distinct items were seen (1 KB of registers)."""
+
+    __slots__ = ('registers',)
+    PRECISION = 10
+    SIZE = 1 << PRECISION
+
+    def __init__(self):
+        self.registers = bytearray(self.SIZE)
+
+    def add(self, item):
+        # Python hashes small ints to themselves, so mix the bits before bucketing
+        value = hash(item) & 0xFFFFFFFFFFFFFFFF
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        value ^= value >> 31
+        index = value & (self.SIZE - 1)
+        rank = 64 - self.PRECISION - (value >> self.PRECISION).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        zeros = self.registers.count(0)
+        if zeros == self.SIZE:
+            return 0
+        alpha = 0.7213 / (1 + 1.079 / self.SIZE)
+        estimate = alpha * self.SIZE * self.SIZE / sum(2.0 ** -register for register in self.registers)
+        if estimate <= 2.5 * self.SIZE and zeros:
+            estimate = self.SIZE * math.log(self.SIZE / zeros)
+        return int(round(estimate))
+
+
+class TokenBucket:
+    """Word, emoji, user and channel counters for one time slice of a guild."""
+
+    __slots__ = ('start', 'messages', 'total_words', 'words', 'emojis', 'hours', 'users', 'user_words', 'channel_words', 'vocabulary', 'folded')
+
+    def __init__(self, start, word_capacity=500):
+        self.start = start
+        self.messages = 0
+        self.total_words = 0
+        self.words = SpaceSavingCounter(word_capacity)
+        self.emojis = SpaceSavingCounter(64)
+        self.hours = [0] * 24
+        self.users = DistinctCounter()
+        self.user_words = SpaceSavingCounter(100)
+        self.channel_words = SpaceSavingCounter(100)
+        self.vocabulary = DistinctCounter()
+        self.folded = False
+
+    def add(self, words, frequent_words, emojis, user_id, channel_id, hour):
+        self.messages += 1
+        self.total_words += len(words)
+        self.hours[hour] += 1
+        self.users.add(user_id)
+        self.user_words.add(user_id, len(words))
+        self.channel_words.add(channel_id, len(words))
+        for word in words:
+            self.vocabulary.add(word)
+        for word in frequent_words:
+            self.words.add(word)
+        for char in emojis:
+            self.emojis.add(char)
+
+    def merge(self, other):
+        self.messages += other.messages
+        self.total_words += other.total_words
+        self.hours = [a + b for a, b in zip(self.hours, other.hours)]
+        self.users.merge(other.users)
+        self.user_words.merge(other.user_words)
+        self.channel_words.merge(other.channel_words)
+        self.vocabulary.merge(other.vocabulary)
+        self.words.merge(other.words)
+        self.emojis.merge(other.emojis)
+
+
+class GuildTokenIndex:
+    """Rolling per-guild message-content index.
+
+    Messages land in hourly buckets; once an hour is over it is folded into its
+    day and week buckets. A timeframe query merges only the buckets it covers:
+    ``hour``/``day`` read hourly buckets, ``week``/``month`` daily ones and
+    ``year`` weekly ones, plus the still-open hour.
+    """
+
+    HOUR, DAY, WEEK = 3600, 86400, 7 * 86400
+    RETENTION = {'hourly': 48 * 3600, 'daily': 35 * 86400, 'weekly': 53 * 7 * 86400}
+    TIMEFRAMES = {
+        'hour': ('hourly', 3600),
+        'day': ('hourly', 86400),
+        'week': ('daily', 7 * 86400),
+        'month': ('daily', 30 * 86400),
+        'year': ('weekly', 365 * 86400)
+    }
+
+    def __init__(self, word_capacity=500):
+        self.word_capacity = word_capacity
+        self.tiers = {'hourly': {}, 'daily': {}, 'weekly': {}}
+        self.last_seen = 0
+
+    def _bucket(self, tier, start):
+        buckets = self.tiers[tier]
+        bucket = buckets.get(start)
+        if bucket is None:
+            bucket = buckets[start] = TokenBucket(start, self.word_capacity)
+        return bucket
+
+    def _rollups(self, start):
+        # Weeks start on Monday; the unix epoch was a Thursday
+        week_start = int((start + 3 * self.DAY) // self.WEEK) * self.WEEK - 3 * self.DAY
+        return self._bucket('daily', int(start // self.DAY) * self.DAY), self._bucket('weekly', week_start)
+
+    def roll(self, now):
+        current_hour = int(now // self.HOUR) * self.HOUR
+        for start, bucket in self.tiers['hourly'].items():
+            if start < current_hour and not bucket.folded:
+                for rollup in self._rollups(start):
+                    rollup.merge(bucket)
+                bucket.folded = True
+        for tier, retention in self.RETENTION.items():
+            buckets = self.tiers[tier]
+            for start in [start for start in buckets if start < now - retention]:
+                del buckets[start]
+
+    def add(self, timestamp, words, frequent_words, emojis, user_id, channel_id, hour):
+        self.last_seen = max(self.last_seen, timestamp)
+        start = int(timestamp // self.HOUR) * self.HOUR
+        if start not in self.tiers['hourly']:
+            self.roll(self.last_seen)
+        bucket = self._bucket('hourly', start)
+        bucket.add(words, frequent_words, emojis, user_id, channel_id, hour)
+        if bucket.folded:
+            # A late message for an hour that was already folded
+            for rollup in self._rollups(start):
+                rollup.add(words, frequent_words, emojis, user_id, channel_id, hour)
+
+    def summary(self, timeframe, now=None):
+        now = now or time.time()
+        self.roll(now)
+        tier, span = self.TIMEFRAMES.get(timeframe, self.TIMEFRAMES['day'])
+        size = {'hourly': self.HOUR, 'daily': self.DAY, 'weekly': self.WEEK}[tier]
+        merged = TokenBucket(now - span, self.word_capacity * 2)
+        for start, bucket in self.tiers[tier].items():
+            if start + size > now - span:
+                merged.merge(bucket)
+        if tier != 'hourly':
+            for bucket in self.tiers['hourly'].values():
+                if not bucket.folded:
+                    merged.merge(bucket)
+        return merged
+
+    def is_empty(self):
+        return not any(self.tiers.values())
+
+
 class WordAnalytics(commands.Cog):
+    COMMON_WORDS = {'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at'}
+
     def __init__(self, bot):
         self.bot = bot
-        self.word_stats = {}
-        self.channel_stats = {}
-        self.user_stats = {}
+        self.indexes = {}
+
+    def guild_index(self, guild_id):
+        index = self.indexes.get(guild_id)
+        if index is None:
+            index = self.indexes[guild_id] = GuildTokenIndex()
+        return index
+
+    def index_message(self, message):
+        if not message.content:
+            return
+        # Tokenised once; every counter below works off these lists
+        words = message.content.lower().split()
+        frequent_words = [word for word in words if len(word) > 3 and word not in self.COMMON_WORDS]
+        emojis = [char for char in message.content if char in emoji.EMOJI_DATA]
+        self.guild_index(message.guild.id).add(
+            message.created_at.timestamp(),
+            words,
+            frequent_words,
+            emojis,
+            message.author.id,
+            message.channel.id,
+            message.created_at.hour
+        )
+
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN)
+    async def on_message(self, message):
+        self.index_message(message)
+
+    @tasks.loop(hours=1)
+    async def prune_indexes(self):
+        now = time.time()
+        for guild_id, index in list(self.indexes.items()):
+            index.roll(now)
+            if index.is_empty():
+                del self.indexes[guild_id]
+
+    async def cog_load(self):
+        self.prune_indexes.start()
+
+    async def cog_unload(self):
+        self.prune_indexes.cancel()
 
     def get_time_threshold(self, timeframe: str) -> datetime:
         now = datetime.now(timezone.utc)
@@ -16525,20 +19152,19 @@ class WordAnalytics(commands.Cog):
             description=f"Statistics for the last {timeframe}"
         )
         
-        view = WordStatsView(self.bot)
-        time_threshold = self.get_time_threshold(timeframe)
-        filtered_messages = [msg for msg in self.bot.cached_messages 
-                           if msg.created_at > time_threshold]
+        timeframe = timeframe.lower()
+        if timeframe not in GuildTokenIndex.TIMEFRAMES:
+            timeframe = "day"
+        summary = self.guild_index(ctx.guild.id).summary(timeframe)
+        view = WordStatsView(self.bot, summary)
 
         stats = {
-            "total_words": sum(len(msg.content.split()) for msg in filtered_messages),
-            "unique_words": len(set(word.lower() for msg in filtered_messages 
-                                  for word in msg.content.split())),
-            "avg_words_per_msg": round(sum(len(msg.content.split()) 
-                                         for msg in filtered_messages) / max(len(filtered_messages), 1), 2),
-            "emoji_usage": analyze_emoji_usage(" ".join(msg.content for msg in filtered_messages)),
-            "active_users": len(set(msg.author.id for msg in filtered_messages)),
-            "total_messages": len(filtered_messages)
+            "total_words": summary.total_words,
+            "unique_words": summary.vocabulary.count(),
+            "avg_words_per_msg": round(summary.total_words / max(summary.messages, 1), 2),
+            "emoji_usage": dict(summary.emojis.top(10)),
+            "active_users": summary.users.count(),
+            "total_messages": summary.messages
         }
 
         embed.add_field(name="Total Words", value=f"📝 {stats['total_words']:,}", inline=True)
@@ -16547,7 +19173,7 @@ class WordAnalytics(commands.Cog):
         embed.add_field(name="Active Users", value=f"👥 {stats['active_users']:,}", inline=True)
         embed.add_field(name="Total Messages", value=f"💬 {stats['total_messages']:,}", inline=True)
 
-        word_freq = self.get_word_frequency(filtered_messages)
+        word_freq = summary.words.top(5)
         top_words = "\n".join(f"`{word}`: {count:,} times" 
                              for word, count in word_freq[:5])
         embed.add_field(name="Top Words", value=top_words or "No words found", inline=False)
@@ -16557,34 +19183,18 @@ class WordAnalytics(commands.Cog):
         if top_emojis:
             embed.add_field(name="Top Emojis", value=top_emojis, inline=False)
 
-        user_activity = self.generate_activity_chart(filtered_messages)
+        user_activity = self.generate_activity_chart(summary.hours)
         embed.set_image(url="attachment://activity_chart.png")
         embed.set_footer(text=f"Generated at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
         await ctx.send(embed=embed, view=view, file=discord.File(user_activity, "activity_chart.png"))
 
-    def get_word_frequency(self, messages):
-        word_counts = {}
-        common_words = {'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'i', 'it', 'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at'}
-        
-        for msg in messages:
-            if not msg.content:
-                continue
-            words = msg.content.lower().split()
-            for word in words:
-                if len(word) > 3 and word not in common_words:
-                    word_counts[word] = word_counts.get(word, 0) + 1
-        return sorted(word_counts.items(), key=lambda x: x[1], reverse=True)
-
-    def generate_activity_chart(self, messages):
+    def generate_activity_chart(self, hours):
         width, height = 800, 400
         img = Image.new('RGB', (width, height), color='white')
         draw = ImageDraw.Draw(img)
 
-        hour_counts = {}
-        for msg in messages:
-            hour = msg.created_at.hour
-            hour_counts[hour] = hour_counts.get(hour, 0) + 1
+        hour_counts = {hour: count for hour, count in enumerate(hours) if count}
 
         draw.line([(50, 350), (750, 350)], fill='black', width=2)
         draw.line([(50, 50), (50, 350)], fill='black', width=2)
@@ -16612,22 +19222,23 @@ class WordAnalytics(commands.Cog):
         return buffer
 
 class WordStatsView(View):
-    def __init__(self, bot):
+    def __init__(self, bot, summary):
         super().__init__(timeout=180)
         self.bot = bot
+        self.summary = summary
+
+    def member_name(self, guild, user_id):
+        member = guild.get_member(user_id) if guild else None
+        return member.name if member else str(user_id)
+
+    def channel_name(self, guild, channel_id):
+        channel = guild.get_channel(channel_id) if guild else None
+        return channel.name if channel else str(channel_id)
 
     @discord.ui.button(label="Most Used Words", style=ButtonStyle.primary)
     async def most_used_words(self, interaction: discord.Interaction, button: discord.ui.Button):
         embed = discord.Embed(title="📊 Most Used Words", color=discord.Color.blue())
-        word_counts = {}
-        for msg in self.bot.cached_messages:
-            if msg.content:
-                words = msg.content.lower().split()
-                for word in words:
-                    if len(word) > 3:
-                        word_counts[word] = word_counts.get(word, 0) + 1
-        
-        top_words = sorted(word_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        top_words = self.summary.words.top(10)
         stats_text = "\n".join(f"`{word}`: {count:,} times" for word, count in top_words)
         embed.description = stats_text or "No words found"
         await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -16635,26 +19246,16 @@ class WordStatsView(View):
     @discord.ui.button(label="User Activity", style=ButtonStyle.success)
     async def user_activity(self, interaction: discord.Interaction, button: discord.ui.Button):
         embed = discord.Embed(title="👥 User Activity Stats", color=discord.Color.green())
-        user_stats = {}
-        for msg in self.bot.cached_messages:
-            user_stats[msg.author.name] = user_stats.get(msg.author.name, 0) + len(msg.content.split())
-        
-        top_users = sorted(user_stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        stats_text = "\n".join(f"`{user}`: {count:,} words" for user, count in top_users)
+        top_users = self.summary.user_words.top(5)
+        stats_text = "\n".join(f"`{self.member_name(interaction.guild, user_id)}`: {count:,} words" for user_id, count in top_users)
         embed.description = stats_text or "No user activity found"
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @discord.ui.button(label="Channel Stats", style=ButtonStyle.secondary)
     async def channel_stats(self, interaction: discord.Interaction, button: discord.ui.Button):
         embed = discord.Embed(title="📊 Channel Statistics", color=discord.Color.greyple())
-        channel_stats = {}
-        
-        for msg in self.bot.cached_messages:
-            channel_name = getattr(msg.channel, 'name', 'Direct Messages')
-            channel_stats[channel_name] = channel_stats.get(channel_name, 0) + len(msg.content.split())
-        
-        top_channels = sorted(channel_stats.items(), key=lambda x: x[1], reverse=True)[:5]
-        stats_text = "\n".join(f"#{channel}: {count:,} words" for channel, count in top_channels)
+        top_channels = self.summary.channel_words.top(5)
+        stats_text = "\n".join(f"#{self.channel_name(interaction.guild, channel_id)}: {count:,} words" for channel_id, count in top_channels)
         embed.description = stats_text or "No channel statistics found"
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
@@ -16664,25 +19265,17 @@ class WordStatsView(View):
             "timestamp": datetime.now().isoformat(),
             "server_name": interaction.guild.name,
             "statistics": {
-                "word_frequency": {},
-                "user_activity": {},
-                "channel_activity": {}
+                "word_frequency": dict(self.summary.words.top(len(self.summary.words))),
+                "user_activity": {
+                    self.member_name(interaction.guild, user_id): count
+                    for user_id, count in self.summary.user_words.top(len(self.summary.user_words))
+                },
+                "channel_activity": {
+                    self.channel_name(interaction.guild, channel_id): count
+                    for channel_id, count in self.summary.channel_words.top(len(self.summary.channel_words))
+                }
             }
         }
-        
-        for msg in self.bot.cached_messages:
-            if msg.content:
-                words = msg.content.lower().split()
-                for word in words:
-                    if len(word) > 3:
-                        stats_data["statistics"]["word_frequency"][word] = \
-                            stats_data["statistics"]["word_frequency"].get(word, 0) + 1
-                
-                stats_data["statistics"]["user_activity"][msg.author.name] = \
-                    stats_data["statistics"]["user_activity"].get(msg.author.name, 0) + len(words)
-                
-                stats_data["statistics"]["channel_activity"][msg.channel.name] = \
-                    stats_data["statistics"]["channel_activity"].get(msg.channel.name, 0) + len(words)
 
         file = discord.File(
             BytesIO(json.dumps(stats_data, indent=2).encode()),
@@ -17207,9 +19800,7 @@ class IPLookupTools(commands.Cog):
     @commands.command(name="iplookup")
     async def ip_lookup(self, ctx, ip_address: str):
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f'http://ip-api.com/json/{ip_address}') as response:
-                    data = await response.json()
+            data = await self.bot.http_client.fetch_json(f'http://ip-api.com/json/{ip_address}')
                     
             if data['status'] == 'success':
                 
@@ -17310,7 +19901,6 @@ class IPLookupTools(commands.Cog):
 class URLStatusChecker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.session = aiohttp.ClientSession()
         self.check_history = {}
         self.rate_limiter = {}
         self.status_colors = {
@@ -17355,7 +19945,7 @@ class URLStatusChecker(commands.Cog):
             await interaction.response.defer()
             try:
                 start_time = time.time()
-                async with self.cog.session.get(str(self.url), timeout=10) as response:
+                async with self.cog.bot.http_client.get(str(self.url), timeout=10, retries=0) as response:
                     end_time = time.time()
                     response_time = round((end_time - start_time) * 1000)
                     
@@ -17411,10 +20001,6 @@ class URLStatusChecker(commands.Cog):
         view = self.URLCheckerView(self)
         await ctx.send(embed=embed, view=view)
 
-    async def cog_unload(self):
-        if not self.session.closed:
-            await self.session.close()
-
 class URLInputModal(discord.ui.Modal):
     def __init__(self, cog):
         super().__init__(title="URL Status Checker")
@@ -17430,7 +20016,7 @@ class URLInputModal(discord.ui.Modal):
         await interaction.response.defer()
         try:
             start_time = time.time()
-            async with self.cog.session.get(str(self.url), timeout=10) as response:
+            async with self.cog.bot.http_client.get(str(self.url), timeout=10, retries=0) as response:
                 end_time = time.time()
                 response_time = round((end_time - start_time) * 1000)
                 
@@ -17506,7 +20092,7 @@ class URLMonitorModal(discord.ui.Modal):
             for _ in range(duration):
                 try:
                     start_time = time.time()
-                    async with self.cog.session.get(str(self.url), timeout=10) as response:
+                    async with self.cog.bot.http_client.get(str(self.url), timeout=10, retries=0) as response:
                         end_time = time.time()
                         response_time = round((end_time - start_time) * 1000)
                         
@@ -17606,8 +20192,8 @@ class ASCIIGeneratorView(discord.ui.View):
 
     async def process_image(self, message):
         try:
-            response = requests.get(message.attachments[0].url)
-            image = Image.open(BytesIO(response.content)).convert('RGB')
+            image_bytes = await message.attachments[0].read()
+            image = Image.open(BytesIO(image_bytes)).convert('RGB')
             
             ascii_art = self.create_ascii_art(image)
             colored_art = self.create_colored_ascii(image)
@@ -17957,31 +20543,30 @@ class URLShortener(commands.Cog):
         guild_id = str(ctx.guild.id)
         user_id = str(ctx.author.id)
 
-        async with aiohttp.ClientSession() as session:
-            params = {'url': url}
-            async with session.get(self.tinyurl_api, params=params) as response:
-                if response.status == 200:
-                    shortened_url = await response.text()
-                    
-                    if guild_id not in self.url_data:
-                        self.url_data[guild_id] = {}
-                    if user_id not in self.url_data[guild_id]:
-                        self.url_data[guild_id][user_id] = {}
-                    
-                    timestamp = datetime.now().isoformat()
-                    self.url_data[guild_id][user_id][shortened_url] = {
-                        'original_url': url,
-                        'created_at': timestamp,
-                        'clicks': 0
-                    }
-                    self.save_url_data()
+        params = {'url': url}
+        async with self.bot.http_client.get(self.tinyurl_api, params=params) as response:
+            if response.status == 200:
+                shortened_url = await response.text()
+                
+                if guild_id not in self.url_data:
+                    self.url_data[guild_id] = {}
+                if user_id not in self.url_data[guild_id]:
+                    self.url_data[guild_id][user_id] = {}
+                
+                timestamp = datetime.now().isoformat()
+                self.url_data[guild_id][user_id][shortened_url] = {
+                    'original_url': url,
+                    'created_at': timestamp,
+                    'clicks': 0
+                }
+                self.save_url_data()
 
-                    embed = discord.Embed(
-                        title="URL Shortened Successfully",
-                        description=f"Original URL: {url}\nShortened URL: {shortened_url}",
-                        color=discord.Color.green()
-                    )
-                    await ctx.send(embed=embed)
+                embed = discord.Embed(
+                    title="URL Shortened Successfully",
+                    description=f"Original URL: {url}\nShortened URL: {shortened_url}",
+                    color=discord.Color.green()
+                )
+                await ctx.send(embed=embed)
 
 class StudyTools(commands.Cog):
     def __init__(self, bot):
@@ -19119,10 +21704,8 @@ class EmotionalSupportCog(commands.Cog):
             "Take care, and remember that there’s always light ahead. 💫\n\nGreetings, Z"
         )
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.DM)
     async def on_message(self, message):
-        if message.guild:  
-            return           
         if message.author == self.bot.user:
             return
 
@@ -19646,15 +22229,38 @@ class AI_CHAT(commands.Cog):
         }
         self.default_model = "gpt-3.5-turbo"
         self.channel_states = {}
-        self.conversation_history = {}
+        self.memory_file = "data/ai_chat_memory.json"
+        summarize = os.getenv('AI_MEMORY_SUMMARIES', 'false').lower() in ('true', '1', 'yes', 'on')
+        self.memory = ConversationMemory(summarizer=self.summarize if summarize else None)
         self.api_key = os.getenv('OPENAI_API_KEY')  
-        self.rate_limits = {}  
         self.rate_limit_cooldown = 30  
 
+        if os.getenv('AI_MEMORY_PERSIST', 'false').lower() in ('true', '1', 'yes', 'on'):
+            if os.path.exists(self.memory_file):
+                try:
+                    with open(self.memory_file, 'r', encoding='utf-8') as f:
+                        self.memory.load(json.load(f))
+                except (json.JSONDecodeError, OSError) as e:
+                    print(f"Failed to load AI chat memory: {e}")
+            self.bot.persistence.register(self.memory_file, self.memory_file, self.memory.snapshot)
         
         if not self.api_key:
             print("⚠️ Warning: OPENAI_API_KEY not found in .env file")
 
+    async def summarize(self, summary, turns):
+        transcript = "\n".join(f"{role}: {content}" for role, content in turns)
+        status, data = await self.bot.ai_client.openai_chat(self.api_key, self.default_model, [
+            {"role": "system", "content": "Merge the previous summary and the new messages into one short summary of at most 100 words."},
+            {"role": "user", "content": f"Previous summary: {summary or 'None'}\n\nNew messages:\n{transcript}"}
+        ], temperature=0.2)
+        if status == 200:
+            return data['choices'][0]['message']['content']
+        return summary
+
+    def remember(self, channel_id, role, content):
+        self.memory.append(channel_id, role, content)
+        self.bot.persistence.mark_dirty(self.memory_file)
+
 
     @commands.command(name="ai_info")
     async def ai_info(self, ctx):
@@ -19756,6 +22362,8 @@ class AI_CHAT(commands.Cog):
             channel_id = self.ai_channels[guild_id].get("channel")
             if channel_id:
                 del self.channel_states[channel_id]
+                self.memory.drop(channel_id)
+                self.bot.persistence.mark_dirty(self.memory_file)
             del self.ai_channels[guild_id]
             await ctx.send("✅ AI chat configuration has been reset")
         else:
@@ -19793,12 +22401,8 @@ class AI_CHAT(commands.Cog):
         else:
             await ctx.send("❌ No AI chat channel found")
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN, background=True)
     async def on_message(self, message):
-        if message.author.bot:
-            return
-        if message.guild is None:
-            return  # Skip processing for DM messages
         guild_id = message.guild.id
 
         if guild_id not in self.ai_channels:
@@ -19812,16 +22416,14 @@ class AI_CHAT(commands.Cog):
             return
 
         user_id = message.author.id
-        current_time = time.time()
+        rate_windows = self.bot.rate_windows
         
-        if user_id in self.rate_limits:
-            last_request = self.rate_limits[user_id]
-            if current_time - last_request < self.rate_limit_cooldown:
-                remaining_time = int(self.rate_limit_cooldown - (current_time - last_request))
-                await message.reply(f"🕒 Please wait {remaining_time} seconds before sending another message!")
-                return
+        if rate_windows.count(guild_id, user_id, "ai_chat", self.rate_limit_cooldown):
+            remaining_time = int(self.rate_limit_cooldown - (time.monotonic() - rate_windows.last_hit(guild_id, user_id, "ai_chat")))
+            await message.reply(f"🕒 Please wait {max(remaining_time, 1)} seconds before sending another message!")
+            return
         
-        self.rate_limits[user_id] = current_time
+        rate_windows.hit(guild_id, user_id, "ai_chat", self.rate_limit_cooldown)
 
         try:
             async with message.channel.typing():
@@ -19831,63 +22433,42 @@ class AI_CHAT(commands.Cog):
                     await message.channel.send("⚠️ OpenAI API key not configured!")
                     return
 
-                if guild_id not in self.conversation_history:
-                    self.conversation_history[guild_id] = []
-                
-                self.conversation_history[guild_id].append({"role": "user", "content": message.content})
-                
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
+                self.remember(channel_id, "user", message.content)
 
-                payload = {
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": "You are a helpful AI assistant."},
-                        *self.conversation_history[guild_id][-5:]  
-                    ],
-                    "temperature": 0.7
-                }
-
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        "https://api.openai.com/v1/chat/completions",
-                        headers=headers,
-                        json=payload
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            ai_response = data['choices'][0]['message']['content']
-                            
-                            self.conversation_history[guild_id].append(
-                                {"role": "assistant", "content": ai_response}
-                            )
-                            
-                            await message.reply(ai_response)
-                        elif response.status == 402:
-                            embed = discord.Embed(
-                                title="❌ Insufficient Credits",
-                                description="AI chat has been automatically paused. Please add credits to your OpenAI account.",
-                                color=discord.Color.red()
-                            )
-                            self.channel_states[channel_id] = False
-                            await message.channel.send(embed=embed)
-                        elif response.status == 429:
-                            embed = discord.Embed(
-                                title="⚠️ Rate Limited",
-                                description="Too many requests. Please try again in a few minutes.",
-                                color=discord.Color.orange()
-                            )
-                            await message.channel.send(embed=embed)
-                        else:
-                            error_data = await response.json()
-                            embed = discord.Embed(
-                                title="❌ API Error",
-                                description=error_data.get('error', {}).get('message', 'Unknown error'),
-                                color=discord.Color.red()
-                            )
-                            await message.channel.send(embed=embed)
+                status, data = await self.bot.ai_client.openai_chat(
+                    self.api_key,
+                    model,
+                    self.memory.messages(channel_id, system="You are a helpful AI assistant."),
+                    temperature=0.7
+                )
+                if status == 200:
+                    ai_response = data['choices'][0]['message']['content']
+                        
+                    self.remember(channel_id, "assistant", ai_response)
+                        
+                    await message.reply(ai_response)
+                elif status == 402:
+                    embed = discord.Embed(
+                        title="❌ Insufficient Credits",
+                        description="AI chat has been automatically paused. Please add credits to your OpenAI account.",
+                        color=discord.Color.red()
+                    )
+                    self.channel_states[channel_id] = False
+                    await message.channel.send(embed=embed)
+                elif status == 429:
+                    embed = discord.Embed(
+                        title="⚠️ Rate Limited",
+                        description="Too many requests. Please try again in a few minutes.",
+                        color=discord.Color.orange()
+                    )
+                    await message.channel.send(embed=embed)
+                else:
+                    embed = discord.Embed(
+                        title="❌ API Error",
+                        description=(data or {}).get('error', {}).get('message', 'Unknown error'),
+                        color=discord.Color.red()
+                    )
+                    await message.channel.send(embed=embed)
 
         except aiohttp.ClientError as e:
             embed = discord.Embed(
@@ -19905,15 +22486,223 @@ class AI_CHAT(commands.Cog):
             )
             await message.channel.send(embed=embed)
 
+class GuildMemberColumns:
+    """Per-guild member counters stored column-wise.
+
+    Every member that shows any activity gets a slot; each counter is an
+    ``array`` indexed by that slot, so a guild's metrics are a handful of flat
+    buffers instead of one nested dict per member. Members that never do
+    anything never get a slot. Sparse data (per-channel counts, role history)
+    is kept in side dicts keyed by slot.
+    """
+
+    COUNTERS = ('messages', 'voice_time', 'reactions', 'commands', 'replies', 'mentions', 'threads', 'reactions_given', 'reactions_received')
+    ENGAGEMENT = ('replies', 'mentions', 'threads', 'reactions_given', 'reactions_received')
+    ROLE_HISTORY_LIMIT = 20
+
+    def __init__(self, guild_id):
+        self.guild_id = guild_id
+        self.slots = {}
+        self.member_ids = array('q')
+        self.counters = {name: array('q') for name in self.COUNTERS}
+        self.activity_hours = array('q')
+        self.last_active = array('d')
+        self.channel_activity = {}
+        self.role_history = {}
+        self.dirty = set()
+
+    def __len__(self):
+        return len(self.member_ids)
+
+    def slot_for(self, member_id, create=True):
+        slot = self.slots.get(member_id)
+        if slot is None and create:
+            slot = len(self.member_ids)
+            self.slots[member_id] = slot
+            self.member_ids.append(member_id)
+            for column in self.counters.values():
+                column.append(0)
+            self.activity_hours.extend([0] * 24)
+            self.last_active.append(0.0)
+        return slot
+
+    def add(self, member_id, counter, amount=1, hour=None, channel_id=None):
+        slot = self.slot_for(member_id)
+        self.counters[counter][slot] += amount
+        if hour is not None:
+            self.activity_hours[slot * 24 + hour] += 1
+        if channel_id is not None:
+            channels = self.channel_activity.setdefault(slot, {})
+            channels[str(channel_id)] = channels.get(str(channel_id), 0) + 1
+        self.last_active[slot] = time.time()
+        self.dirty.add(slot)
+        return slot
+
+    def set_roles(self, member_id, role_names):
+        slot = self.slot_for(member_id)
+        history = self.role_history.setdefault(slot, [])
+        history.extend(role_names)
+        del history[:-self.ROLE_HISTORY_LIMIT]
+        self.dirty.add(slot)
+
+    def load_row(self, member_id, counters, activity_hours, channel_activity, role_history, last_active):
+        # Added rather than assigned, so activity seen before the load finished is kept
+        slot = self.slot_for(member_id)
+        for name, value in zip(self.COUNTERS, counters):
+            self.counters[name][slot] += value or 0
+        if activity_hours:
+            hours = array('q')
+            hours.frombytes(activity_hours)
+            for hour, count in enumerate(hours[:24]):
+                self.activity_hours[slot * 24 + hour] += count
+        if channel_activity:
+            channels = self.channel_activity.setdefault(slot, {})
+            for channel_id, count in json.loads(channel_activity).items():
+                channels[channel_id] = channels.get(channel_id, 0) + count
+        if role_history:
+            self.role_history[slot] = json.loads(role_history) + self.role_history.get(slot, [])
+        self.last_active[slot] = max(self.last_active[slot], last_active or 0.0)
+
+    def row(self, slot):
+        return (
+            self.guild_id,
+            self.member_ids[slot],
+            *(self.counters[name][slot] for name in self.COUNTERS),
+            self.activity_hours[slot * 24:slot * 24 + 24].tobytes(),
+            json.dumps(self.channel_activity.get(slot, {})),
+            json.dumps(self.role_history.get(slot, [])),
+            self.last_active[slot]
+        )
+
+    def take_dirty_rows(self):
+        dirty, self.dirty = self.dirty, set()
+        return [self.row(slot) for slot in dirty]
+
+    def stats(self, member_id):
+        slot = self.slot_for(member_id, create=False)
+        if slot is None:
+            return {}
+        stats = {name: self.counters[name][slot] for name in self.COUNTERS}
+        stats['voice_minutes'] = stats['voice_time']
+        stats['engagement_metrics'] = {name: stats[name] for name in self.ENGAGEMENT}
+        stats['activity_hours'] = {str(hour): self.activity_hours[slot * 24 + hour] for hour in range(24)}
+        stats['channel_activity'] = dict(self.channel_activity.get(slot, {}))
+        stats['role_history'] = list(self.role_history.get(slot, []))
+        if self.last_active[slot]:
+            stats['last_active'] = datetime.fromtimestamp(self.last_active[slot]).isoformat()
+        return stats
+
+
+class MemberMetricsStore:
+    """Column-oriented member metrics for every guild, saved incrementally.
+
+    Only members touched since the last flush are upserted into
+    ``member_metrics`` through the shared analytics writer; role definitions
+    are snapshotted per guild into ``guild_role_snapshots`` and only rewritten
+    when they actually change.
+    """
+
+    def __init__(self, analytics_db, flush_interval=30):
+        self.analytics_db = analytics_db
+        self.flush_interval = flush_interval
+        self.guilds = {}
+        self.role_snapshots = {}
+        self.dirty_roles = set()
+        self.loaded = asyncio.Event()
+        self._task = None
+
+    def guild(self, guild_id):
+        columns = self.guilds.get(guild_id)
+        if columns is None:
+            columns = self.guilds[guild_id] = GuildMemberColumns(guild_id)
+        return columns
+
+    def add(self, guild_id, member_id, counter, amount=1, hour=None, channel_id=None):
+        return self.guild(guild_id).add(member_id, counter, amount, hour, channel_id)
+
+    def get(self, guild_id, member_id):
+        columns = self.guilds.get(guild_id)
+        return columns.stats(member_id) if columns else {}
+
+    def record_roles(self, guild_id, member_id, role_names):
+        self.guild(guild_id).set_roles(member_id, role_names)
+
+    def snapshot_roles(self, guild):
+        snapshot = {
+            str(role.id): {
+                'name': role.name,
+                'color': role.color.value,
+                'position': role.position,
+                'hoisted': role.hoist,
+                'mentionable': role.mentionable
+            } for role in guild.roles
+        }
+        if self.role_snapshots.get(guild.id) != snapshot:
+            self.role_snapshots[guild.id] = snapshot
+            self.dirty_roles.add(guild.id)
+
+    async def load(self):
+        async for guild_id, member_id, counters, activity_hours, channel_activity, role_history, last_active in self.analytics_db.load_member_metrics():
+            self.guild(guild_id).load_row(member_id, counters, activity_hours, channel_activity, role_history, last_active)
+        self.role_snapshots.update(await self.analytics_db.load_role_snapshots())
+        self.loaded.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing member metrics: {e}")
+
+    async def flush(self):
+        rows = []
+        for columns in self.guilds.values():
+            if columns.dirty:
+                rows.extend(columns.take_dirty_rows())
+        roles = {guild_id: self.role_snapshots[guild_id] for guild_id in self.dirty_roles}
+        self.dirty_roles = set()
+        try:
+            if rows:
+                await self.analytics_db.upsert_member_metrics(rows)
+            if roles:
+                await self.analytics_db.save_role_snapshots(roles)
+        except Exception:
+            for row in rows:
+                columns = self.guilds[row[0]]
+                columns.dirty.add(columns.slots[row[1]])
+            self.dirty_roles.update(roles)
+            raise
+        return len(rows)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
 class AdvancedUserAnalytics(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.user_data = {}
         self.voice_times = {}
-        self.analytics_db = AnalyticsDatabase()
-        self.load_data()
-        self.bot.loop.create_task(self.initialize_analytics_data())
+        self.analytics_db = bot.analytics_db
+        self.last_backfill_rate = 0.0
+        self.member_metrics = MemberMetricsStore(self.analytics_db)
+        self.analytics_db.close_hooks.append(self.member_metrics.close)
+        self.legacy_members = {}
+        self.bot.persistence.register('data/analytics_data.json', 'data/analytics_data.json', self.build_snapshot, guild_key_depth=1)
         self.prediction_model = self.setup_prediction_model()
+
+    async def cog_load(self):
+        # Only the file read runs in the thread; cog state is set up back on the loop
+        self.load_data(await asyncio.to_thread(self.read_data))
+        self.bot.loop.create_task(self.initialize_analytics_data())
         
     def calculate_influence_score(self, user_data):
         influence_factors = {
@@ -19963,81 +22752,74 @@ class AdvancedUserAnalytics(commands.Cog):
             
         return round(score, 2)
 
+    async def cog_unload(self):
+        if self.member_metrics.close in self.analytics_db.close_hooks:
+            self.analytics_db.close_hooks.remove(self.member_metrics.close)
+        await self.member_metrics.close()
+
     async def initialize_analytics_data(self):
+        await self.member_metrics.load()
+        if self.legacy_members:
+            self.import_legacy_members()
+            # The roster stays in the JSON file until the imported rows are committed
+            try:
+                await self.member_metrics.flush()
+                self.legacy_members = {}
+                self.save_data()
+            except Exception as e:
+                print(f"Error importing legacy member metrics: {e}")
+        self.member_metrics.start()
+
+        await self.bot.wait_until_ready()
         for guild in self.bot.guilds:
-            if guild.id not in self.user_data:
-                self.user_data[guild.id] = {}
-                
-            for member in guild.members:
-                if member.id not in self.user_data[guild.id]:
-                    self.user_data[guild.id][member.id] = {
-                        'messages': 0,
-                        'voice_time': 0,
-                        'reactions': 0,
-                        'commands': 0,
-                        'activity_hours': {str(i): 0 for i in range(24)},
-                        'channel_activity': {},
-                        'role_history': [role.name for role in member.roles],
-                        'join_date': member.joined_at.isoformat() if member.joined_at else None,
-                        'last_active': datetime.now().isoformat(),
-                        'infractions': [],
-                        'achievements': [],
-                        'engagement_metrics': {
-                            'replies': 0,
-                            'mentions': 0,
-                            'threads': 0,
-                            'reactions_given': 0,
-                            'reactions_received': 0
-                        }
-                    }
-        self.save_data()
+            self.user_data.setdefault(guild.id, {})
+            self.member_metrics.snapshot_roles(guild)
 
-    def load_data(self):
+    @staticmethod
+    def read_data():
         try:
             with open('data/analytics_data.json', 'r') as f:
-                self.user_data = json.load(f)
+                return json.load(f)
         except FileNotFoundError:
-            self.user_data = {}
+            return None
+
+    def load_data(self, data):
+        if data is None:
+            data = {}
             self.save_data()
 
+        for guild_id, guild_data in data.items():
+            # Older saves held the full role/member roster of every guild; members are moved into
+            # MemberMetricsStore once and the roster is dropped from this file on the next save.
+            members = guild_data.pop('members', None)
+            guild_data.pop('roles', None)
+            if members:
+                self.legacy_members[int(guild_id)] = members
+            self.user_data[int(guild_id)] = guild_data
+
+    def import_legacy_members(self):
+        for guild_id, members in self.legacy_members.items():
+            columns = self.member_metrics.guild(guild_id)
+            for member_id, stats in members.items():
+                member_id = int(member_id)
+                engagement = stats.get('engagement_metrics') or {}
+                values = {name: stats.get(name) or 0 for name in ('messages', 'voice_time', 'reactions', 'commands')}
+                values.update({name: engagement.get(name) or 0 for name in GuildMemberColumns.ENGAGEMENT})
+                if member_id in columns.slots or not any(values.values()):
+                    continue
+                for name, value in values.items():
+                    if value:
+                        columns.add(member_id, name, value)
+
     def save_data(self):
-        guild_data = {}
-        for guild in self.bot.guilds:
-            guild_data[guild.id] = {
-                'roles': {
-                    role.id: {
-                        'name': role.name,
-                        'color': role.color.value,
-                        'members': len(role.members),
-                        'position': role.position,
-                        'hoisted': role.hoist,
-                        'mentionable': role.mentionable
-                    } for role in guild.roles
-                },
-                'members': {
-                    member.id: {
-                        'messages': self.user_data.get(guild.id, {}).get(member.id, {}).get('messages', 0),
-                        'voice_time': self.user_data.get(guild.id, {}).get(member.id, {}).get('voice_time', 0),
-                        'reactions': self.user_data.get(guild.id, {}).get(member.id, {}).get('reactions', 0),
-                        'commands': self.user_data.get(guild.id, {}).get(member.id, {}).get('commands', 0),
-                        'activity_hours': self.user_data.get(guild.id, {}).get(member.id, {}).get('activity_hours', {}),
-                        'channel_activity': self.user_data.get(guild.id, {}).get(member.id, {}).get('channel_activity', {}),
-                        'role_history': self.user_data.get(guild.id, {}).get(member.id, {}).get('role_history', []),
-                        'join_date': member.joined_at.isoformat() if member.joined_at else None,
-                        'last_active': datetime.now().isoformat(),
-                        'engagement_metrics': self.user_data.get(guild.id, {}).get(member.id, {}).get('engagement_metrics', {
-                            'replies': 0,
-                            'mentions': 0,
-                            'threads': 0,
-                            'reactions_given': 0,
-                            'reactions_received': 0
-                        })
-                    } for member in guild.members
-                }
-            }
-        
-        with open('data/analytics_data.json', 'w') as f:
-            json.dump(guild_data, f, indent=4)
+        self.bot.persistence.mark_dirty('data/analytics_data.json')
+
+    def build_snapshot(self):
+        # Guild-level aggregates only; per-member metrics are saved incrementally by MemberMetricsStore
+        snapshot = {str(guild_id): guild_data for guild_id, guild_data in self.user_data.items() if guild_data}
+        for guild_id, members in self.legacy_members.items():
+            snapshot[str(guild_id)] = {**snapshot.get(str(guild_id), {}), 'members': members}
+        return snapshot
 
     def setup_prediction_model(self):
         return {
@@ -20118,12 +22900,13 @@ class AdvancedUserAnalytics(commands.Cog):
     async def show_analytics(self, ctx, target: Union[discord.Member, str] = None):
         if isinstance(target, str) and target.lower() == "server":
             view = ServerAnalyticsView(self, ctx)
-            embed = self.create_server_overview(ctx.guild)
+            embed = await self.create_server_overview(ctx.guild)
             await ctx.send(embed=embed, view=view)
         else:
             member = target or ctx.author
             view = EnhancedUserAnalyticsView(self, ctx, member)
-            embed = self.create_advanced_overview(member)
+            totals = await self.analytics_db.user_totals(member.guild.id, member.id)
+            embed = self.create_advanced_overview(member, totals)
             await ctx.send(embed=embed, view=view)
 
     @commands.command(name="analytics_export")
@@ -20136,12 +22919,18 @@ class AdvancedUserAnalytics(commands.Cog):
         )
         await ctx.send("Analytics data export:", file=file)
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN)
     async def on_message(self, message):
-        if not message.guild or message.author.bot:
-            return
-        if message.guild:  
-            return               
+        self.analytics_db.record_message(message.guild.id, message.channel.id, message.author.id)
+        await self.analytics_db.update_user_activity(message.author.id, message.guild.id, 'message', 1)
+        self.member_metrics.add(message.guild.id, message.author.id, 'messages', hour=message.created_at.hour, channel_id=message.channel.id)
+        if message.reference:
+            self.member_metrics.add(message.guild.id, message.author.id, 'replies')
+        if isinstance(message.channel, discord.Thread):
+            self.member_metrics.add(message.guild.id, message.author.id, 'threads')
+        for mentioned in message.mentions:
+            if not mentioned.bot and mentioned.id != message.author.id:
+                self.member_metrics.add(message.guild.id, mentioned.id, 'mentions')
         guild_id = message.guild.id
         hour = message.created_at.hour
         
@@ -20218,6 +23007,17 @@ class AdvancedUserAnalytics(commands.Cog):
     async def on_reaction_add(self, reaction, user):
         if not reaction.message.guild or user.bot:
             return
+        self.analytics_db.record_reaction(
+            reaction.message.guild.id,
+            reaction.message.channel.id,
+            reaction.message.created_at.timestamp()
+        )
+        guild_id = reaction.message.guild.id
+        self.member_metrics.add(guild_id, user.id, 'reactions')
+        self.member_metrics.add(guild_id, user.id, 'reactions_given')
+        author = reaction.message.author
+        if not author.bot and author.id != user.id:
+            self.member_metrics.add(guild_id, author.id, 'reactions_received')
         await self.analytics_db.update_user_activity(
             user.id,
             reaction.message.guild.id,
@@ -20225,6 +23025,33 @@ class AdvancedUserAnalytics(commands.Cog):
             1
         )
 
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.analytics_db.record_member_flow(member.guild.id, joined=True)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before, after):
+        if before.roles != after.roles and not after.bot:
+            added = [role.name for role in after.roles if role not in before.roles]
+            if added:
+                self.member_metrics.record_roles(after.guild.id, after.id, added)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        self.member_metrics.snapshot_roles(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        self.member_metrics.snapshot_roles(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.member_metrics.snapshot_roles(role.guild)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member):
+        self.analytics_db.record_member_flow(member.guild.id, joined=False)
+
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
         if member.bot:
@@ -20241,16 +23068,77 @@ class AdvancedUserAnalytics(commands.Cog):
                 'voice',
                 minutes
             )
+            if minutes:
+                self.member_metrics.add(member.guild.id, member.id, 'voice_time', minutes)
             del self.voice_times[member.id]
 
-    def create_advanced_overview(self, member):
+    async def backfill_rollups(self, guild, days=7):
+        state = await self.analytics_db.get_rollup_state(guild.id)
+        if state and state['backfilled_at']:
+            return None
+
+        # Only import what happened before live collection started, so nothing is counted twice
+        live_since = state['live_since'] if state and state['live_since'] else time.time()
+        before = datetime.fromtimestamp(live_since, timezone.utc)
+        after = datetime.now(timezone.utc) - timedelta(days=days)
+        imported = 0
+        flushed = 0
+
+        async def record(channel, messages):
+            nonlocal imported, flushed
+            for message in messages:
+                if message.author.bot:
+                    continue
+                created = message.created_at.timestamp()
+                self.analytics_db.record_message(guild.id, channel.id, message.author.id, created, live=False)
+                reactions = sum(reaction.count for reaction in message.reactions)
+                if reactions:
+                    self.analytics_db.record_reaction(guild.id, channel.id, created, reactions, live=False)
+                imported += 1
+            if imported - flushed >= 5000:
+                flushed = imported
+                await self.analytics_db.flush_rollups()
+
+        channels = [channel for channel in guild.text_channels if channel.permissions_for(guild.me).read_message_history]
+        scan = await self.bot.history_scanner.scan(channels, record, after=after, before=before)
+        self.last_backfill_rate = scan['rate']
+
+        for member in guild.members:
+            if member.joined_at and after <= member.joined_at < before:
+                self.analytics_db.record_member_flow(guild.id, True, member.joined_at.timestamp(), live=False)
+
+        await self.analytics_db.mark_backfilled(guild.id, days, live_since)
+        return imported
+
+    @commands.command(name="analytics_backfill")
+    @commands.has_permissions(administrator=True)
+    async def analytics_backfill(self, ctx, days: int = 7):
+        days = max(1, min(days, 30))
+        state = await self.analytics_db.get_rollup_state(ctx.guild.id)
+        if state and state['backfilled_at']:
+            return await ctx.send(f"✅ History was already imported ({state['backfill_days']} days).")
+
+        status = await ctx.send(f"⏳ Importing the last {days} days of activity, this can take a while...")
+        started = time.time()
+        imported = await self.backfill_rollups(ctx.guild, days)
+        await status.edit(content=f"✅ Imported {imported or 0} messages in {time.time() - started:.0f}s ({self.last_backfill_rate:.0f} msg/s). The dashboard now includes this history.")
+
+    def create_advanced_overview(self, member, totals=None):
         embed = discord.Embed(
             title=f"Analytics Overview for {member.name}",
             color=member.color,
             timestamp=datetime.now()
         )
 
-        user_stats = self.user_data.get(member.guild.id, {}).get(str(member.id), {})
+        user_stats = self.member_metrics.get(member.guild.id, member.id)
+        if totals:
+            user_stats.update({
+                'messages': totals['message'],
+                'voice_time': totals['voice'],
+                'voice_minutes': totals['voice'],
+                'reactions': totals['reaction'],
+                'commands': totals['command']
+            })
         
         activity_score = self.calculate_activity_score(user_stats)
         engagement_rate = self.calculate_engagement_rate(user_stats)
@@ -20284,6 +23172,52 @@ class AdvancedUserAnalytics(commands.Cog):
 
         return embed
 
+    async def create_server_overview(self, guild):
+        embed = discord.Embed(
+            title=f"Server Analytics for {guild.name}",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        if guild.icon:
+            embed.set_thumbnail(url=guild.icon.url)
+
+        totals = await self.analytics_db.guild_totals(guild.id, days=7)
+        embed.add_field(
+            name="Last 7 Days",
+            value=f"Messages: {totals['message']}\n"
+                f"Active Members: {totals['active_users']}\n"
+                f"Voice Time: {totals['voice']} minutes\n"
+                f"Reactions: {totals['reaction']}\n"
+                f"Commands Used: {totals['command']}",
+            inline=True
+        )
+
+        top = await self.analytics_db.top_users(guild.id, 'message', days=7, limit=5)
+        embed.add_field(
+            name="Most Active Members",
+            value="\n".join(f"<@{user_id}>: {count} messages" for user_id, count in top) or "No data yet",
+            inline=True
+        )
+
+        series = await self.analytics_db.hourly_series(guild.id, hours=24)
+        if series:
+            peak_time, peak_counts = max(series, key=lambda item: item[1]['message'])
+            embed.add_field(
+                name="Last 24 Hours",
+                value=f"Messages: {sum(counts['message'] for _, counts in series)}\n"
+                    f"Busiest Hour: {peak_time[11:16]} ({peak_counts['message']} messages)",
+                inline=False
+            )
+
+        embed.set_footer(text=f"Members: {guild.member_count}")
+        return embed
+
+    @commands.Cog.listener()
+    async def on_command(self, ctx):
+        if ctx.guild and not ctx.author.bot:
+            await self.analytics_db.update_user_activity(ctx.author.id, ctx.guild.id, 'command', 1)
+            self.member_metrics.add(ctx.guild.id, ctx.author.id, 'commands')
+
 class BaseAnalyticsButton(discord.ui.Button):
     def __init__(self, label, emoji, style=discord.ButtonStyle.primary):
         super().__init__(label=label, emoji=emoji, style=style)
@@ -20323,18 +23257,20 @@ class BaseAnalyticsButton(discord.ui.Button):
         async for entry in guild.audit_logs(action=discord.AuditLogAction.member_update, after=thirty_days_ago):
             data['members'].append(entry.target.id)
             
+        counts = {}
+
+        def count(channel, messages):
+            totals = counts.setdefault(channel.id, [0, 0])
+            totals[0] += len(messages)
+            totals[1] += sum(sum(reaction.count for reaction in message.reactions) for message in messages)
+
+        scan = await self.view.cog.bot.history_scanner.scan(guild.text_channels, count, after=thirty_days_ago)
+        skipped = set(scan['skipped'])
         for channel in guild.text_channels:
-            try:
-                message_count = 0
-                reaction_count = 0
-                async for message in channel.history(after=thirty_days_ago, limit=None):
-                    message_count += 1
-                    reaction_count += sum(reaction.count for reaction in message.reactions)
-                    
+            if channel.id not in skipped:
+                message_count, reaction_count = counts.get(channel.id, (0, 0))
                 data['message_history'].append(message_count)
                 data['reaction_history'].append(reaction_count)
-            except discord.Forbidden:
-                continue
                 
         voice_users = sum(len(vc.members) for vc in guild.voice_channels)
         data['voice_history'].append(voice_users)
@@ -20358,19 +23294,7 @@ class ActivityHeatmapButton(BaseAnalyticsButton):
         await interaction.followup.send(embed=embed)
 
     async def get_hourly_activity_data(self, guild):
-        data = {i: 0 for i in range(24)}
-        now = datetime.now()
-        day_ago = now - timedelta(days=1)
-        
-        for channel in guild.text_channels:
-            try:
-                async for message in channel.history(after=day_ago):
-                    hour = message.created_at.hour
-                    data[hour] += 1
-            except discord.Forbidden:
-                continue
-        
-        return data
+        return await self.view.cog.analytics_db.hourly_activity(guild.id, time.time() - 86400)
 
     def generate_ascii_heatmap(self, data):
         max_value = max(data.values()) if data.values() else 1
@@ -20464,24 +23388,23 @@ class PredictiveTrendsButton(BaseAnalyticsButton):
             'content_types': {'text': 0, 'images': 0, 'links': 0}
         }
         
-        for channel in guild.text_channels:
-            try:
-                async for message in channel.history(after=week_ago):
-                    hour = message.created_at.hour
-                    data['peak_posting_times'][hour] = data['peak_posting_times'].get(hour, 0) + 1
-                    data['active_users'].add(message.author.id)
-                    data['message_history'].append(message.created_at.timestamp())
-                    data['reaction_history'].append(sum(r.count for r in message.reactions))
-                    data['channel_activity'][channel.id] = data['channel_activity'].get(channel.id, 0) + 1
-                    
-                    if message.attachments:
-                        data['content_types']['images'] += 1
-                    elif any(url in message.content for url in ['http://', 'https://']):
-                        data['content_types']['links'] += 1
-                    else:
-                        data['content_types']['text'] += 1
-            except discord.Forbidden:
-                continue
+        def collect(channel, messages):
+            for message in messages:
+                hour = message.created_at.hour
+                data['peak_posting_times'][hour] = data['peak_posting_times'].get(hour, 0) + 1
+                data['active_users'].add(message.author.id)
+                data['message_history'].append(message.created_at.timestamp())
+                data['reaction_history'].append(sum(r.count for r in message.reactions))
+                data['channel_activity'][channel.id] = data['channel_activity'].get(channel.id, 0) + 1
+                
+                if message.attachments:
+                    data['content_types']['images'] += 1
+                elif any(url in message.content for url in ['http://', 'https://']):
+                    data['content_types']['links'] += 1
+                else:
+                    data['content_types']['text'] += 1
+
+        await self.view.cog.bot.history_scanner.scan(guild.text_channels, collect, after=week_ago)
                 
         data['members'] = [m.id for m in guild.members]
         return data
@@ -20618,30 +23541,20 @@ class EngagementMetricsButton(BaseAnalyticsButton):
         await interaction.followup.send(embed=embed)
 
     async def calculate_engagement_metrics(self, guild):
-        now = datetime.now()
-        week_ago = now - timedelta(days=7)
+        analytics_db = self.view.cog.analytics_db
+        week_ago = time.time() - 7 * 86400
+        totals = await analytics_db.guild_totals(guild.id, days=7)
+        channels = await analytics_db.channel_activity(guild.id, week_ago)
         metrics = {
-            'total_messages': 0,
-            'active_users': set(),
-            'reactions_given': 0,
+            'total_messages': totals['message'],
+            'active_users': totals['active_users'],
+            'reactions_given': totals['reaction'],
             'threads_created': 0,
-            'voice_minutes': 0,
-            'peak_times': {},
-            'channel_activity': {}
+            'voice_minutes': totals['voice'],
+            'peak_times': {hour: count for hour, count in (await analytics_db.hourly_activity(guild.id, week_ago)).items() if count},
+            'channel_activity': {channel_id: stats['messages'] for channel_id, stats in channels.items() if stats['messages']}
         }
         
-        for channel in guild.text_channels:
-            try:
-                async for message in channel.history(after=week_ago):
-                    metrics['total_messages'] += 1
-                    metrics['active_users'].add(message.author.id)
-                    metrics['reactions_given'] += sum(r.count for r in message.reactions)
-                    hour = message.created_at.hour
-                    metrics['peak_times'][hour] = metrics['peak_times'].get(hour, 0) + 1
-                    metrics['channel_activity'][channel.id] = metrics['channel_activity'].get(channel.id, 0) + 1
-            except discord.Forbidden:
-                continue
-        
         return metrics
 
     def create_engagement_embed(self, metrics):
@@ -20654,8 +23567,9 @@ class EngagementMetricsButton(BaseAnalyticsButton):
         embed.add_field(
             name="Activity Overview",
             value=f"Messages: {metrics['total_messages']}\n"
-                  f"Active Users: {len(metrics['active_users'])}\n"
-                  f"Total Reactions: {metrics['reactions_given']}",
+                  f"Active Users: {metrics['active_users']}\n"
+                  f"Total Reactions: {metrics['reactions_given']}\n"
+                  f"Voice Time: {metrics['voice_minutes']} minutes",
             inline=False
         )
         
@@ -20872,38 +23786,34 @@ class ChannelHealthButton(BaseAnalyticsButton):
             'engagement_distribution': {}
         }
         
+        activity = await self.view.cog.analytics_db.channel_activity(guild.id, week_ago.timestamp())
+        empty = {'messages': 0, 'reactions': 0, 'unique_users': 0}
+
         for channel in guild.text_channels:
-            try:
-                message_count = 0
-                unique_users = set()
-                reaction_count = 0
-                
-                async for message in channel.history(after=week_ago):
-                    message_count += 1
-                    unique_users.add(message.author.id)
-                    reaction_count += sum(r.count for r in message.reactions)
-                    
-                health_score = self.calculate_channel_health_score(
-                    message_count,
-                    len(unique_users),
-                    reaction_count
-                )
-                
-                health_data['channels'][channel.id] = {
-                    'name': channel.name,
-                    'message_count': message_count,
-                    'unique_users': len(unique_users),
-                    'reaction_count': reaction_count,
-                    'health_score': health_score
-                }
-                
-                if health_score < 30:
-                    health_data['inactive_channels'].append(channel.id)
-                elif health_score > 80:
-                    health_data['overactive_channels'].append(channel.id)
-                    
-            except discord.Forbidden:
-                continue
+            stats = activity.get(channel.id, empty)
+            health_score = self.calculate_channel_health_score(
+                stats['messages'],
+                stats['unique_users'],
+                stats['reactions']
+            )
+            
+            health_data['channels'][channel.id] = {
+                'name': channel.name,
+                'message_count': stats['messages'],
+                'unique_users': stats['unique_users'],
+                'reaction_count': stats['reactions'],
+                'health_score': health_score
+            }
+            
+            if health_score < 30:
+                health_data['inactive_channels'].append(channel.id)
+            elif health_score > 80:
+                health_data['overactive_channels'].append(channel.id)
+
+        if health_data['channels']:
+            health_data['overall_health'] = round(
+                sum(c['health_score'] for c in health_data['channels'].values()) / len(health_data['channels']), 2
+            )
                 
         return health_data
 
@@ -20911,6 +23821,29 @@ class ChannelHealthButton(BaseAnalyticsButton):
         base_score = min((messages / 100) * 40 + (users / 10) * 40 + (reactions / messages if messages else 0) * 20, 100)
         return round(base_score, 2)
 
+    def create_health_embed(self, health_data):
+        embed = discord.Embed(
+            title="Channel Health (7 days)",
+            description=f"Overall Health: **{health_data['overall_health']}**/100",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+
+        ranked = sorted(health_data['channels'].values(), key=lambda c: c['health_score'], reverse=True)
+        top = "\n".join(
+            f"#{c['name']}: {c['health_score']} ({c['message_count']} msgs, {c['unique_users']} users)"
+            for c in ranked[:8]
+        )
+        embed.add_field(name="Healthiest Channels", value=top or "No data", inline=False)
+
+        inactive = [health_data['channels'][cid]['name'] for cid in health_data['inactive_channels']]
+        embed.add_field(
+            name=f"Inactive Channels ({len(inactive)})",
+            value=", ".join(f"#{name}" for name in inactive[:15]) or "None",
+            inline=False
+        )
+        return embed
+
 class CommunityGrowthButton(BaseAnalyticsButton):
     def __init__(self):
         super().__init__(label="Growth Analytics", emoji="📈")
@@ -20935,13 +23868,11 @@ class CommunityGrowthButton(BaseAnalyticsButton):
             'demographic_changes': {}
         }
         
-        async for entry in guild.audit_logs(limit=None):
-            if entry.action == discord.AuditLogAction.member_join:
-                day = entry.created_at.date()
-                growth_data['joins_by_day'][day] = growth_data['joins_by_day'].get(day, 0) + 1
-            elif entry.action == discord.AuditLogAction.member_remove:
-                day = entry.created_at.date()
-                growth_data['leaves_by_day'][day] = growth_data['leaves_by_day'].get(day, 0) + 1
+        for day, joins, leaves in await self.view.cog.analytics_db.member_flow_by_day(guild.id):
+            if joins:
+                growth_data['joins_by_day'][day] = joins
+            if leaves:
+                growth_data['leaves_by_day'][day] = leaves
         
         for day in sorted(set(growth_data['joins_by_day'].keys()) | set(growth_data['leaves_by_day'].keys())):
             joins = growth_data['joins_by_day'].get(day, 0)
@@ -20955,6 +23886,20 @@ class CommunityGrowthButton(BaseAnalyticsButton):
             
         return growth_data
 
+    def create_growth_embed(self, growth_data):
+        embed = discord.Embed(title="Community Growth", color=discord.Color.green(), timestamp=datetime.now())
+
+        recent = growth_data['net_growth'][-14:]
+        timeline = "\n".join(
+            f"{day.strftime('%b %d')}: +{growth_data['joins_by_day'].get(day, 0)} / -{growth_data['leaves_by_day'].get(day, 0)} ({net:+d})"
+            for day, net in recent
+        )
+        embed.add_field(name="Joins / Leaves (last 14 active days)", value=timeline or "No data yet", inline=False)
+        embed.add_field(name="Total Joins", value=str(sum(growth_data['joins_by_day'].values())), inline=True)
+        embed.add_field(name="Total Leaves", value=str(sum(growth_data['leaves_by_day'].values())), inline=True)
+        embed.add_field(name="Growth Velocity", value=f"{growth_data['growth_velocity']:+.2f} members/day", inline=True)
+        return embed
+
 class ContentAnalysisButton(BaseAnalyticsButton):
     def __init__(self):
         super().__init__(label="Content Analysis", emoji="📝")
@@ -20994,58 +23939,57 @@ class ContentAnalysisButton(BaseAnalyticsButton):
         total_length = 0
         emoji_pattern = re.compile(r'[\U0001F300-\U0001F9FF]|[\u2600-\u26FF\u2700-\u27BF]')
         
-        for channel in guild.text_channels:
-            try:
-                async for message in channel.history(limit=1000):
-                    total_messages += 1
-                    total_length += len(message.content)
+        def collect(channel, messages):
+            nonlocal total_messages, total_length
+            for message in messages:
+                total_messages += 1
+                total_length += len(message.content)
                     
-                    if message.attachments:
-                        for attachment in message.attachments:
-                            file_ext = attachment.filename.split('.')[-1].lower()
-                            content_stats['file_types'][file_ext] = content_stats['file_types'].get(file_ext, 0) + 1
+                if message.attachments:
+                    for attachment in message.attachments:
+                        file_ext = attachment.filename.split('.')[-1].lower()
+                        content_stats['file_types'][file_ext] = content_stats['file_types'].get(file_ext, 0) + 1
                             
-                            if attachment.content_type:
-                                if 'image' in attachment.content_type:
-                                    content_stats['message_types']['images'] += 1
-                                elif 'video' in attachment.content_type:
-                                    content_stats['message_types']['videos'] += 1
-                                else:
-                                    content_stats['message_types']['files'] += 1
+                        if attachment.content_type:
+                            if 'image' in attachment.content_type:
+                                content_stats['message_types']['images'] += 1
+                            elif 'video' in attachment.content_type:
+                                content_stats['message_types']['videos'] += 1
+                            else:
+                                content_stats['message_types']['files'] += 1
                     
-                    elif message.embeds:
-                        content_stats['message_types']['embeds'] += 1
+                elif message.embeds:
+                    content_stats['message_types']['embeds'] += 1
                         
-                    urls = re.findall(r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+[^\s]*', message.content)
-                    if urls:
-                        content_stats['message_types']['links'] += 1
-                        for url in urls:
-                            domain = url.split('/')[2]
-                            content_stats['link_domains'][domain] = content_stats['link_domains'].get(domain, 0) + 1
-                    else:
-                        content_stats['message_types']['text'] += 1
+                urls = re.findall(r'https?://(?:[-\w.]|(?:%[\da-fA-F]{2}))+[^\s]*', message.content)
+                if urls:
+                    content_stats['message_types']['links'] += 1
+                    for url in urls:
+                        domain = url.split('/')[2]
+                        content_stats['link_domains'][domain] = content_stats['link_domains'].get(domain, 0) + 1
+                else:
+                    content_stats['message_types']['text'] += 1
 
-                    emojis = emoji_pattern.findall(message.content)
-                    for emoji_char in emojis:
-                        content_stats['emoji_usage'][emoji_char] = content_stats['emoji_usage'].get(emoji_char, 0) + 1
+                emojis = emoji_pattern.findall(message.content)
+                for emoji_char in emojis:
+                    content_stats['emoji_usage'][emoji_char] = content_stats['emoji_usage'].get(emoji_char, 0) + 1
 
-                    words = message.content.lower().split()
-                    for word in words:
-                        if len(word) > 3 and not word.startswith(('http', 'https')):
-                            content_stats['popular_topics'][word] = content_stats['popular_topics'].get(word, 0) + 1
+                words = message.content.lower().split()
+                for word in words:
+                    if len(word) > 3 and not word.startswith(('http', 'https')):
+                        content_stats['popular_topics'][word] = content_stats['popular_topics'].get(word, 0) + 1
 
-                    engagement_score = len(message.reactions) + (1 if message.reference else 0)
-                    content_stats['content_engagement'][message.id] = engagement_score
+                engagement_score = len(message.reactions) + (1 if message.reference else 0)
+                content_stats['content_engagement'][message.id] = engagement_score
 
-                    hour = message.created_at.hour
-                    content_stats['peak_posting_times'][hour] = content_stats['peak_posting_times'].get(hour, 0) + 1
+                hour = message.created_at.hour
+                content_stats['peak_posting_times'][hour] = content_stats['peak_posting_times'].get(hour, 0) + 1
 
-                    if hasattr(message, 'thread') and message.thread is not None:
-                        thread_id = str(message.thread.id)
-                        content_stats['thread_activity'][thread_id] = content_stats['thread_activity'].get(thread_id, 0) + 1
+                if hasattr(message, 'thread') and message.thread is not None:
+                    thread_id = str(message.thread.id)
+                    content_stats['thread_activity'][thread_id] = content_stats['thread_activity'].get(thread_id, 0) + 1
 
-            except discord.Forbidden:
-                continue
+        await self.view.cog.bot.history_scanner.scan(guild.text_channels, collect, limit=1000)
 
         if total_messages > 0:
             content_stats['avg_message_length'] = total_length / total_messages
@@ -21097,26 +24041,13 @@ class ContentAnalysisButton(BaseAnalyticsButton):
 
 
 class AnalyticsDatabase:
-    def __init__(self):
-        self.db_path = 'data/analytics.db'
-        self.db = None
-        self.queue = []
-        self.flush_interval = 5  
-        self.queue_lock = asyncio.Lock()
-        self.batch_size = 1000  
-        self.last_flush = time.time()
-        asyncio.create_task(self.initialize_db())
-        asyncio.create_task(self.flush_queue_loop())
+    # One instance per bot (bot.analytics_db); every analytics cog writes through it
+    ACTIVITY_TYPES = ('message', 'voice', 'reaction', 'command')
+    ACTIVITY_COLUMNS = ('message_count', 'voice_minutes', 'reaction_count', 'command_count')
 
-    async def initialize_db(self):
-        self.db = await aiosqlite.connect(self.db_path)
-        await self.db.execute('PRAGMA journal_mode=WAL')  
-        await self.db.execute('PRAGMA synchronous=NORMAL')  
-        await self.db.execute('PRAGMA cache_size=-64000')  
-        await self.setup_database()
-
-    async def setup_database(self):
-        await self.db.execute('''
+    # Baseline schema, applied as migration step 1 on the migration's own connection
+    SCHEMA = [
+        '''
             CREATE TABLE IF NOT EXISTS user_activity (
                 user_id INTEGER,
                 guild_id INTEGER,
@@ -21127,9 +24058,8 @@ class AnalyticsDatabase:
                 timestamp DATETIME,
                 PRIMARY KEY (user_id, guild_id, timestamp)
             ) WITHOUT ROWID
-        ''')
-        
-        await self.db.execute('''
+        ''',
+        '''
             CREATE TABLE IF NOT EXISTS guild_metrics (
                 guild_id INTEGER,
                 member_count INTEGER DEFAULT 0,
@@ -21139,79 +24069,452 @@ class AnalyticsDatabase:
                 timestamp DATETIME,
                 PRIMARY KEY (guild_id, timestamp)
             ) WITHOUT ROWID
-        ''')
-        
-        await self.db.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON user_activity(timestamp)')
-        await self.db.commit()
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_timestamp ON user_activity(timestamp)',
+        'CREATE INDEX IF NOT EXISTS idx_activity_guild_time ON user_activity(guild_id, timestamp)',
+        '''
+            CREATE TABLE IF NOT EXISTS user_activity_daily (
+                user_id INTEGER,
+                guild_id INTEGER,
+                day TEXT,
+                message_count INTEGER DEFAULT 0,
+                voice_minutes INTEGER DEFAULT 0,
+                reaction_count INTEGER DEFAULT 0,
+                command_count INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, day, user_id)
+            ) WITHOUT ROWID
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS channel_activity_hourly (
+                guild_id INTEGER,
+                bucket INTEGER,
+                channel_id INTEGER,
+                messages INTEGER DEFAULT 0,
+                reactions INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, bucket, channel_id)
+            ) WITHOUT ROWID
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS channel_user_daily (
+                guild_id INTEGER,
+                day INTEGER,
+                channel_id INTEGER,
+                user_id INTEGER,
+                messages INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, day, channel_id, user_id)
+            ) WITHOUT ROWID
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS member_flow_daily (
+                guild_id INTEGER,
+                day INTEGER,
+                joins INTEGER DEFAULT 0,
+                leaves INTEGER DEFAULT 0,
+                PRIMARY KEY (guild_id, day)
+            ) WITHOUT ROWID
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS member_metrics (
+                guild_id INTEGER,
+                user_id INTEGER,
+                messages INTEGER DEFAULT 0,
+                voice_time INTEGER DEFAULT 0,
+                reactions INTEGER DEFAULT 0,
+                commands INTEGER DEFAULT 0,
+                replies INTEGER DEFAULT 0,
+                mentions INTEGER DEFAULT 0,
+                threads INTEGER DEFAULT 0,
+                reactions_given INTEGER DEFAULT 0,
+                reactions_received INTEGER DEFAULT 0,
+                activity_hours BLOB,
+                channel_activity TEXT,
+                role_history TEXT,
+                last_active REAL,
+                PRIMARY KEY (guild_id, user_id)
+            ) WITHOUT ROWID
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS guild_role_snapshots (
+                guild_id INTEGER PRIMARY KEY,
+                roles TEXT,
+                updated_at REAL
+            )
+        ''',
+        '''
+            CREATE TABLE IF NOT EXISTS rollup_state (
+                guild_id INTEGER PRIMARY KEY,
+                live_since REAL,
+                backfilled_at REAL,
+                backfill_days INTEGER
+            )
+        '''
+    ]
+
+    def __init__(self, databases):
+        self.db_path = 'data/analytics.db'
+        self.pool = databases.get(self.db_path)
+        self.pending = {}
+        self.flush_interval = 5  
+        self.batch_size = 1000  
+        self.last_flush = time.time()
+        self.hourly_retention_days = 30
+        self.last_compaction = 0
+        self.close_hooks = []
+        self.flushed_rows = 0
+        self.recorded_events = 0
+        self.ready = asyncio.Event()
+        # Dashboard rollups, accumulated in memory and upserted with the activity queue
+        self.channel_rollup = {}
+        self.channel_users = {}
+        self.member_flow = {}
+        self.live_guilds = {}
+        self.known_live_guilds = set()
+        self.rollup_retention_days = 90
+        self.last_prune = 0
+        asyncio.create_task(self.initialize_db())
+        asyncio.create_task(self.flush_queue_loop())
+
+    async def initialize_db(self):
+        writer = await self.pool.open()
+        await writer.execute('PRAGMA cache_size=-64000')  
+        await self.pool.migrate('analytics', [
+            self.SCHEMA
+        ])
+        self.ready.set()
 
     async def flush_queue_loop(self):
         while True:
             try:
                 await asyncio.sleep(self.flush_interval)
                 await self.flush_queue()
+                if time.time() - self.last_prune > 3600:
+                    await self.prune_rollups()
+                if time.time() - self.last_compaction > 3600:
+                    await self.compact()
             except Exception as e:
                 print(f"Error in flush queue loop: {e}")
 
     async def flush_queue(self):
-        async with self.queue_lock:
-            if not self.queue:
-                return
-            
-            current_queue = self.queue
-            self.queue = []
+        await self.flush_rollups()
+        if not self.ready.is_set() or not self.pending:
+            return
+
+        current, self.pending = self.pending, {}
+        rows = [
+            (user_id, guild_id, *counts, timestamp)
+            for (user_id, guild_id, timestamp), counts in current.items()
+        ]
 
         try:
-           
-            for i in range(0, len(current_queue), self.batch_size):
-                batch = current_queue[i:i + self.batch_size]
-                await self.db.executemany('''
-                    INSERT INTO user_activity 
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(user_id, guild_id, timestamp) 
-                    DO UPDATE SET 
-                        message_count = message_count + ?,
-                        voice_minutes = voice_minutes + ?,
-                        reaction_count = reaction_count + ?,
-                        command_count = command_count + ?
-                ''', batch)
-                
-                await self.db.commit()
+            await self.pool.executemany('''
+                INSERT INTO user_activity
+                    (user_id, guild_id, message_count, voice_minutes, reaction_count, command_count, timestamp)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(user_id, guild_id, timestamp)
+                DO UPDATE SET
+                    message_count = message_count + excluded.message_count,
+                    voice_minutes = voice_minutes + excluded.voice_minutes,
+                    reaction_count = reaction_count + excluded.reaction_count,
+                    command_count = command_count + excluded.command_count
+            ''', rows)
+            self.flushed_rows += len(rows)
+            self.last_flush = time.time()
 
         except Exception as e:
             print(f"Error during queue flush: {e}")
-            
-            async with self.queue_lock:
-                self.queue.extend(current_queue)
+            for key, counts in current.items():
+                merged = self.pending.setdefault(key, [0, 0, 0, 0])
+                for index, value in enumerate(counts):
+                    merged[index] += value
 
     async def update_user_activity(self, user_id, guild_id, activity_type, amount):
+        # Aggregated per (user, guild, hour) in memory; a burst of messages becomes a single upsert
         timestamp = datetime.now().strftime('%Y-%m-%d %H:00:00')
-        
-        values = (
-            user_id, guild_id,
-            amount if activity_type == 'message' else 0,
-            amount if activity_type == 'voice' else 0,
-            amount if activity_type == 'reaction' else 0,
-            amount if activity_type == 'command' else 0,
-            timestamp,
-            amount if activity_type == 'message' else 0,
-            amount if activity_type == 'voice' else 0,
-            amount if activity_type == 'reaction' else 0,
-            amount if activity_type == 'command' else 0
-        )
-        
-        async with self.queue_lock:
-            self.queue.append(values)
-            
-            if len(self.queue) >= self.batch_size:
+        counts = self.pending.get((user_id, guild_id, timestamp))
+        if counts is None:
+            counts = self.pending[(user_id, guild_id, timestamp)] = [0, 0, 0, 0]
+            if len(self.pending) >= self.batch_size:
                 asyncio.create_task(self.flush_queue())
+        counts[self.ACTIVITY_TYPES.index(activity_type)] += amount
+        self.recorded_events += 1
+
+    async def compact(self, older_than_days=None):
+        # Hourly rows past the retention window are folded into one row per user and day
+        await self.ready.wait()
+        await self.flush_queue()
+        days = older_than_days if older_than_days is not None else self.hourly_retention_days
+        cutoff = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d 00:00:00')
+        try:
+            async with self.pool.transaction() as conn:
+                await conn.execute('''
+                    INSERT INTO user_activity_daily
+                        (user_id, guild_id, day, message_count, voice_minutes, reaction_count, command_count)
+                    SELECT user_id, guild_id, substr(timestamp, 1, 10),
+                           SUM(message_count), SUM(voice_minutes), SUM(reaction_count), SUM(command_count)
+                    FROM user_activity
+                    WHERE timestamp < ?
+                    GROUP BY user_id, guild_id, substr(timestamp, 1, 10)
+                    ON CONFLICT(guild_id, day, user_id) DO UPDATE SET
+                        message_count = message_count + excluded.message_count,
+                        voice_minutes = voice_minutes + excluded.voice_minutes,
+                        reaction_count = reaction_count + excluded.reaction_count,
+                        command_count = command_count + excluded.command_count
+                ''', (cutoff,))
+                cursor = await conn.execute('DELETE FROM user_activity WHERE timestamp < ?', (cutoff,))
+            self.last_compaction = time.time()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Error during analytics compaction: {e}")
+            return 0
+
+    def _activity_union(self, guild_id, since, user_id=None):
+        # Hourly rows plus already compacted daily rows, as one (user_id, counts...) relation
+        user_filter = ' AND user_id = ?' if user_id is not None else ''
+        params = [guild_id, since.strftime('%Y-%m-%d %H:00:00')]
+        if user_id is not None:
+            params.append(user_id)
+        params += [guild_id, since.strftime('%Y-%m-%d')]
+        if user_id is not None:
+            params.append(user_id)
+        query = f'''
+            SELECT user_id, message_count, voice_minutes, reaction_count, command_count
+            FROM user_activity WHERE guild_id = ? AND timestamp >= ?{user_filter}
+            UNION ALL
+            SELECT user_id, message_count, voice_minutes, reaction_count, command_count
+            FROM user_activity_daily WHERE guild_id = ? AND day >= ?{user_filter}
+        '''
+        return query, params
+
+    async def top_users(self, guild_id, metric='message', days=7, limit=10):
+        await self.ready.wait()
+        await self.flush_queue()
+        column = self.ACTIVITY_COLUMNS[self.ACTIVITY_TYPES.index(metric)]
+        query, params = self._activity_union(guild_id, datetime.now() - timedelta(days=days))
+        async with self.pool.read() as conn, conn.execute(f'''
+            SELECT user_id, SUM({column}) AS total FROM ({query})
+            GROUP BY user_id HAVING total > 0 ORDER BY total DESC LIMIT ?
+        ''', (*params, limit)) as cursor:
+            return await cursor.fetchall()
+
+    async def user_totals(self, guild_id, user_id, days=None):
+        await self.ready.wait()
+        await self.flush_queue()
+        since = datetime.now() - timedelta(days=days) if days else datetime(1970, 1, 2)
+        query, params = self._activity_union(guild_id, since, user_id)
+        async with self.pool.read() as conn, conn.execute(f'''
+            SELECT SUM(message_count), SUM(voice_minutes), SUM(reaction_count), SUM(command_count) FROM ({query})
+        ''', params) as cursor:
+            row = await cursor.fetchone()
+        return dict(zip(self.ACTIVITY_TYPES, (value or 0 for value in row)))
+
+    async def guild_totals(self, guild_id, days=7):
+        await self.ready.wait()
+        await self.flush_queue()
+        query, params = self._activity_union(guild_id, datetime.now() - timedelta(days=days))
+        async with self.pool.read() as conn, conn.execute(f'''
+            SELECT COUNT(DISTINCT user_id), SUM(message_count), SUM(voice_minutes), SUM(reaction_count), SUM(command_count)
+            FROM ({query})
+        ''', params) as cursor:
+            row = await cursor.fetchone()
+        totals = dict(zip(self.ACTIVITY_TYPES, (value or 0 for value in row[1:])))
+        totals['active_users'] = row[0] or 0
+        return totals
+
+    async def hourly_series(self, guild_id, hours=24, user_id=None):
+        await self.ready.wait()
+        await self.flush_queue()
+        since = (datetime.now() - timedelta(hours=hours - 1)).strftime('%Y-%m-%d %H:00:00')
+        user_filter = ' AND user_id = ?' if user_id is not None else ''
+        params = (guild_id, since, user_id) if user_id is not None else (guild_id, since)
+        async with self.pool.read() as conn, conn.execute(f'''
+            SELECT timestamp, SUM(message_count), SUM(voice_minutes), SUM(reaction_count), SUM(command_count)
+            FROM user_activity WHERE guild_id = ? AND timestamp >= ?{user_filter}
+            GROUP BY timestamp ORDER BY timestamp
+        ''', params) as cursor:
+            return [
+                (timestamp, dict(zip(self.ACTIVITY_TYPES, counts)))
+                async for timestamp, *counts in cursor
+            ]
+
+    def _mark_live(self, guild_id):
+        if guild_id not in self.known_live_guilds:
+            self.known_live_guilds.add(guild_id)
+            self.live_guilds[guild_id] = time.time()
+
+    def record_message(self, guild_id, channel_id, user_id, timestamp=None, live=True):
+        timestamp = timestamp or time.time()
+        if live:
+            self._mark_live(guild_id)
+        key = (guild_id, int(timestamp // 3600), channel_id)
+        counts = self.channel_rollup.setdefault(key, [0, 0])
+        counts[0] += 1
+        user_key = (guild_id, int(timestamp // 86400), channel_id, user_id)
+        self.channel_users[user_key] = self.channel_users.get(user_key, 0) + 1
+
+    def record_reaction(self, guild_id, channel_id, timestamp=None, amount=1, live=True):
+        timestamp = timestamp or time.time()
+        if live:
+            self._mark_live(guild_id)
+        key = (guild_id, int(timestamp // 3600), channel_id)
+        counts = self.channel_rollup.setdefault(key, [0, 0])
+        counts[1] += amount
+
+    def record_member_flow(self, guild_id, joined, timestamp=None, live=True):
+        timestamp = timestamp or time.time()
+        if live:
+            self._mark_live(guild_id)
+        counts = self.member_flow.setdefault((guild_id, int(timestamp // 86400)), [0, 0])
+        counts[0 if joined else 1] += 1
+
+    async def flush_rollups(self):
+        if not self.ready.is_set() or not (self.channel_rollup or self.channel_users or self.member_flow or self.live_guilds):
+            return
+
+        channel_rollup, self.channel_rollup = self.channel_rollup, {}
+        channel_users, self.channel_users = self.channel_users, {}
+        member_flow, self.member_flow = self.member_flow, {}
+        live_guilds, self.live_guilds = self.live_guilds, {}
+
+        try:
+            async with self.pool.transaction() as conn:
+                await conn.executemany('''
+                    INSERT INTO channel_activity_hourly VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(guild_id, bucket, channel_id) DO UPDATE SET
+                        messages = messages + excluded.messages,
+                        reactions = reactions + excluded.reactions
+                ''', [(*key, counts[0], counts[1]) for key, counts in channel_rollup.items()])
+                await conn.executemany('''
+                    INSERT INTO channel_user_daily VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(guild_id, day, channel_id, user_id) DO UPDATE SET
+                        messages = messages + excluded.messages
+                ''', [(*key, count) for key, count in channel_users.items()])
+                await conn.executemany('''
+                    INSERT INTO member_flow_daily VALUES (?, ?, ?, ?)
+                    ON CONFLICT(guild_id, day) DO UPDATE SET
+                        joins = joins + excluded.joins,
+                        leaves = leaves + excluded.leaves
+                ''', [(*key, counts[0], counts[1]) for key, counts in member_flow.items()])
+                await conn.executemany('''
+                    INSERT INTO rollup_state (guild_id, live_since) VALUES (?, ?)
+                    ON CONFLICT(guild_id) DO UPDATE SET live_since = COALESCE(live_since, excluded.live_since)
+                ''', list(live_guilds.items()))
+        except Exception as e:
+            print(f"Error during rollup flush: {e}")
+            for key, counts in channel_rollup.items():
+                current = self.channel_rollup.setdefault(key, [0, 0])
+                current[0] += counts[0]
+                current[1] += counts[1]
+            for key, count in channel_users.items():
+                self.channel_users[key] = self.channel_users.get(key, 0) + count
+            for key, counts in member_flow.items():
+                current = self.member_flow.setdefault(key, [0, 0])
+                current[0] += counts[0]
+                current[1] += counts[1]
+            for guild_id, since in live_guilds.items():
+                self.live_guilds.setdefault(guild_id, since)
+
+    async def prune_rollups(self):
+        await self.ready.wait()
+        cutoff = time.time() - self.rollup_retention_days * 86400
+        async with self.pool.transaction() as conn:
+            await conn.execute('DELETE FROM channel_activity_hourly WHERE bucket < ?', (int(cutoff // 3600),))
+            await conn.execute('DELETE FROM channel_user_daily WHERE day < ?', (int(cutoff // 86400),))
+        self.last_prune = time.time()
+
+    async def hourly_activity(self, guild_id, since):
+        await self.ready.wait()
+        await self.flush_rollups()
+        data = {hour: 0 for hour in range(24)}
+        async with self.pool.read() as conn, conn.execute('''
+            SELECT bucket % 24, SUM(messages) FROM channel_activity_hourly
+            WHERE guild_id = ? AND bucket >= ? GROUP BY bucket % 24
+        ''', (guild_id, int(since // 3600))) as cursor:
+            async for hour, messages in cursor:
+                data[hour] = messages
+        return data
+
+    async def channel_activity(self, guild_id, since):
+        await self.ready.wait()
+        await self.flush_rollups()
+        channels = {}
+        async with self.pool.read() as conn, conn.execute('''
+            SELECT channel_id, SUM(messages), SUM(reactions) FROM channel_activity_hourly
+            WHERE guild_id = ? AND bucket >= ? GROUP BY channel_id
+        ''', (guild_id, int(since // 3600))) as cursor:
+            async for channel_id, messages, reactions in cursor:
+                channels[channel_id] = {'messages': messages, 'reactions': reactions, 'unique_users': 0}
+        async with self.pool.read() as conn, conn.execute('''
+            SELECT channel_id, COUNT(DISTINCT user_id) FROM channel_user_daily
+            WHERE guild_id = ? AND day >= ? GROUP BY channel_id
+        ''', (guild_id, int(since // 86400))) as cursor:
+            async for channel_id, users in cursor:
+                channels.setdefault(channel_id, {'messages': 0, 'reactions': 0, 'unique_users': 0})['unique_users'] = users
+        return channels
+
+    async def member_flow_by_day(self, guild_id, since=0):
+        await self.ready.wait()
+        await self.flush_rollups()
+        async with self.pool.read() as conn, conn.execute('''
+            SELECT day, joins, leaves FROM member_flow_daily
+            WHERE guild_id = ? AND day >= ? ORDER BY day
+        ''', (guild_id, int(since // 86400))) as cursor:
+            return [
+                (datetime.fromtimestamp(day * 86400, timezone.utc).date(), joins, leaves)
+                async for day, joins, leaves in cursor
+            ]
+
+    async def upsert_member_metrics(self, rows):
+        await self.ready.wait()
+        await self.pool.executemany(
+            'INSERT OR REPLACE INTO member_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+        )
+
+    async def load_member_metrics(self):
+        await self.ready.wait()
+        async with self.pool.read() as conn, conn.execute('SELECT * FROM member_metrics') as cursor:
+            async for row in cursor:
+                yield row[0], row[1], row[2:11], row[11], row[12], row[13], row[14]
+
+    async def save_role_snapshots(self, snapshots):
+        await self.ready.wait()
+        now = time.time()
+        await self.pool.executemany(
+            'INSERT OR REPLACE INTO guild_role_snapshots VALUES (?, ?, ?)',
+            [(guild_id, json.dumps(roles), now) for guild_id, roles in snapshots.items()]
+        )
+
+    async def load_role_snapshots(self):
+        await self.ready.wait()
+        async with self.pool.read() as conn, conn.execute('SELECT guild_id, roles FROM guild_role_snapshots') as cursor:
+            return {guild_id: json.loads(roles) async for guild_id, roles in cursor}
+
+    async def get_rollup_state(self, guild_id):
+        await self.ready.wait()
+        await self.flush_rollups()
+        async with self.pool.read() as conn, conn.execute(
+            'SELECT live_since, backfilled_at, backfill_days FROM rollup_state WHERE guild_id = ?', (guild_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if not row:
+            return None
+        return {'live_since': row[0], 'backfilled_at': row[1], 'backfill_days': row[2]}
+
+    async def mark_backfilled(self, guild_id, days, live_since):
+        await self.flush_rollups()
+        await self.pool.execute('''
+            INSERT INTO rollup_state (guild_id, live_since, backfilled_at, backfill_days) VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id) DO UPDATE SET
+                live_since = COALESCE(live_since, excluded.live_since),
+                backfilled_at = excluded.backfilled_at,
+                backfill_days = excluded.backfill_days
+        ''', (guild_id, live_since, time.time(), days))
 
     async def close(self):
         try:
-            if self.queue:
-                await self.flush_queue()
-            if self.db:
-                await self.db.execute('PRAGMA optimize')  
-                await self.db.close()
+            for hook in self.close_hooks:
+                await hook()
+            await self.flush_queue()
+            await self.pool.close()
         except Exception as e:
             print(f"Error during database close: {e}")
 
@@ -21220,10 +24523,7 @@ class Analytics(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.voice_times = {}
-        self.analytics_db = AnalyticsDatabase()
-
-    def cog_unload(self):
-        asyncio.create_task(self.analytics_db.close())
+        self.analytics_db = bot.analytics_db
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -22477,8 +25777,8 @@ class WebhookAvatarModal(discord.ui.Modal, title="Change Webhook Avatar"):
     async def on_submit(self, interaction: discord.Interaction):
         try:
            
-            response = requests.get(self.avatar_url.value)
-            img = Image.open(io.BytesIO(response.content))
+            image_bytes = await interaction.client.http_client.fetch_bytes(self.avatar_url.value)
+            img = Image.open(io.BytesIO(image_bytes))
             
             img = img.resize((128, 128))
             
@@ -23197,12 +26497,8 @@ class AFKSystem(commands.Cog):
         embed = self.create_afk_embed(ctx.author, message)
         await ctx.send(embed=embed)
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.DM | MessageTraits.HUMAN)
     async def on_message(self, message):
-        if message.author.bot:
-            return
-        if message.guild:  
-            return               
         show_author_afk = False
         if message.author.id in self.bot.afk_users:
             if not message.content.lower().startswith(f"{self.bot.command_prefix}afk"):
@@ -25972,6 +29268,187 @@ class AiCommands(commands.Cog):
         await ctx.send(embed=error_embed)
 
 
+class BackupStore:
+    """Append-only message backup of one guild under ``backups/<guild_id>/<kind>``.
+
+    History is written while it is paged, as gzip'd NDJSON segments of at most
+    ``segment_size`` messages, and attachments are kept once under their SHA-256.
+    ``manifest.json`` lists each channel's finished segments and the id of the
+    newest message in them; that cursor is where an interrupted backup resumes
+    and where the next incremental backup starts. Each backup command is its own
+    ``kind`` so a limited or attachment-less backup never moves the cursor of
+    another.
+    """
+
+    stores = {}
+
+    def __init__(self, guild_id, kind, root='backups', segment_size=5000):
+        self.root = os.path.join(root, str(guild_id), kind)
+        self.segment_size = segment_size
+        self.manifest_path = os.path.join(self.root, 'manifest.json')
+        self.locks = {}
+        self.manifest_lock = asyncio.Lock()
+        self.manifest = {'version': 1, 'channels': {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    @classmethod
+    def for_guild(cls, guild_id, kind):
+        if (guild_id, kind) not in cls.stores:
+            cls.stores[guild_id, kind] = cls(guild_id, kind)
+        return cls.stores[guild_id, kind]
+
+    def keep(self, path):
+        # Archives too large to upload are moved next to the data they were packed from
+        os.makedirs(self.root, exist_ok=True)
+        kept = os.path.join(self.root, os.path.basename(path))
+        os.replace(path, kept)
+        return kept
+
+    def channel_state(self, channel_id):
+        return self.manifest['channels'].setdefault(str(channel_id), {'cursor': None, 'count': 0, 'segments': [], 'attachments': []})
+
+    async def save_manifest(self):
+        def write(data):
+            temp_path = self.manifest_path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.manifest_path)
+        async with self.manifest_lock:
+            await asyncio.to_thread(write, json.dumps(self.manifest))
+
+    async def save_attachment(self, attachment):
+        data = await attachment.read()
+        digest = hashlib.sha256(data).hexdigest()
+        path = f"attachments/{digest}{os.path.splitext(attachment.filename)[1].lower()}"
+        full_path = os.path.join(self.root, path)
+        if not os.path.exists(full_path):
+            def write():
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'wb') as f:
+                    f.write(data)
+            await asyncio.to_thread(write)
+        return path
+
+    async def serialize(self, message, state, download):
+        attachments = []
+        for attachment in message.attachments:
+            entry = {"filename": attachment.filename, "url": attachment.url}
+            if download:
+                try:
+                    entry["backup_path"] = await self.save_attachment(attachment)
+                    if entry["backup_path"] not in state['attachments']:
+                        state['attachments'].append(entry["backup_path"])
+                except discord.HTTPException as e:
+                    print(f"Error saving attachment {attachment.id}: {e}")
+            attachments.append(entry)
+        return {
+            "id": message.id,
+            "content": message.content,
+            "author": str(message.author),
+            "author_id": message.author.id,
+            "timestamp": message.created_at.isoformat(),
+            "attachments": attachments,
+            "embeds": [embed.to_dict() for embed in message.embeds if embed.type == 'rich'],
+            "pinned": message.pinned
+        }
+
+    async def backup_channel(self, channel, limit=None, download=False, progress=None, scanner=None):
+        """Write the channel's messages newer than its cursor, oldest first.
+
+        Without a cursor, ``limit`` keeps the first backup to the newest
+        ``limit`` messages. Pass a HistoryScanner to page within its budget.
+        Returns the number of messages written.
+        """
+        fetch = (lambda **kwargs: scanner.history(channel, **kwargs)) if scanner else channel.history
+        async with self.locks.setdefault(channel.id, asyncio.Lock()):
+            state = self.channel_state(channel.id)
+            if state['cursor']:
+                history = fetch(limit=None, after=discord.Object(state['cursor']), oldest_first=True)
+            elif limit:
+                history = reversed([message async for message in fetch(limit=limit)])
+            else:
+                history = fetch(limit=None, oldest_first=True)
+
+            os.makedirs(os.path.join(self.root, 'channels', str(channel.id)), exist_ok=True)
+            written = 0
+            segment = None
+            lines = []
+
+            async def flush(close=False):
+                nonlocal segment, lines
+                if lines:
+                    await asyncio.to_thread(segment['handle'].writelines, lines)
+                    lines = []
+                if close and segment:
+                    await asyncio.to_thread(segment['handle'].close)
+                    state['segments'].append({key: segment[key] for key in ('file', 'count', 'first', 'last')})
+                    state['cursor'] = segment['last']
+                    state['count'] += segment['count']
+                    segment = None
+                    await self.save_manifest()
+
+            async def write(message):
+                nonlocal segment, written
+                if segment is None:
+                    name = f"channels/{channel.id}/{len(state['segments']) + 1:06d}.ndjson.gz"
+                    handle = await asyncio.to_thread(gzip.open, os.path.join(self.root, name), 'wt', encoding='utf-8')
+                    segment = {'file': name, 'handle': handle, 'count': 0, 'first': message.id, 'last': None}
+                lines.append(json.dumps(await self.serialize(message, state, download), ensure_ascii=False) + '\n')
+                segment['count'] += 1
+                segment['last'] = message.id
+                written += 1
+                if segment['count'] >= self.segment_size:
+                    await flush(close=True)
+                elif len(lines) >= 100:
+                    await flush()
+                if progress and written % 1000 == 0:
+                    await progress(written)
+
+            try:
+                if hasattr(history, '__aiter__'):
+                    async for message in history:
+                        await write(message)
+                else:
+                    for message in history:
+                        await write(message)
+            finally:
+                # Everything already paged is kept; a crash before this point replays the open segment
+                if segment:
+                    await flush(close=True)
+            return written
+
+    async def pack(self, zip_path, extra=None, channel_ids=None):
+        # Zip the store (or just channel_ids) together with extra {name: data} JSON files
+        manifest = self.manifest
+        if channel_ids is not None:
+            manifest = {**manifest, 'channels': {str(c): manifest['channels'][str(c)] for c in channel_ids if str(c) in manifest['channels']}}
+
+        def write():
+            with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+                for name, data in (extra or {}).items():
+                    zipf.writestr(name, json.dumps(data, ensure_ascii=False))
+                zipf.writestr('manifest.json', json.dumps(manifest))
+                for state in manifest['channels'].values():
+                    for path in [segment['file'] for segment in state['segments']] + state['attachments']:
+                        if path not in zipf.NameToInfo:
+                            # Segments are gzip'd already and attachments are mostly compressed media
+                            zipf.write(os.path.join(self.root, path), path, compress_type=zipfile.ZIP_STORED)
+        await asyncio.to_thread(write)
+
+    @staticmethod
+    def iter_archive(zipf, channel_id=None):
+        # Stream messages back out of a packed archive, oldest first, one line at a time
+        manifest = json.loads(zipf.read('manifest.json'))
+        for key, state in manifest['channels'].items():
+            if channel_id is not None and key != str(channel_id):
+                continue
+            for segment in state['segments']:
+                with zipf.open(segment['file']) as raw, gzip.open(raw, 'rt', encoding='utf-8') as f:
+                    for line in f:
+                        yield json.loads(line)
+
 
 class ChannelManager(commands.Cog):
     def __init__(self, bot):
@@ -25985,12 +29462,10 @@ class ChannelManager(commands.Cog):
             await ctx.send("Channel not found!")
             return
 
-        await ctx.send("Starting channel backup process... This may take a while.")
-
-        channel_dir = f"channel_backup_{channel.id}"
-        os.makedirs(channel_dir, exist_ok=True)
+        progress_msg = await ctx.send("Starting channel backup process... This may take a while.")
 
         channel_data = {
+            "id": channel.id,
             "name": channel.name,
             "topic": channel.topic,
             "category": channel.category.id if channel.category else None,
@@ -26009,52 +29484,24 @@ class ChannelManager(commands.Cog):
             }
             channel_data["permissions"].append(perm_dict)
 
-        with open(f"{channel_dir}/metadata.json", "w") as f:
-            json.dump(channel_data, f)
-
-        messages_data = []
-        async for message in channel.history(limit=None, oldest_first=True):
-            msg_data = {
-                "content": message.content,
-                "author": str(message.author),
-                "author_id": message.author.id,
-                "timestamp": message.created_at.isoformat(),
-                "attachments": [],
-                "embeds": [{
-                    "title": embed.title,
-                    "description": embed.description,
-                    "color": embed.color.value if embed.color else None
-                } for embed in message.embeds if embed.type == 'rich']
-            }
-            
-            for attachment in message.attachments:
-                file_path = f"{channel_dir}/{attachment.id}_{attachment.filename}"
-                await attachment.save(file_path)
-                msg_data["attachments"].append({
-                    "filename": attachment.filename,
-                    "backup_path": f"{attachment.id}_{attachment.filename}"
-                })
-            
-            messages_data.append(msg_data)
+        store = BackupStore.for_guild(ctx.guild.id, 'copychannel')
 
-        with open(f"{channel_dir}/messages.json", "w", encoding='utf-8') as f:
-            json.dump(messages_data, f, ensure_ascii=False, indent=4)
+        async def progress(count):
+            await progress_msg.edit(content=f"Backing up {channel.mention}... {count} new messages saved.")
+
+        written = await store.backup_channel(channel, download=True, progress=progress, scanner=self.bot.history_scanner)
+        total = store.channel_state(channel.id)["count"]
 
         zip_filename = f"channel_backup_{channel.id}.zip"
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(channel_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, channel_dir)
-                    zipf.write(file_path, arcname)
+        await store.pack(zip_filename, extra={"metadata.json": channel_data}, channel_ids=[channel.id])
 
-        await ctx.send("Channel backup complete!", file=discord.File(zip_filename))
-        
-        os.remove(zip_filename)
-        for root, dirs, files in os.walk(channel_dir, topdown=False):
-            for name in files:
-                os.remove(os.path.join(root, name))
-            os.rmdir(root)
+        summary = f"Channel backup complete! {written} new messages, {total} in total."
+        if os.path.getsize(zip_filename) <= ctx.guild.filesize_limit:
+            await ctx.send(summary, file=discord.File(zip_filename))
+            os.remove(zip_filename)
+        else:
+            kept = store.keep(zip_filename)
+            await ctx.send(f"{summary} The archive is too large to upload and is kept at `{kept}`.")
 
     @commands.command()
     @commands.has_permissions(manage_channels=True)
@@ -26071,14 +29518,8 @@ class ChannelManager(commands.Cog):
         await ctx.send("Starting channel restoration process... This may take a while.")
 
         await attachment.save("temp_backup.zip")
-        temp_dir = "temp_channel_restore"
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        with zipfile.ZipFile("temp_backup.zip", 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
-
-        with open(f"{temp_dir}/metadata.json", "r") as f:
-            channel_data = json.load(f)
+        zip_ref = zipfile.ZipFile("temp_backup.zip", 'r')
+        channel_data = json.loads(zip_ref.read("metadata.json"))
 
         new_channel = await ctx.guild.create_text_channel(
             name=channel_data["name"],
@@ -26100,17 +29541,19 @@ class ChannelManager(commands.Cog):
                 overwrite = discord.PermissionOverwrite.from_pair(allow, deny)
                 await new_channel.set_permissions(target, overwrite=overwrite)
 
-        with open(f"{temp_dir}/messages.json", "r", encoding='utf-8') as f:
-            messages_data = json.load(f)
+        if "manifest.json" in zip_ref.namelist():
+            messages_data = BackupStore.iter_archive(zip_ref)
+        else:
+            messages_data = json.loads(zip_ref.read("messages.json"))
 
         webhook = await new_channel.create_webhook(name="Channel Restore")
+        archived = set(zip_ref.namelist())
         
         for msg in messages_data:
             files = []
             for attachment in msg["attachments"]:
-                file_path = f"{temp_dir}/{attachment['backup_path']}"
-                if os.path.exists(file_path):
-                    files.append(discord.File(file_path, filename=attachment["filename"]))
+                if attachment.get("backup_path") in archived:
+                    files.append(discord.File(io.BytesIO(zip_ref.read(attachment["backup_path"])), filename=attachment["filename"]))
             
             try:
                 await webhook.send(
@@ -26125,11 +29568,8 @@ class ChannelManager(commands.Cog):
 
         await webhook.delete()
         
+        zip_ref.close()
         os.remove("temp_backup.zip")
-        for root, dirs, files in os.walk(temp_dir, topdown=False):
-            for name in files:
-                os.remove(os.path.join(root, name))
-            os.rmdir(root)
 
         await ctx.send(f"Channel has been restored: {new_channel.mention}")
 
@@ -26163,11 +29603,10 @@ class RoleBackup(commands.Cog):
         os.makedirs(backup_path, exist_ok=True)
 
         if role.icon:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(role.icon.url) as resp:
-                    if resp.status == 200:
-                        with open(f"{backup_path}/icon.png", 'wb') as f:
-                            f.write(await resp.read())
+            async with self.bot.http_client.get(role.icon.url) as resp:
+                if resp.status == 200:
+                    with open(f"{backup_path}/icon.png", 'wb') as f:
+                        f.write(await resp.read())
 
         with open(f"{backup_path}/role_data.json", 'w') as f:
             json.dump(role_data, f, indent=4)
@@ -26516,6 +29955,13 @@ class MusicPlayer(commands.Cog):
         self.volume = 1.0
         self.loop = False
 
+        self.extractor = ThreadPoolExecutor(max_workers=int(os.getenv('MUSIC_EXTRACT_WORKERS', 3)), thread_name_prefix='ytdl')
+        # Stream URLs expire after a few hours; keep cached metadata well under that
+        self.stream_ttl = 1800
+        self.info_cache = BoundedTTLCache(max_size=500, ttl=self.stream_ttl)
+        self._inflight = {}
+        self._prefetch_tasks = {}
+
     @commands.command()
     async def player(self, ctx):
         
@@ -26556,24 +30002,91 @@ class MusicPlayer(commands.Cog):
 
     async def get_song_info(self, query):
         try:
-            with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                if not query.startswith('http'):
-                    query = f"ytsearch:{query}"
-                info = ydl.extract_info(query, download=False)
-                if 'entries' in info:
-                    info = info['entries'][0]
-                
-                return {
-                    'title': info['title'],
-                    'url': info['url'],
-                    'thumbnail': info['thumbnail'],
-                    'duration': str(timedelta(seconds=info['duration'])),
-                    'webpage_url': info['webpage_url']
-                }
+            return await self.resolve(query)
         except Exception as e:
             print(f"Error in get_song_info: {e}")
             return None
 
+    def _extract_info(self, query):
+        # Runs on the extraction pool, never on the event loop
+        with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
+            info = ydl.extract_info(query, download=False)
+        if info and 'entries' in info:
+            entries = [entry for entry in info['entries'] if entry]
+            info = entries[0] if entries else None
+        if not info:
+            return None
+
+        return {
+            'title': info.get('title', 'Unknown'),
+            'url': info['url'],
+            'thumbnail': info.get('thumbnail'),
+            'duration': str(timedelta(seconds=int(info.get('duration') or 0))),
+            'webpage_url': info.get('webpage_url', query),
+            'resolved_at': time.time()
+        }
+
+    async def resolve(self, query, refresh=False):
+        if not query.startswith('http'):
+            query = f"ytsearch:{query}"
+        key = query.strip().lower()
+
+        if not refresh:
+            cached = self.info_cache.get(key)
+            if cached:
+                return dict(cached)
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            loop = asyncio.get_running_loop()
+            pending = loop.run_in_executor(self.extractor, self._extract_info, query)
+            self._inflight[key] = pending
+            pending.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        info = await asyncio.shield(pending)
+        if info:
+            self.info_cache.set(key, info)
+            self.info_cache.set(info['webpage_url'].lower(), info)
+            return dict(info)
+        return None
+
+    async def prepare(self, song):
+        # Refresh stale stream URLs and run ffprobe ahead of playback
+        if time.time() - song.get('resolved_at', 0) > self.stream_ttl:
+            fresh = await self.resolve(song.get('webpage_url') or song['url'], refresh=True)
+            if fresh:
+                song['url'] = fresh['url']
+                song['resolved_at'] = fresh['resolved_at']
+                song.pop('probe', None)
+
+        if 'probe' not in song:
+            song['probe'] = await discord.FFmpegOpusAudio.probe(song['url'])
+        return song
+
+    def make_source(self, song):
+        codec, bitrate = song.get('probe') or (None, None)
+        return discord.FFmpegOpusAudio(song['url'], codec=codec, bitrate=bitrate, **self.FFMPEG_OPTIONS)
+
+    def schedule_prefetch(self, guild_id):
+        queue = self.queues.get(guild_id)
+        if not queue:
+            return
+        task = self._prefetch_tasks.get(guild_id)
+        if task and not task.done():
+            return
+        self._prefetch_tasks[guild_id] = self.bot.loop.create_task(self._prefetch(queue[0]))
+
+    async def _prefetch(self, song):
+        try:
+            await self.prepare(song)
+        except Exception as e:
+            print(f"Error prefetching {song.get('title')}: {e}")
+
+    def cog_unload(self):
+        for task in self._prefetch_tasks.values():
+            task.cancel()
+        self.extractor.shutdown(wait=False, cancel_futures=True)
+
 
     @commands.command()
     async def play(self, ctx, *, query):
@@ -26600,84 +30113,64 @@ class MusicPlayer(commands.Cog):
 
             async with ctx.typing():
                 try:
-                    
-                    search_query = f"ytsearch:{query}"
-                    with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                        info = ydl.extract_info(search_query, download=False)
-                        if 'entries' in info and info['entries']:
-                            video = info['entries'][0]
-                            url = video['webpage_url']
-                            title = video['title']
-                            thumbnail = video['thumbnail']
-                            duration = str(timedelta(seconds=video['duration']))
-                            
-                            print(f"Found: {title}")
-                            url2 = video['url']
-                            source = await discord.FFmpegOpusAudio.from_probe(url2, **self.FFMPEG_OPTIONS)
-
-                    with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                        info = ydl.extract_info(url, download=False)
-                        url2 = info['url']
-                        source = await discord.FFmpegOpusAudio.from_probe(url2, **self.FFMPEG_OPTIONS)
-
-                        if ctx.guild.id not in self.queues:
-                            self.queues[ctx.guild.id] = []
-
-                        song_info = {
-                            'title': title,
-                            'url': url2,
-                            'thumbnail': thumbnail,
-                            'requester': ctx.author.name,
-                            'duration': duration,
-                            'requested_at': datetime.now().strftime("%H:%M:%S"),
-                            'channel': ctx.channel.id
-                        }
+                    song_info = await self.resolve(query)
+                except Exception as e:
+                    print(f"\n❌ Search Error: {str(e)}")
+                    song_info = None
 
-                        self.queues[ctx.guild.id].append(song_info)
+                if not song_info:
+                    return await ctx.send("🔍 No results found! Try a different search term.")
 
-                        if not ctx.voice_client.is_playing():
-                            print("\n=== PLAYING SONG ===")
-                            ctx.voice_client.play(source, after=lambda e: self.bot.loop.create_task(self.play_next(ctx)))
-                            self.now_playing[ctx.guild.id] = title
+                print(f"Found: {song_info['title']}")
+                song_info.update({
+                    'requester': ctx.author.name,
+                    'requested_at': datetime.now().strftime("%H:%M:%S"),
+                    'channel': ctx.channel.id
+                })
 
-                            embed = discord.Embed(
-                                title="Now Playing 🎵",
-                                description=title,
-                                color=discord.Color.green()
-                            )
-                            embed.set_thumbnail(url=thumbnail)
-                            embed.add_field(name="Duration", value=duration, inline=True)
-                            embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
-                            embed.add_field(name="Time", value=song_info['requested_at'], inline=True)
-                            embed.set_footer(text=f"Voice Channel: {voice_channel.name}")
-                            
-                            await ctx.send(embed=embed)
-                        else:
-                            print("\n=== ADDED TO QUEUE ===")
-                            embed = discord.Embed(
-                                title="Added to Queue 📝",
-                                description=title,
-                                color=discord.Color.blue()
-                            )
-                            embed.set_thumbnail(url=thumbnail)
-                            embed.add_field(name="Duration", value=duration, inline=True)
-                            embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
-                            embed.add_field(name="Position", value=str(len(self.queues[ctx.guild.id])), inline=True)
-                            embed.set_footer(text=f"Queue Length: {len(self.queues[ctx.guild.id])}")
-                            
-                            await ctx.send(embed=embed)
+                if ctx.guild.id not in self.queues:
+                    self.queues[ctx.guild.id] = []
 
-                except Exception as e:
-                    print(f"\n❌ Search Error: {str(e)}")
-                    if 'youtube.com' in query or 'youtu.be' in query:
-                        with yt_dlp.YoutubeDL(self.YDL_OPTIONS) as ydl:
-                            info = ydl.extract_info(query, download=False)
-                            url = info['url']
-                            title = info['title']
-                            thumbnail = info['thumbnail']
-                            duration = str(datetime.timedelta(seconds=info['duration']))
-                    else:
-                        return await ctx.send("🔍 No results found! Try a different search term.")
+                title = song_info['title']
+                thumbnail = song_info['thumbnail']
+                duration = song_info['duration']
+
+                if not ctx.voice_client.is_playing():
+                    print("\n=== PLAYING SONG ===")
+                    await self.prepare(song_info)
+                    ctx.voice_client.play(self.make_source(song_info), after=lambda e: self.bot.loop.create_task(self.play_next(ctx)))
+                    self.now_playing[ctx.guild.id] = title
+                    self.schedule_prefetch(ctx.guild.id)
+
+                    embed = discord.Embed(
+                        title="Now Playing 🎵",
+                        description=title,
+                        color=discord.Color.green()
+                    )
+                    embed.set_thumbnail(url=thumbnail)
+                    embed.add_field(name="Duration", value=duration, inline=True)
+                    embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
+                    embed.add_field(name="Time", value=song_info['requested_at'], inline=True)
+                    embed.set_footer(text=f"Voice Channel: {voice_channel.name}")
+
+                    await ctx.send(embed=embed)
+                else:
+                    print("\n=== ADDED TO QUEUE ===")
+                    self.queues[ctx.guild.id].append(song_info)
+                    self.schedule_prefetch(ctx.guild.id)
+
+                    embed = discord.Embed(
+                        title="Added to Queue 📝",
+                        description=title,
+                        color=discord.Color.blue()
+                    )
+                    embed.set_thumbnail(url=thumbnail)
+                    embed.add_field(name="Duration", value=duration, inline=True)
+                    embed.add_field(name="Requested by", value=ctx.author.name, inline=True)
+                    embed.add_field(name="Position", value=str(len(self.queues[ctx.guild.id])), inline=True)
+                    embed.set_footer(text=f"Queue Length: {len(self.queues[ctx.guild.id])}")
+
+                    await ctx.send(embed=embed)
 
         except Exception as e:
             print(f"\n❌ ERROR: {str(e)}")
@@ -26697,7 +30190,11 @@ class MusicPlayer(commands.Cog):
 
         try:
             next_song = self.queues[ctx.guild.id].pop(0)
-            source = await discord.FFmpegOpusAudio.from_probe(next_song['url'], **self.FFMPEG_OPTIONS)
+            task = self._prefetch_tasks.pop(ctx.guild.id, None)
+            if task and not task.done():
+                await asyncio.shield(task)
+            await self.prepare(next_song)
+            source = self.make_source(next_song)
             
             def after_callback(error):
                 if error:
@@ -26706,6 +30203,7 @@ class MusicPlayer(commands.Cog):
                 
             ctx.voice_client.play(source, after=after_callback)
             self.now_playing[ctx.guild.id] = next_song['title']
+            self.schedule_prefetch(ctx.guild.id)
             
             embed = discord.Embed(title="Now Playing 🎵", description=next_song['title'], color=discord.Color.green())
             embed.set_thumbnail(url=next_song['thumbnail'])
@@ -26714,6 +30212,18 @@ class MusicPlayer(commands.Cog):
         except Exception as e:
             print(f"Error in play_next: {e}")
 
+    @commands.command()
+    @commands.is_owner()
+    async def musiccache(self, ctx):
+        stats = self.info_cache.stats()
+        embed = discord.Embed(title="🎵 Music Extraction Cache", color=discord.Color.blurple())
+        embed.add_field(name="Entries", value=str(stats['size']), inline=True)
+        embed.add_field(name="Hit Rate", value=f"{stats['hit_rate']:.1%}", inline=True)
+        embed.add_field(name="Hits / Misses", value=f"{stats['hits']} / {stats['misses']}", inline=True)
+        embed.add_field(name="Evictions", value=str(stats['evictions']), inline=True)
+        embed.add_field(name="Expired", value=str(stats['expirations']), inline=True)
+        embed.add_field(name="In Flight", value=str(len(self._inflight)), inline=True)
+        await ctx.send(embed=embed)
 
     @commands.command()
     async def skip(self, ctx):
@@ -27334,11 +30844,12 @@ class MoodTracker(commands.Cog):
         self.mood_role_name = "Mood Tracker"
         self.mood_streaks = {}
         self.custom_moods = {}
-        self.load_mood_data()
         
         self.check_moods_task = tasks.loop(seconds=20)(self.check_moods)
         self.update_analytics_task = tasks.loop(hours=24)(self.update_analytics)
-        
+
+    async def cog_load(self):
+        await asyncio.to_thread(self.load_mood_data)
         self.check_moods_task.start()
         self.update_analytics_task.start()
 
@@ -28729,11 +32240,151 @@ class VerificationSetup(commands.Cog):
 
 
 
+class LevelingDatabase:
+    SCHEMA = [
+        '''
+        CREATE TABLE IF NOT EXISTS user_levels (
+            guild_id INTEGER,
+            user_id INTEGER,
+            xp INTEGER DEFAULT 0,
+            last_message REAL,
+            achievements TEXT DEFAULT '[]',
+            PRIMARY KEY (guild_id, user_id)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS leveling_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_levels_xp ON user_levels(guild_id, xp DESC)',
+        'CREATE INDEX IF NOT EXISTS idx_levels_last_message ON user_levels(last_message)'
+    ]
+
+    def __init__(self, databases, legacy_user_data=None):
+        self.db_path = 'data/leveling.db'
+        self.pool = databases.get(self.db_path)
+        self.ready = asyncio.Event()
+        self.legacy_user_data = legacy_user_data or {}
+        asyncio.create_task(self.initialize_db())
+
+    async def initialize_db(self):
+        await self.pool.migrate('leveling', [
+            self.SCHEMA,
+            # Imports done before the shared legacy_imports table existed
+            [
+                'CREATE TABLE IF NOT EXISTS legacy_imports (component TEXT PRIMARY KEY, imported_at TEXT, row_count INTEGER)',
+                "INSERT OR IGNORE INTO legacy_imports SELECT 'leveling', value, NULL FROM leveling_meta WHERE key = 'json_imported'"
+            ]
+        ])
+        await self.import_legacy_data()
+        self.ready.set()
+
+    @staticmethod
+    def legacy_rows(user_data):
+        for guild_id, users in user_data.items():
+            for user_id, data in users.items():
+                try:
+                    last_message = datetime.fromisoformat(data['last_message']).timestamp()
+                except (KeyError, TypeError, ValueError):
+                    last_message = time.time()
+                yield (
+                    int(guild_id), int(user_id), int(data.get('xp', 0)),
+                    last_message, json.dumps(data.get('achievements', []))
+                )
+
+    async def import_legacy_data(self):
+        await self.pool.import_legacy('leveling', self.legacy_user_data, self.legacy_rows, '''
+            INSERT OR REPLACE INTO user_levels (guild_id, user_id, xp, last_message, achievements)
+            VALUES (?, ?, ?, ?, ?)
+        ''')
+        self.legacy_user_data = {}
+
+    async def add_xp(self, guild_id, user_id, amount):
+        await self.ready.wait()
+        async with self.pool.transaction() as conn:
+            async with conn.execute('''
+                INSERT INTO user_levels (guild_id, user_id, xp, last_message)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(guild_id, user_id)
+                DO UPDATE SET xp = xp + excluded.xp, last_message = excluded.last_message
+                RETURNING xp
+            ''', (guild_id, user_id, amount, time.time())) as cursor:
+                row = await cursor.fetchone()
+        return row[0]
+
+    async def set_xp(self, guild_id, user_id, xp):
+        await self.ready.wait()
+        await self.pool.execute('''
+            INSERT INTO user_levels (guild_id, user_id, xp, last_message)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, user_id)
+            DO UPDATE SET xp = excluded.xp, last_message = excluded.last_message
+        ''', (guild_id, user_id, xp, time.time()))
+
+    async def get_user(self, guild_id, user_id):
+        await self.ready.wait()
+        row = await self.pool.fetchone(
+            'SELECT xp, last_message, achievements FROM user_levels WHERE guild_id = ? AND user_id = ?',
+            (guild_id, user_id)
+        )
+        if not row:
+            return None
+        return {'xp': row[0], 'last_message': row[1], 'achievements': json.loads(row[2] or '[]')}
+
+    async def set_achievements(self, guild_id, user_id, achievements):
+        await self.ready.wait()
+        await self.pool.execute(
+            'UPDATE user_levels SET achievements = ? WHERE guild_id = ? AND user_id = ?',
+            (json.dumps(achievements), guild_id, user_id)
+        )
+
+    async def top_users(self, guild_id, limit=10):
+        await self.ready.wait()
+        return await self.pool.fetchall(
+            'SELECT user_id, xp FROM user_levels WHERE guild_id = ? ORDER BY xp DESC LIMIT ?',
+            (guild_id, limit)
+        )
+
+    async def get_rank(self, guild_id, user_id):
+        user = await self.get_user(guild_id, user_id)
+        if user is None:
+            return None
+        row = await self.pool.fetchone(
+            'SELECT COUNT(*) + 1 FROM user_levels WHERE guild_id = ? AND xp > ?',
+            (guild_id, user['xp'])
+        )
+        return row[0]
+
+    async def count_users(self, guild_id):
+        await self.ready.wait()
+        row = await self.pool.fetchone('SELECT COUNT(*) FROM user_levels WHERE guild_id = ?', (guild_id,))
+        return row[0]
+
+    async def reset_guild(self, guild_id):
+        await self.ready.wait()
+        return await self.pool.execute('DELETE FROM user_levels WHERE guild_id = ?', (guild_id,))
+
+    async def apply_decay(self, rate, inactive_days=7):
+        await self.ready.wait()
+        cutoff = time.time() - inactive_days * 86400
+        return await self.pool.execute(
+            'UPDATE user_levels SET xp = MAX(0, CAST(xp * (1 - ?) AS INTEGER)) WHERE last_message < ? AND xp > 0',
+            (rate, cutoff)
+        )
+
+    async def close(self):
+        try:
+            await self.pool.close()
+        except Exception as e:
+            print(f"Error during leveling database close: {e}")
+
+
 class LevelingSystem(commands.Cog):                         
     def __init__(self, bot):
         self.bot = bot
         self.owner_id = int(os.getenv('BOT_OWNER_ID'))
-        self.user_data: Dict[int, Dict[int, Dict]] = {}  
         self.roles: Dict[int, Dict[int, int]] = {}       
         self.achievements: Dict[int, Dict[str, Dict]] = {}  
         self.xp_decay_rate = 0.01
@@ -28742,9 +32393,21 @@ class LevelingSystem(commands.Cog):
         self.data_file = "data/leveling_data.json"
         self.leaderboard_channels: Dict[int, int] = {}    
         self.announcement_channels: Dict[int, int] = {}   
-        self.load_data()
+        self.legacy_level_roles: Dict[int, int] = {}
+        self.bot.persistence.register(self.data_file, self.data_file, self.build_snapshot, guild_key_depth=2)
+
+    async def cog_load(self):
+        legacy_user_data = await asyncio.to_thread(self.load_data)
+        self.db = LevelingDatabase(self.bot.databases, legacy_user_data)
         self.bot.loop.create_task(self.update_leaderboard_task())
         self.bot.loop.create_task(self.xp_decay_task())
+        if self.legacy_level_roles:
+            self.bot.loop.create_task(self.adopt_legacy_level_roles())
+
+    @staticmethod
+    def by_guild(data):
+        # Every map in the data file is keyed by guild id so cluster workers can merge their own guilds
+        return {int(key): value for key, value in data.items() if str(key).isdigit() and int(key) >= 1 << 22}
 
     def load_data(self):
         
@@ -28752,37 +32415,41 @@ class LevelingSystem(commands.Cog):
             with open(self.data_file, 'r') as f:
                 data = json.load(f)
                 
-                self.user_data = {
-                    int(guild_id): {
-                        int(user_id): user_data 
-                        for user_id, user_data in guild_data.items()
-                    } for guild_id, guild_data in data.get('user_data', {}).items()
-                }
-                self.roles = data.get('roles', {})
-                self.achievements = data.get('achievements', {})
-                self.xp_multipliers = data.get('xp_multipliers', {})
-                self.leaderboard_channels = data.get('leaderboard_channels', {})
-                self.announcement_channels = data.get('announcement_channels', {})
+                roles = data.get('roles', {})
+                self.roles = {guild_id: {int(level): role_id for level, role_id in levels.items()} for guild_id, levels in self.by_guild(roles).items()}
+                # Older versions stored level -> role id without the guild
+                self.legacy_level_roles = {int(level): role_id for level, role_id in roles.items() if str(level).isdigit() and int(level) < 1 << 22 and isinstance(role_id, int)}
+                self.achievements = self.by_guild(data.get('achievements', {}))
+                self.xp_multipliers = self.by_guild(data.get('xp_multipliers', {}))
+                self.leaderboard_channels = self.by_guild(data.get('leaderboard_channels', {}))
+                self.announcement_channels = self.by_guild(data.get('announcement_channels', {}))
+                # Per-user XP lives in data/leveling.db now, this is only read for the one-time import.
+                return data.get('user_data', {})
+        return {}
+
+    async def adopt_legacy_level_roles(self):
+        await self.bot.wait_until_ready()
+        for level, role_id in self.legacy_level_roles.items():
+            for guild in self.bot.guilds:
+                if guild.get_role(role_id):
+                    self.roles.setdefault(guild.id, {})[level] = role_id
+        self.legacy_level_roles = {}
+        self.save_data()
 
     def save_data(self):
-            
-            
-            cleaned_user_data = {}
-            for guild_id, guild_data in self.user_data.items():
-                cleaned_user_data[str(guild_id)] = {
-                    str(user_id): user_data
-                    for user_id, user_data in guild_data.items()
-                }
+        self.bot.persistence.mark_dirty(self.data_file)
 
-            with open(self.data_file, 'w') as f:
-                json.dump({
-                    'user_data': cleaned_user_data,
-                    'roles': self.roles,
-                    'achievements': self.achievements,
-                    'xp_multipliers': self.xp_multipliers,
-                    'leaderboard_channels': self.leaderboard_channels,
-                    'announcement_channels': self.announcement_channels
-                }, f, indent=4)
+    def build_snapshot(self):
+        return {
+            'roles': self.roles,
+            'achievements': self.achievements,
+            'xp_multipliers': self.xp_multipliers,
+            'leaderboard_channels': self.leaderboard_channels,
+            'announcement_channels': self.announcement_channels
+        }
+
+    async def cog_unload(self):
+        await self.db.close()
 
     def calculate_level(self, xp: int) -> int:
         
@@ -28802,13 +32469,6 @@ class LevelingSystem(commands.Cog):
             multiplier = 1.0
         xp_gain = int(xp_gain * multiplier)
 
-        if guild_id not in self.user_data:
-            self.user_data[guild_id] = {}
-        if user_id not in self.user_data[guild_id]:
-            self.user_data[guild_id][user_id] = {'xp': 0, 'last_message': datetime.now().isoformat()}
-
-        user_data = self.user_data[guild_id][user_id]
-
         guild = self.bot.get_guild(guild_id)
         member = guild.get_member(user_id)
         if member:
@@ -28816,17 +32476,14 @@ class LevelingSystem(commands.Cog):
                 if isinstance(role_multiplier, (int, float)) and role_id in [role.id for role in member.roles]:
                     xp_gain = int(xp_gain * float(role_multiplier))
 
-        user_data['xp'] += xp_gain
-        user_data['last_message'] = datetime.now().isoformat()
+        total_xp = await self.db.add_xp(guild_id, user_id, xp_gain)
 
-        old_level = self.calculate_level(user_data['xp'] - xp_gain)
-        new_level = self.calculate_level(user_data['xp'])
+        old_level = self.calculate_level(total_xp - xp_gain)
+        new_level = self.calculate_level(total_xp)
 
         if new_level > old_level:
             await self.handle_level_up(user_id, guild_id, new_level)
 
-        self.save_data()
-
 
     async def handle_level_up(self, user_id: int, guild_id: int, level: int):
 
@@ -28895,9 +32552,15 @@ class LevelingSystem(commands.Cog):
         if not member:
             return
 
-        for achievement, data in self.achievements.items():
-            if level >= data['required_level'] and achievement not in self.user_data[guild_id][user_id].get('achievements', []):
-                self.user_data[guild_id][user_id].setdefault('achievements', []).append(achievement)
+        user = await self.db.get_user(guild_id, user_id)
+        if not user:
+            return
+        unlocked = user['achievements']
+
+        for achievement, data in self.achievements.get(guild_id, {}).items():
+            if level >= data['required_level'] and achievement not in unlocked:
+                unlocked.append(achievement)
+                await self.db.set_achievements(guild_id, user_id, unlocked)
                 embed = discord.Embed(
                     title="🏆 Achievement Unlocked! 🏆",
                     description=f"🎉 {member.mention} has unlocked the **{achievement}** achievement! 🎉",
@@ -28924,27 +32587,22 @@ class LevelingSystem(commands.Cog):
         if guild_id not in self.leaderboard_channels:
             return
             
-        if guild_id not in self.user_data or not self.user_data[guild_id]:
+        sorted_users = await self.db.top_users(guild_id, 10)
+        if not sorted_users:
             return
 
-        sorted_users = sorted(
-            self.user_data[guild_id].items(),
-            key=lambda x: x[1]['xp'],
-            reverse=True
-        )[:10]
-
         embed = discord.Embed(
             title="🏆 Live Leaderboard 🏆",
             description="Top 10 users by XP",
             color=discord.Color.green()
         )
 
-        for i, (user_id, data) in enumerate(sorted_users, 1):
+        for i, (user_id, xp) in enumerate(sorted_users, 1):
             member = channel.guild.get_member(user_id)
             if member:
                 embed.add_field(
                     name=f"{i}. {member.display_name}",
-                    value=f"Level {self.calculate_level(data['xp'])} | {data['xp']} XP",
+                    value=f"Level {self.calculate_level(xp)} | {xp} XP",
                     inline=False
                 )
 
@@ -28958,20 +32616,14 @@ class LevelingSystem(commands.Cog):
     async def xp_decay_task(self):
         
         await self.bot.wait_until_ready()
+        if not self.bot.shard_layout.is_primary:
+            return
         while not self.bot.is_closed():
-            for guild_id, users in self.user_data.items():
-                for user_id, data in users.items():
-                    last_message = datetime.fromisoformat(data['last_message'])
-                    if (datetime.now() - last_message).days > 7:  
-                        data['xp'] = max(0, int(data['xp'] * (1 - self.xp_decay_rate)))
-            self.save_data()
+            await self.db.apply_decay(self.xp_decay_rate, inactive_days=7)
             await asyncio.sleep(86400)  
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN)
     async def on_message(self, message: discord.Message):
-        
-        if message.author.bot or not message.guild:
-            return
         await self.add_xp(message.author.id, message.guild.id)
 
 
@@ -28979,7 +32631,7 @@ class LevelingSystem(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def set_level_role(self, ctx, level: int, role: discord.Role):
         
-        self.roles[level] = role.id
+        self.roles.setdefault(ctx.guild.id, {})[level] = role.id
         self.save_data()
         await ctx.send(f"✅ Role {role.name} will be assigned at level {level}.")
 
@@ -29003,21 +32655,14 @@ class LevelingSystem(commands.Cog):
     @commands.is_owner()
     async def set_xp(self, ctx, user: discord.Member, xp: int):
         
-        guild_id = ctx.guild.id
-        if guild_id not in self.user_data:
-            self.user_data[guild_id] = {}
-        self.user_data[guild_id][user.id] = {'xp': xp, 'last_message': datetime.now().isoformat()}
-        self.save_data()
+        await self.db.set_xp(ctx.guild.id, user.id, xp)
         await ctx.send(f"✅ Set {user.mention}'s XP to {xp}.")
 
     @commands.command()
     @commands.is_owner()
     async def reset_levels(self, ctx):
         
-        guild_id = ctx.guild.id
-        if guild_id in self.user_data:
-            del self.user_data[guild_id]
-            self.save_data()
+        if await self.db.reset_guild(ctx.guild.id):
             await ctx.send("✅ Reset all leveling data for this server.")
         else:
             await ctx.send("No leveling data found for this server.")
@@ -29025,15 +32670,15 @@ class LevelingSystem(commands.Cog):
     @commands.command()
     async def my_level(self, ctx):
         
-        guild_id = ctx.guild.id
-        user_id = ctx.author.id
-        if guild_id in self.user_data and user_id in self.user_data[guild_id]:
-            xp = self.user_data[guild_id][user_id]['xp']
+        user = await self.db.get_user(ctx.guild.id, ctx.author.id)
+        if user:
+            xp = user['xp']
             level = self.calculate_level(xp)
             next_level_xp = self.xp_for_next_level(level)
+            rank = await self.db.get_rank(ctx.guild.id, ctx.author.id)
             embed = discord.Embed(
                 title=f"📊 {ctx.author.display_name}'s Level",
-                description=f"Level: **{level}**\nXP: **{xp}/{next_level_xp}**",
+                description=f"Level: **{level}**\nXP: **{xp}/{next_level_xp}**\nRank: **#{rank}**",
                 color=discord.Color.green()
             )
             await ctx.send(embed=embed)
@@ -29101,7 +32746,7 @@ class LevelingSystem(commands.Cog):
                 inline=False
             )
 
-            total_users = len(self.user_data.get(guild_id, {}))
+            total_users = await self.db.count_users(guild_id)
             embed.add_field(
                 name="Total Users with XP",
                 value=f"{total_users} users",
@@ -29236,7 +32881,16 @@ class MessagePurge(commands.Cog):
 class ReminderSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.reminders = {}
+        self.bot.scheduler.register('reminder', self.send_reminder)
+
+    def get_reminder(self, user_id):
+        job = self.bot.scheduler.get(f"reminder:{user_id}")
+        if not job:
+            return None
+        reminder = dict(job["payload"])
+        reminder["time"] = datetime.fromtimestamp(job["run_at"], timezone.utc)
+        reminder["color"] = discord.Color(reminder["color"])
+        return reminder
 
     @commands.command(name="reminder")
     async def reminder(self, ctx):
@@ -29287,7 +32941,7 @@ class ReminderSystem(commands.Cog):
                     return
 
                 reminder_time = datetime.now(timezone.utc) + timedelta(seconds=duration_seconds)
-                self.reminders[ctx.author.id] = {
+                reminder = {
                     "time": reminder_time,
                     "message": message,
                     "color": reminder_color,
@@ -29303,7 +32957,7 @@ class ReminderSystem(commands.Cog):
                 embed.add_field(name="Message", value=message, inline=False)
                 await interaction.response.send_message(embed=embed)
 
-                await self.start_reminder(ctx.author.id)
+                await self.start_reminder(reminder, ctx.guild.id)
 
             except ValueError as e:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
@@ -29321,12 +32975,11 @@ class ReminderSystem(commands.Cog):
 
     @commands.command(name="editreminder")
     async def edit_reminder(self, ctx):
-        if ctx.author.id not in self.reminders:
+        reminder = self.get_reminder(ctx.author.id)
+        if not reminder:
             await ctx.send("❌ You don't have any active reminders to edit.")
             return
 
-        reminder = self.reminders[ctx.author.id]
-
         view = discord.ui.View()
         select = discord.ui.Select(
             placeholder="Select a reminder to edit",
@@ -29338,12 +32991,12 @@ class ReminderSystem(commands.Cog):
                 )
             ]
         )
-        select.callback = lambda interaction: self.handle_reminder_selection(interaction, reminder)
+        select.callback = lambda interaction: self.handle_reminder_selection(interaction, reminder, ctx.guild.id)
         view.add_item(select)
 
         await ctx.send("Select the reminder you want to edit:", view=view)
 
-    async def handle_reminder_selection(self, interaction: discord.Interaction, reminder):
+    async def handle_reminder_selection(self, interaction: discord.Interaction, reminder, guild_id):
 
         modal = discord.ui.Modal(title="Edit Reminder")
         modal.add_item(discord.ui.TextInput(
@@ -29393,7 +33046,7 @@ class ReminderSystem(commands.Cog):
                 embed.add_field(name="New Color", value=f"{new_color}", inline=False)
                 await interaction.response.send_message(embed=embed)
 
-                await self.start_reminder(reminder["user_id"])
+                await self.start_reminder(reminder, guild_id)
 
             except ValueError as e:
                 await interaction.response.send_message(f"❌ Error: {e}", ephemeral=True)
@@ -29459,28 +33112,30 @@ class ReminderSystem(commands.Cog):
         except (ValueError, AttributeError):
             return None
 
-    async def start_reminder(self, user_id: int):
-        reminder = self.reminders.get(user_id)
-        if not reminder:
-            return
-
-        reminder_time = reminder["time"]
-        reminder_time = reminder["time"]
-        delay = (reminder_time - datetime.now(timezone.utc)).total_seconds()
-
-        if delay > 0:
-            await asyncio.sleep(delay)
-
-            channel = self.bot.get_channel(reminder["channel"])
-            if channel:
-                embed = discord.Embed(
-                    title="⏰ Reminder",
-                    description=reminder["message"],
-                    color=reminder["color"]
-                )
-                await channel.send(f"<@{reminder['user_id']}>", embed=embed)
+    async def start_reminder(self, reminder, guild_id=None):
+        # Re-scheduling the same key replaces the pending job, so an edit never fires twice
+        await self.bot.scheduler.schedule(
+            f"reminder:{reminder['user_id']}",
+            'reminder',
+            reminder["time"],
+            {
+                "message": reminder["message"],
+                "color": reminder["color"].value,
+                "channel": reminder["channel"],
+                "user_id": reminder["user_id"]
+            },
+            guild_id=guild_id
+        )
 
-            self.reminders.pop(user_id, None)
+    async def send_reminder(self, reminder):
+        channel = self.bot.get_channel(reminder["channel"])
+        if channel:
+            embed = discord.Embed(
+                title="⏰ Reminder",
+                description=reminder["message"],
+                color=reminder["color"]
+            )
+            await channel.send(f"<@{reminder['user_id']}>", embed=embed)
 
 
 class Snipe(commands.Cog):       
@@ -29618,48 +33273,189 @@ class Snipe(commands.Cog):
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class InviteDiffEngine:
+    """Attributes bursts of joins to invites with one invite fetch per burst.
+
+    Joins are queued per guild and settle for ``debounce`` seconds; the burst is
+    then matched against a single ``guild.invites()`` diff. Invites that vanish
+    because they hit ``max_uses`` are kept briefly (via ``on_invite_delete``) so
+    their final uses can still be attributed.
+    """
+
+    def __init__(self, on_burst, debounce=2.0):
+        self.on_burst = on_burst
+        self.debounce = debounce
+        self.cache: Dict[int, Dict[str, Dict]] = {}
+        self.retired: Dict[int, Dict[str, Dict]] = {}
+        self.synced = set()
+        self.pending: Dict[int, List[discord.Member]] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.fetches = 0
+        self.attributed = 0
+
+    @staticmethod
+    def describe(invite):
+        return {
+            "uses": invite.uses or 0,
+            "max_uses": invite.max_uses or 0,
+            "inviter": invite.inviter.name if invite.inviter else "Unknown",
+            "created_at": invite.created_at.isoformat() if invite.created_at else "Unknown"
+        }
+
+    def sync(self, guild_id, invites):
+        self.cache[guild_id] = {invite.code: self.describe(invite) for invite in invites}
+        self.retired.pop(guild_id, None)
+        self.synced.add(guild_id)
+
+    def invite_created(self, invite):
+        self.cache.setdefault(invite.guild.id, {})[invite.code] = self.describe(invite)
+
+    def invite_deleted(self, invite):
+        cached = self.cache.get(invite.guild.id, {}).pop(invite.code, None)
+        if cached:
+            self.retired.setdefault(invite.guild.id, {})[invite.code] = cached
+
+    def queue_join(self, member):
+        guild_id = member.guild.id
+        self.pending.setdefault(guild_id, []).append(member)
+        task = self.tasks.get(guild_id)
+        if task is None or task.done():
+            self.tasks[guild_id] = asyncio.create_task(self._settle(member.guild))
+
+    async def _settle(self, guild):
+        await asyncio.sleep(self.debounce)
+        members = self.pending.pop(guild.id, [])
+        if not members:
+            return
+        try:
+            invites = await guild.invites()
+            self.fetches += 1
+        except discord.HTTPException as e:
+            # Without a fresh list the burst can't be attributed; keep the old cache
+            logger.warning(f"Could not fetch invites for guild {guild.name}: {e}")
+            attributions = [(member, None, "Unknown") for member in members]
+        else:
+            attributions = self.attribute(guild.id, invites, members)
+        finally:
+            self.tasks.pop(guild.id, None)
+            if self.pending.get(guild.id):
+                self.tasks[guild.id] = asyncio.create_task(self._settle(guild))
+        await self.on_burst(guild, attributions)
+
+    def attribute(self, guild_id, invites, members):
+        if guild_id not in self.synced:
+            # Without a fetched baseline (only the saved cache, or nothing) every use would look like a fresh join
+            self.sync(guild_id, invites)
+            return [(member, None, "Unknown") for member in members]
+        before = self.cache[guild_id]
+        used = []
+        for invite in invites:
+            cached = before.get(invite.code)
+            delta = (invite.uses or 0) - (cached["uses"] if cached else 0)
+            if delta > 0:
+                used.append((invite.code, self.describe(invite)["inviter"], delta))
+        for code, cached in self.retired.pop(guild_id, {}).items():
+            # A deleted invite only counts if its last use expired it, anything else was revoked
+            if cached["max_uses"] and cached["uses"] == cached["max_uses"] - 1:
+                used.append((code, cached["inviter"], 1))
+        self.sync(guild_id, invites)
+
+        # Largest deltas first: when one invite explains the whole burst it gets every join
+        used.sort(key=lambda entry: entry[2], reverse=True)
+        slots = [(code, inviter) for code, inviter, delta in used for _ in range(delta)]
+        attributions = []
+        for index, member in enumerate(members):
+            code, inviter = slots[index] if index < len(slots) else (None, "Unknown")
+            attributions.append((member, code, inviter))
+        self.attributed += min(len(slots), len(members))
+        return attributions
+
+    def cancel(self):
+        for task in self.tasks.values():
+            task.cancel()
+        self.tasks.clear()
+
+
 class AdvancedInviteTracker(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.invite_cache: Dict[int, Dict[str, Dict]] = {}  
         self.known_joins: Dict[int, Dict] = {}  
         self.data_file = "data/invite_tracking_data.json"
         self.db_file = "data/invite_tracking.db"
-        self.setup_database()
+        self.engine = InviteDiffEngine(self.record_burst, float(os.getenv('INVITE_JOIN_DEBOUNCE', '2')))
+        self.invite_cache = self.engine.cache
+        self.pool = bot.databases.get(self.db_file, readers=1)
+        self.pending_invites: Dict[Tuple[int, str], Tuple] = {}
+        self.pending_joins: Dict[int, Tuple] = {}
+        self.pending_removals = set()
+        self.db_lock = asyncio.Lock()
+        self.bot.persistence.register(self.data_file, self.data_file, self.build_snapshot)
 
+    def load_data(self):
         if os.path.exists(self.data_file):
             try:
                 with open(self.data_file, "r") as f:
                     data = json.load(f)
-                    self.invite_cache = data.get("invites", {})
-                    self.known_joins = data.get("known_joins", {})
+                    for guild_id, invites in data.get("invites", {}).items():
+                        self.invite_cache[int(guild_id)] = invites
+                    self.known_joins = {int(member_id): join for member_id, join in data.get("known_joins", {}).items()}
             except json.JSONDecodeError:
                 logger.error("Failed to load invite tracking data: Invalid JSON format")
 
-    def setup_database(self):
-        
-        self.conn = sqlite3.connect(self.db_file)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS invites (
-                guild_id INTEGER,
-                invite_code TEXT,
-                uses INTEGER,
-                inviter TEXT,
-                created_at TEXT,
-                PRIMARY KEY (guild_id, invite_code)
-            )
-        ''')
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS joins (
-                member_id INTEGER PRIMARY KEY,
-                guild_id INTEGER,
-                invite_code TEXT,
-                inviter TEXT,
-                joined_at TEXT
-            )
+    async def cog_load(self):
+        await asyncio.to_thread(self.load_data)
+        await self.setup_database()
+        self.flush_pending.start()
+
+    async def setup_database(self):
+        await self.pool.migrate('invite_tracker', [
+            [
+                '''
+                CREATE TABLE IF NOT EXISTS invites (
+                    guild_id INTEGER,
+                    invite_code TEXT,
+                    uses INTEGER,
+                    inviter TEXT,
+                    created_at TEXT,
+                    PRIMARY KEY (guild_id, invite_code)
+                )
+                ''',
+                '''
+                CREATE TABLE IF NOT EXISTS joins (
+                    member_id INTEGER PRIMARY KEY,
+                    guild_id INTEGER,
+                    invite_code TEXT,
+                    inviter TEXT,
+                    joined_at TEXT
+                )
+                '''
+            ],
+            'CREATE INDEX IF NOT EXISTS idx_joins_guild ON joins(guild_id)'
+        ])
+        # The JSON file predates the database and may hold joins it never saw; it has no
+        # guild ids, so rows are matched to a guild by the invite code they used
+        await self.pool.import_legacy('invite_tracker', self.data_file, self.legacy_join_rows, '''
+            INSERT OR IGNORE INTO joins (member_id, guild_id, invite_code, inviter, joined_at)
+            VALUES (?, ?, ?, ?, ?)
         ''')
-        self.conn.commit()
+
+    @staticmethod
+    def legacy_join_rows(data):
+        invite_guilds = {
+            code: int(guild_id)
+            for guild_id, invites in data.get("invites", {}).items()
+            for code in invites
+        }
+        for member_id, join in data.get("known_joins", {}).items():
+            guild_id = invite_guilds.get(join.get("invite_code"))
+            if guild_id is not None:
+                yield (int(member_id), guild_id, join["invite_code"], join.get("inviter", "Unknown"), join.get("joined_at", "Unknown"))
+
+    def build_snapshot(self):
+        return {
+            "invites": {str(guild_id): invites for guild_id, invites in self.invite_cache.items()},
+            "known_joins": {str(member_id): join for member_id, join in self.known_joins.items()}
+        }
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -29669,73 +33465,104 @@ class AdvancedInviteTracker(commands.Cog):
         for guild in self.bot.guilds:
             try:
                 invites = await guild.invites()
-                self.invite_cache[guild.id] = {
-                    invite.code: {
-                        "uses": invite.uses,
-                        "inviter": invite.inviter.name if invite.inviter else "Unknown",
-                        "created_at": invite.created_at.isoformat() if invite.created_at else "Unknown"
-                    }
-                    for invite in invites
-                }
+                self.engine.sync(guild.id, invites)
                 self.update_database(guild.id, invites)
             except discord.Forbidden:
                 logger.warning(f"Missing permission to fetch invites for guild: {guild.name}")
 
+        self.bot.persistence.mark_dirty(self.data_file)
         print('\033[95m' + '[√] ' + '\033[94m' + "Invite sync complete." + '\033[0m')
 
 
     def update_database(self, guild_id: int, invites: List[discord.Invite]):
         
         for invite in invites:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO invites (guild_id, invite_code, uses, inviter, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (guild_id, invite.code, invite.uses, invite.inviter.name if invite.inviter else "Unknown", invite.created_at.isoformat() if invite.created_at else "Unknown"))
-        self.conn.commit()
+            self.queue_invite_row(guild_id, invite.code)
+
+    def queue_invite_row(self, guild_id: int, invite_code: str):
+        cached = self.invite_cache[guild_id][invite_code]
+        self.pending_invites[(guild_id, invite_code)] = (guild_id, invite_code, cached["uses"], cached["inviter"], cached["created_at"])
 
     @commands.Cog.listener()
-    async def on_member_join(self, member: discord.Member):
-        
-        try:
-            invites_before = self.invite_cache.get(member.guild.id, {})
-            current_invites = await member.guild.invites()
-
-            for invite in current_invites:
-                cached_invite = invites_before.get(invite.code)
-                if cached_invite and invite.uses > cached_invite["uses"]:
-                    inviter = invite.inviter.name if invite.inviter else "Unknown"
-                    invite_code = invite.code
-
-                    self.known_joins[member.id] = {
-                        "joined_at": member.joined_at.isoformat() if member.joined_at else "Unknown",
-                        "invite_code": invite_code,
-                        "inviter": inviter
-                    }
-                    self.cursor.execute('''
-                        INSERT OR REPLACE INTO joins (member_id, guild_id, invite_code, inviter, joined_at)
-                        VALUES (?, ?, ?, ?, ?)
-                    ''', (member.id, member.guild.id, invite_code, inviter, member.joined_at.isoformat() if member.joined_at else "Unknown"))
-                    self.conn.commit()
+    async def on_invite_create(self, invite: discord.Invite):
+        if invite.guild is None:
+            return
+        self.engine.invite_created(invite)
+        self.queue_invite_row(invite.guild.id, invite.code)
+        self.bot.persistence.mark_dirty(self.data_file)
 
-                    self.invite_cache[member.guild.id][invite.code]["uses"] = invite.uses
-                    await self.log_join(member, invite_code, inviter)
-                    break
+    @commands.Cog.listener()
+    async def on_invite_delete(self, invite: discord.Invite):
+        if invite.guild is None:
+            return
+        self.engine.invite_deleted(invite)
+        self.bot.persistence.mark_dirty(self.data_file)
 
-            self.backup_data()
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        
+        self.engine.queue_join(member)
 
-        except discord.Forbidden:
-            logger.warning(f"Missing permission to fetch invites for guild: {member.guild.name}")
+    async def record_burst(self, guild: discord.Guild, attributions):
+        for member, invite_code, inviter in attributions:
+            if invite_code is None:
+                continue
+            joined_at = member.joined_at.isoformat() if member.joined_at else "Unknown"
+            self.known_joins[member.id] = {
+                "joined_at": joined_at,
+                "invite_code": invite_code,
+                "inviter": inviter
+            }
+            self.pending_removals.discard(member.id)
+            self.pending_joins[member.id] = (member.id, guild.id, invite_code, inviter, joined_at)
+            try:
+                await self.log_join(member, invite_code, inviter)
+            except discord.HTTPException as e:
+                logger.warning(f"Failed to log join for {member.name}: {e}")
+        for invite_code in self.invite_cache.get(guild.id, {}):
+            self.queue_invite_row(guild.id, invite_code)
+        self.bot.persistence.mark_dirty(self.data_file)
 
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
         
         if member.id in self.known_joins:
             del self.known_joins[member.id]
-            self.cursor.execute('DELETE FROM joins WHERE member_id = ?', (member.id,))
-            self.conn.commit()
-            self.backup_data()
+            self.pending_joins.pop(member.id, None)
+            self.pending_removals.add(member.id)
+            self.bot.persistence.mark_dirty(self.data_file)
             logger.info(f"Member {member.name} ({member.id}) left the server.")
 
+    @tasks.loop(seconds=5)
+    async def flush_pending(self):
+        await self.flush_database()
+
+    async def flush_database(self):
+        if not (self.pending_invites or self.pending_joins or self.pending_removals):
+            return
+        async with self.db_lock:
+            invites, self.pending_invites = list(self.pending_invites.values()), {}
+            joins, self.pending_joins = list(self.pending_joins.values()), {}
+            removals, self.pending_removals = [(member_id,) for member_id in self.pending_removals], set()
+            try:
+                async with self.pool.transaction() as conn:
+                    await conn.executemany('''
+                        INSERT OR REPLACE INTO invites (guild_id, invite_code, uses, inviter, created_at)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', invites)
+                    await conn.executemany('''
+                        INSERT OR REPLACE INTO joins (member_id, guild_id, invite_code, inviter, joined_at)
+                        VALUES (?, ?, ?, ?, ?)
+                    ''', joins)
+                    await conn.executemany('DELETE FROM joins WHERE member_id = ?', removals)
+            except Exception as e:
+                for row in invites:
+                    self.pending_invites.setdefault((row[0], row[1]), row)
+                for row in joins:
+                    self.pending_joins.setdefault(row[0], row)
+                self.pending_removals.update(member_id for member_id, in removals)
+                logger.error(f"Failed to write invite tracking batch: {e}")
+
     async def log_join(self, member: discord.Member, invite_code: str, inviter: str):
         
         log_channel = discord.utils.get(member.guild.text_channels, name='join-logs')
@@ -29752,8 +33579,8 @@ class AdvancedInviteTracker(commands.Cog):
     @commands.has_permissions(administrator=True)
     async def view_historic(self, ctx):
         
-        self.cursor.execute('SELECT * FROM joins WHERE guild_id = ?', (ctx.guild.id,))
-        joins = self.cursor.fetchall()
+        await self.flush_database()
+        joins = await self.pool.fetchall('SELECT * FROM joins WHERE guild_id = ?', (ctx.guild.id,))
 
         if not joins:
             await ctx.send("📊 No historic join data available.")
@@ -29782,18 +33609,12 @@ class AdvancedInviteTracker(commands.Cog):
             embed.set_footer(text=f"Tracked {len(joins)} total joins.")
             await ctx.send(embed=embed)
 
-    def backup_data(self):
-        
-        data = {
-            "invites": self.invite_cache,
-            "known_joins": self.known_joins
-        }
-        with open(self.data_file, "w") as f:
-            json.dump(data, f, indent=4)
-
-    def cog_unload(self):
+    async def cog_unload(self):
         
-        self.conn.close()
+        self.flush_pending.cancel()
+        self.engine.cancel()
+        await self.flush_database()
+        await self.bot.persistence.flush([self.data_file])
 
 
 
@@ -29996,13 +33817,36 @@ class Analytics(commands.Cog):
 
 
 class WebhookLogger:
+    """Queued logger that mirrors messages and commands to LOGGING_WEBHOOK_URL.
+
+    Log embeds go through a bounded queue and are packed up to 10 per webhook call
+    (within Discord's 6000 character budget per message). Sends are paced to the
+    webhook rate limit and back off on 429s. When the queue backs up, message logs
+    are sampled and then dropped, while command logs are always kept if there is room.
+    Attachments are logged by URL unless LOG_ATTACHMENT_FILES is enabled.
+    """
+
+    MAX_EMBEDS_PER_SEND = 10
+    MAX_EMBED_CHARS_PER_SEND = 6000
+
     def __init__(self, bot):
         self.bot = bot
         webhook_url = os.getenv('LOGGING_WEBHOOK_URL')
+        self.attach_files = os.getenv('LOG_ATTACHMENT_FILES', 'false').lower() in ('true', '1', 'yes', 'on')
+        self.queue = asyncio.Queue(maxsize=2000)
+        self.sample_threshold = 500
+        self.sample_rate = 5
+        self.min_send_interval = 0.5
+        self.batch_window = 1.0
+        self.worker_task = None
+        self.stats = {"queued": 0, "sent_embeds": 0, "webhook_calls": 0, "sampled_out": 0, "dropped": 0, "rate_limited": 0}
+        self._sample_counter = 0
         
         if webhook_url and webhook_url.lower() != 'none':
             self.webhook_url = webhook_url
-            self.session = aiohttp.ClientSession()
+            # The bot's shared HTTP session; it is closed with the bot, not here
+            self.session = bot.http_client.session
+            self.webhook = discord.Webhook.from_url(self.webhook_url, session=self.session)
             
             try:
                 parts = self.webhook_url.split('/')
@@ -30019,44 +33863,110 @@ class WebhookLogger:
             self.webhook_url = None
             self.webhook_id = None
             self.session = None
+            self.webhook = None
 
-    async def send_to_webhook(self, content=None, embeds=None, files=None):
-        if not self.webhook_url:
-            return
+    def enqueue(self, embed, files=None, sampled=True):
+        if not self.webhook:
+            return False
 
-        webhook = discord.Webhook.from_url(self.webhook_url, session=self.session)
+        if sampled and self.queue.qsize() >= self.sample_threshold:
+            self._sample_counter += 1
+            if self._sample_counter % self.sample_rate:
+                self.stats["sampled_out"] += 1
+                return False
 
+        embed.set_footer(text=f"{embed.footer.text or ''} | Webhook ID: {self.webhook_id}")
         try:
-            
-            if isinstance(embeds, list) and embeds:
-                for embed in embeds:
-                    if isinstance(embed, discord.Embed):
-                        embed.set_footer(text=f"{embed.footer.text or ''} | Webhook ID: {self.webhook_id}")
+            self.queue.put_nowait((embed, files or []))
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return False
 
-                await webhook.send(
-                    content=content,
-                    embeds=embeds,
-                    files=files
-                )
-            elif embeds and isinstance(embeds[0], discord.Embed):
-                
-                await webhook.send(
-                    content=content,
-                    embed=embeds[0],
-                    files=files
-                )
-            else:
-                
-                await webhook.send(
+        self.stats["queued"] += 1
+        if self.worker_task is None or self.worker_task.done():
+            self.worker_task = asyncio.create_task(self.worker())
+        return True
+
+    async def worker(self):
+        while True:
+            embed, files = await self.queue.get()
+            batch = [embed]
+            batch_files = list(files)
+            total_chars = len(embed)
+            deadline = time.monotonic() + self.batch_window
+
+            while not batch_files and len(batch) < self.MAX_EMBEDS_PER_SEND:
+                if self.queue.empty():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        next_embed, next_files = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    next_embed, next_files = self.queue.get_nowait()
+
+                if next_files or total_chars + len(next_embed) > self.MAX_EMBED_CHARS_PER_SEND:
+                    # Doesn't fit into this call, so send what we have and start the next batch with it.
+                    await self.send_to_webhook(embeds=batch)
+                    batch, batch_files, total_chars = [next_embed], list(next_files), len(next_embed)
+                    deadline = time.monotonic() + self.batch_window
+                    continue
+                batch.append(next_embed)
+                total_chars += len(next_embed)
+
+            await self.send_to_webhook(embeds=batch, files=batch_files or None)
+
+    async def send_to_webhook(self, content=None, embeds=None, files=None):
+        if not self.webhook:
+            return
+
+        for attempt in range(3):
+            try:
+                await self.webhook.send(
                     content=content,
-                    files=files
+                    embeds=embeds or discord.utils.MISSING,
+                    files=files or discord.utils.MISSING
                 )
-        except Exception as e:
-            print(f"Webhook send error details: {str(e)}")
+                self.stats["webhook_calls"] += 1
+                self.stats["sent_embeds"] += len(embeds or [])
+                break
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    print(f"Webhook send error details: {str(e)}")
+                    break
+                self.stats["rate_limited"] += 1
+                retry_after = float(e.response.headers.get('Retry-After', 2 ** attempt))
+                await asyncio.sleep(retry_after)
+            except Exception as e:
+                print(f"Webhook send error details: {str(e)}")
+                break
 
+        await asyncio.sleep(self.min_send_interval)
+
+    async def collect_attachments(self, attachments, embed):
+        files = []
+        for attachment in attachments:
+            file_info = (
+                f"📎 Name: {attachment.filename}\n"
+                f"📊 Size: {attachment.size:,} bytes\n"
+                f"📑 Type: {attachment.content_type}\n"
+                f"🔗 URL: {attachment.url}"
+            )
+            if not self.attach_files:
+                embed.add_field("File Attachment", file_info, inline=False)
+                continue
+            try:
+                file_data = await attachment.read()
+                files.append(discord.File(io.BytesIO(file_data), filename=attachment.filename))
+                embed.add_field("File Attachment", file_info, inline=False)
+            except Exception as e:
+                embed.add_field("⚠️ File Error", f"Failed to process {attachment.filename}: {str(e)}", inline=False)
+        return files
 
     async def log_command(self, ctx):
-        if not ctx.guild:
+        if not ctx.guild or not self.webhook:
             return
         
         embed = EmbedBuilder(
@@ -30074,36 +33984,14 @@ class WebhookLogger:
         message_link = f"https://discord.com/channels/{ctx.guild.id}/{ctx.channel.id}/{ctx.message.id}"
         embed.add_field("Message Link", message_link, inline=False)
         
-        files = []
-        if ctx.message.attachments:
-            for attachment in ctx.message.attachments:
-                try:
-                    file_data = await attachment.read()
-                    file = discord.File(io.BytesIO(file_data), filename=attachment.filename)
-                    files.append(file)
-                    
-                    file_info = (
-                        f"📎 Name: {attachment.filename}\n"
-                        f"📊 Size: {attachment.size:,} bytes\n"
-                        f"📑 Type: {attachment.content_type}\n"
-                        f"🔗 URL: {attachment.url}"
-                    )
-                    embed.add_field("File Attachment", file_info, inline=False)
-                except Exception as e:
-                    embed.add_field("⚠️ File Error", f"Failed to process {attachment.filename}: {str(e)}", inline=False)
-        
-        built_embed = embed.build()
-        if built_embed:
-            try:
-                await self.send_to_webhook(embeds=[built_embed], files=files)
-            except Exception as e:
-                print(f"Failed to send command log: {str(e)}")
+        files = await self.collect_attachments(ctx.message.attachments, embed)
+        self.enqueue(embed.build(), files, sampled=False)
 
     async def log_message(self, message):
-        if not message.guild or not self.webhook_url or self.webhook_url.lower() == 'none':
+        if not message.guild or not self.webhook:
             return
             
-        if message.webhook_id and message.webhook_id == int(self.webhook_url.split('/')[-2]):
+        if message.webhook_id and message.webhook_id == self.webhook_id:
             return
 
         embed = EmbedBuilder(
@@ -30133,32 +34021,17 @@ class WebhookLogger:
         embed.add_field("Timestamp", message.created_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
 
         if message.reference:
-            try:
-                ref_msg = await message.channel.fetch_message(message.reference.message_id)
+            ref_msg = message.reference.resolved or message.reference.cached_message
+            if isinstance(ref_msg, discord.Message):
                 ref_info = f"Message: {ref_msg.content[:100]}...\nAuthor: {ref_msg.author}\nID: {message.reference.message_id}"
                 embed.add_field("Reply to", ref_info, inline=False)
-            except:
+            else:
                 embed.add_field("Reply to", f"Message ID: {message.reference.message_id}", inline=False)
 
         if message.edited_at:
             embed.add_field("Edited", message.edited_at.strftime("%Y-%m-%d %H:%M:%S"), inline=False)
 
-        files = []
-        for attachment in message.attachments:
-            try:
-                file_data = await attachment.read()
-                file = discord.File(io.BytesIO(file_data), filename=attachment.filename)
-                files.append(file)
-                
-                file_info = (
-                    f"📎 Name: {attachment.filename}\n"
-                    f"📊 Size: {attachment.size:,} bytes\n"
-                    f"📑 Type: {attachment.content_type}\n"
-                    f"🔗 URL: {attachment.url}"
-                )
-                embed.add_field("File Attachment", file_info, inline=False)
-            except Exception as e:
-                embed.add_field("⚠️ File Error", f"Failed to process {attachment.filename}: {str(e)}", inline=False)
+        files = await self.collect_attachments(message.attachments, embed)
 
         message_link = f"https://discord.com/channels/{message.guild.id}/{message.channel.id}/{message.id}"
         embed.add_field("Message Link", message_link, inline=False)
@@ -30167,16 +34040,26 @@ class WebhookLogger:
         if message.author.avatar:
             embed.set_thumbnail(message.author.avatar.url)
 
-        built_embed = embed.build()
-        if built_embed:
-            try:
-                await self.send_to_webhook(embeds=[built_embed], files=files)
-            except Exception as e:
-                print(f"Failed to send message log: {str(e)}")
+        self.enqueue(embed.build(), files)
 
-    def __del__(self):
-        if self.session:
-            asyncio.create_task(self.session.close())
+    async def close(self):
+        if self.worker_task:
+            self.worker_task.cancel()
+            self.worker_task = None
+        batch, total_chars = [], 0
+        while not self.queue.empty():
+            embed, files = self.queue.get_nowait()
+            if files:
+                await self.send_to_webhook(embeds=[embed], files=files)
+                continue
+            if len(batch) == self.MAX_EMBEDS_PER_SEND or total_chars + len(embed) > self.MAX_EMBED_CHARS_PER_SEND:
+                await self.send_to_webhook(embeds=batch)
+                batch, total_chars = [], 0
+            batch.append(embed)
+            total_chars += len(embed)
+        if batch:
+            await self.send_to_webhook(embeds=batch)
+        self.session = None
 
 class TicTacToeButton(discord.ui.Button):
     def __init__(self, x, y):
@@ -30482,11 +34365,8 @@ class MinigamesCog(commands.Cog):
         
         await channel.send(embed=embed)
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.HUMAN)
     async def on_message(self, message):
-        if message.author.bot:
-            return
-            
         if message.channel.id not in self.active_games:
             return
             
@@ -30779,7 +34659,6 @@ class Config(commands.Cog):
                 "ghost_ping_counts": AntiGhostPing_cog.ghost_ping_counts if AntiGhostPing_cog else {},
                 "strict_mode": AntiGhostPing_cog.strict_mode if AntiGhostPing_cog else False,
                 "mod_log_channel": AntiGhostPing_cog.mod_log_channel.id if (AntiGhostPing_cog and AntiGhostPing_cog.mod_log_channel) else None,
-                "deletion_history": {str(k): [t.timestamp() for t in v] for k, v in AntiGhostPing_cog._deletion_history.items()} if AntiGhostPing_cog else {},
                 "rapid_delete_threshold": AntiGhostPing_cog._rapid_delete_threshold if AntiGhostPing_cog else 5,
                 "rapid_delete_timeframe": AntiGhostPing_cog._rapid_delete_timeframe if AntiGhostPing_cog else 60
             }
@@ -30913,6 +34792,7 @@ class Config(commands.Cog):
                 automod.spam_interval = config["automod"].get("spam_interval", 5)
                 automod.spam_timeout_minutes = config["automod"].get("spam_timeout_minutes", 10)
                 automod.banned_words = set(config["automod"]["banned_words"])
+                automod.banned_matcher.rebuild(automod.banned_words)
                 automod.link_whitelist = set(config["automod"]["link_whitelist"])
                 automod.link_filter_enabled = config["automod"].get("link_filter_enabled", True)
                 automod.caps_enabled = config["automod"].get("caps_filter_enabled", True)
@@ -31037,10 +34917,6 @@ class Config(commands.Cog):
                     AntiGhostPing_cog.strict_mode = settings["strict_mode"]
                     if settings["mod_log_channel"]:
                         AntiGhostPing_cog.mod_log_channel = ctx.guild.get_channel(settings["mod_log_channel"])
-                    AntiGhostPing_cog._deletion_history = {
-                        int(k): [datetime.fromtimestamp(t) for t in v]
-                        for k, v in settings["deletion_history"].items()
-                    }
                     AntiGhostPing_cog._rapid_delete_threshold = settings["rapid_delete_threshold"]
                     AntiGhostPing_cog._rapid_delete_timeframe = settings["rapid_delete_timeframe"]
 
@@ -31141,9 +35017,7 @@ class CreatorResponseCog(commands.Cog):
             if str(user_id) == str(self.owner_id):
                 return True
                 
-            api_url = f"{self.api_url}?user_id={user_id}"
-            response = requests.get(api_url, timeout=5)
-            data = response.json()
+            data = await self.bot.http_client.fetch_json(self.api_url, params={"user_id": user_id}, timeout=5)
             
             if data.get("verified", False):
                 return True
@@ -31254,6 +35128,8 @@ class BackupSystem(commands.Cog):
         "messages": [] if full else None,
         "timestamp": str(datetime.now())
     }
+        store = BackupStore.for_guild(ctx.guild.id, 'backup')
+        message_channels = []
 
         await progress_msg.edit(content="📦 Backing up roles...")
         for role in reversed(ctx.guild.roles):
@@ -31294,24 +35170,21 @@ class BackupSystem(commands.Cog):
                 })
 
                 if full and isinstance(channel, discord.TextChannel):
-                    messages = []
-                    try:
-                        async for msg in channel.history(limit=messages_limit):
-                            messages.append({
-                            "content": msg.content,
-                            "author": str(msg.author),
-                            "timestamp": str(msg.created_at),
-                            "attachments": [a.url for a in msg.attachments],
-                            "embeds": [e.to_dict() for e in msg.embeds],
-                            "pinned": msg.pinned
-                        })
-                    except discord.Forbidden:
-                        pass
-                    chan_data["messages"] = messages
+                    chan_data["id"] = channel.id
+                    message_channels.append(channel)
 
                 cat_data["channels"].append(chan_data)
             backup_data["categories"].append(cat_data)
 
+        if message_channels:
+            # Channels are paged side by side into the guild's BackupStore; only new messages are fetched next time
+            await progress_msg.edit(content=f"📦 Backing up messages from {len(message_channels)} channels...")
+            scanner = self.bot.history_scanner
+            scan = await scanner.map(
+                message_channels,
+                lambda channel: store.backup_channel(channel, limit=messages_limit, scanner=scanner)
+            )
+
         await progress_msg.edit(content="📦 Backing up emojis...")
         backup_data["emojis"] = [{
         "name": emoji.name,
@@ -31340,12 +35213,17 @@ class BackupSystem(commands.Cog):
     }
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"backup_{ctx.guild.id}_{timestamp}.json"
-
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, indent=4)
+        if full:
+            filename = f"backup_{ctx.guild.id}_{timestamp}.zip"
+            await store.pack(filename, extra={"server.json": backup_data})
+        else:
+            filename = f"backup_{ctx.guild.id}_{timestamp}.json"
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(backup_data, f, indent=4)
 
-        file = discord.File(filename, filename=filename)
+        file = None
+        if os.path.getsize(filename) <= ctx.guild.filesize_limit:
+            file = discord.File(filename, filename=filename)
 
         embed = EmbedBuilder(
         "📦 Server Backup Complete",
@@ -31357,11 +35235,19 @@ class BackupSystem(commands.Cog):
         embed.add_field("Emojis", str(len(backup_data["emojis"])))
         embed.add_field("Webhooks", str(len(backup_data["webhooks"])))
         if full:
-            embed.add_field("Messages", f"Up to {messages_limit} per channel")
+            stored = sum(state["count"] for state in store.manifest["channels"].values())
+            embed.add_field("Messages", f"{scan['messages'] if message_channels else 0} new, {stored} stored")
+            if message_channels:
+                embed.add_field("Throughput", f"{scan['rate']:.0f} msg/s")
+        if file is None:
+            embed.add_field("Archive", f"Too large to upload, kept at `{store.keep(filename)}`", inline=False)
 
         await progress_msg.delete()
-        await ctx.send(embed=embed.build(), file=file)
-        os.remove(filename)
+        if file:
+            await ctx.send(embed=embed.build(), file=file)
+            os.remove(filename)
+        else:
+            await ctx.send(embed=embed.build())
 
     @commands.command()
     @commands.has_permissions(administrator=True)
@@ -31372,13 +35258,21 @@ class BackupSystem(commands.Cog):
             return
 
         attachment = ctx.message.attachments[0]
-        if not attachment.filename.endswith('.json'):
-            await ctx.send("Please provide a valid backup file (.json)")
+        if not attachment.filename.endswith(('.json', '.zip')):
+            await ctx.send("Please provide a valid backup file (.json or .zip)")
             return
 
         progress_msg = await ctx.send("🔄 Starting restoration process...")
-        backup_content = await attachment.read()
-        backup_data = json.loads(backup_content)
+        zip_ref = None
+        if attachment.filename.endswith('.zip'):
+            # Message archives are read segment by segment straight from the zip
+            archive = tempfile.TemporaryFile()
+            await attachment.save(archive)
+            zip_ref = zipfile.ZipFile(archive)
+            backup_data = json.loads(zip_ref.read("server.json"))
+        else:
+            backup_content = await attachment.read()
+            backup_data = json.loads(backup_content)
 
         bot_member = ctx.guild.get_member(ctx.bot.user.id)
         if not bot_member.guild_permissions.administrator:
@@ -31479,9 +35373,13 @@ class BackupSystem(commands.Cog):
                                     )
                                 )
 
-                            if "messages" in chan_data:
+                            if "messages" in chan_data or (zip_ref and chan_data.get("id")):
+                                if "messages" in chan_data:
+                                    messages = reversed(chan_data["messages"])
+                                else:
+                                    messages = BackupStore.iter_archive(zip_ref, chan_data["id"])
                                 webhook = await channel.create_webhook(name="RestoreBot")
-                                for msg_data in reversed(chan_data["messages"]):
+                                for msg_data in messages:
                                     try:
                                         await webhook.send(
                                         content=msg_data["content"],
@@ -31522,22 +35420,21 @@ class BackupSystem(commands.Cog):
                 continue
 
         await progress_msg.edit(content="🔄 Restoring emojis...")
-        async with aiohttp.ClientSession() as session:
-            total_emojis = len(backup_data["emojis"])
-            for emoji_index, emoji_data in enumerate(backup_data["emojis"], 1):
-                try:
-                    async with session.get(emoji_data["url"]) as resp:
-                        if resp.status == 200:
-                            emoji_bytes = await resp.read()
-                            await ctx.guild.create_custom_emoji(
-                            name=emoji_data["name"],
-                            image=emoji_bytes
-                        )
-                    if emoji_index % 5 == 0:
-                        await progress_msg.edit(content=f"🔄 Restoring emojis... ({emoji_index}/{total_emojis})")
-                    await asyncio.sleep(0.5)
-                except Exception as e:
-                    print(f"Error restoring emoji {emoji_data['name']}: {e}")
+        total_emojis = len(backup_data["emojis"])
+        for emoji_index, emoji_data in enumerate(backup_data["emojis"], 1):
+            try:
+                async with self.bot.http_client.get(emoji_data["url"]) as resp:
+                    if resp.status == 200:
+                        emoji_bytes = await resp.read()
+                        await ctx.guild.create_custom_emoji(
+                        name=emoji_data["name"],
+                        image=emoji_bytes
+                    )
+                if emoji_index % 5 == 0:
+                    await progress_msg.edit(content=f"🔄 Restoring emojis... ({emoji_index}/{total_emojis})")
+                await asyncio.sleep(0.5)
+            except Exception as e:
+                print(f"Error restoring emoji {emoji_data['name']}: {e}")
 
         await progress_msg.edit(content="🔄 Restoring webhooks...")
         for webhook_data in backup_data["webhooks"]:
@@ -31552,6 +35449,10 @@ class BackupSystem(commands.Cog):
             except Exception as e:
                 print(f"Error restoring webhook {webhook_data['name']}: {e}")
 
+        if zip_ref:
+            zip_ref.close()
+            archive.close()
+
         embed = EmbedBuilder(
         "✅ Restoration Complete",
         "Server has been restored from backup"
@@ -31766,6 +35667,7 @@ class ModerationCommands(commands.Cog):
         self.ban_appeal_info = {}
         self.data_file = "moderation_data.json"
         self.load_data()
+        self.bot.bulk_jobs.register('massrole', self.massrole_batches, self.massrole_apply, self.massrole_estimate, "Mass Role")
         
 
     def load_data(self):
@@ -31954,16 +35856,80 @@ class ModerationCommands(commands.Cog):
 
     @commands.command()
     @commands.has_permissions(administrator=True)
-    async def massrole(self, ctx, role: discord.Role):
+    async def massrole(self, ctx, role: discord.Role, mode: str = None):
         
-        for member in ctx.guild.members:
-            await member.add_roles(role)
-    
+        params = {"role_id": role.id, "reason": f"Mass role by {ctx.author}"}
+        if mode and mode.lower() in ("dry", "dryrun", "estimate"):
+            estimate = await self.bot.bulk_jobs.estimate('massrole', ctx.guild, params)
+            embed = EmbedBuilder(
+            "🧮 Mass Role Estimate",
+            f"{role.mention} would be added to **{estimate['items']}** members\n"
+            f"Estimated time: **~{humanize.naturaldelta(estimate['seconds'])}**"
+        ).set_color(discord.Color.blue()).build()
+            await ctx.send(embed=embed)
+            return
+
+        await self.bot.bulk_jobs.submit('massrole', ctx.guild, params, status_channel=ctx.channel)
+
+    def massrole_targets(self, guild, role, after=0):
+        return sorted(member.id for member in guild.members if member.id > after and role not in member.roles)
+
+    async def massrole_estimate(self, guild, params):
+        role = guild.get_role(params["role_id"])
+        count = len(self.massrole_targets(guild, role)) if role else 0
+        return count, count
+
+    async def massrole_batches(self, guild, job):
+        role = guild.get_role(job["params"]["role_id"])
+        if not role:
+            raise ValueError("The role no longer exists")
+        # Sorted ids make the last id of a batch a resumable cursor
+        targets = self.massrole_targets(guild, role, job["cursor"])
+        size = self.bot.bulk_jobs.concurrency
+        for i in range(0, len(targets), size):
+            batch = targets[i:i + size]
+            yield batch[-1], batch
+
+    async def massrole_apply(self, guild, job, member_ids):
+        role = guild.get_role(job["params"]["role_id"])
+
+        async def add_role(member_id):
+            member = guild.get_member(member_id)
+            if member and role not in member.roles:
+                await member.add_roles(role, reason=job["params"]["reason"])
+
+        return await self.bot.bulk_jobs.each(job, member_ids, add_role)
+
+    @commands.group(name="bulkjobs", invoke_without_command=True)
+    @commands.has_permissions(administrator=True)
+    async def bulkjobs(self, ctx):
+        
+        jobs = [job for job in self.bot.bulk_jobs.jobs.values() if job["guild_id"] == ctx.guild.id]
+        if not jobs:
+            await ctx.send("No bulk jobs have run on this server since the bot started.")
+            return
+
         embed = EmbedBuilder(
-        "✅ Mass Role Added",
-        f"Added {role.mention} to all members"
-    ).set_color(discord.Color.blue()).build()
-        await ctx.send(embed=embed)
+        "⚙️ Bulk Jobs",
+        f"{sum(job['status'] == 'running' for job in jobs)} running"
+    ).set_color(discord.Color.blue())
+        for job in sorted(jobs, key=lambda job: job["created_at"], reverse=True)[:10]:
+            embed.add_field(
+                f"{job['id']} • {job['kind']}",
+                f"**{job['status']}** | {job['done'] + job['failed']}/{job['total']} | Failed: {job['failed']}",
+                inline=False
+            )
+        await ctx.send(embed=embed.build())
+
+    @bulkjobs.command(name="cancel")
+    @commands.has_permissions(administrator=True)
+    async def bulkjobs_cancel(self, ctx, job_id: str):
+        
+        job = self.bot.bulk_jobs.jobs.get(job_id)
+        if not job or job["guild_id"] != ctx.guild.id or not await self.bot.bulk_jobs.cancel(job_id):
+            await ctx.send(f"❌ No running bulk job `{job_id}` on this server.")
+            return
+        await ctx.send(f"🛑 Cancelling bulk job `{job_id}` after its current batch.")
 
     @commands.command()
     async def servericon(self, ctx):
@@ -32749,19 +36715,198 @@ class OwnerOnly(commands.Cog):
             "Detailed statistics and information"
         ).set_color(discord.Color.blue())
 
-        total_users = sum(g.member_count for g in self.bot.guilds)
-        total_channels = sum(len(g.channels) for g in self.bot.guilds)
+        totals = await self.bot.cluster_stats()
         uptime = timedelta(seconds=int(time.time() - self.bot.start_time))
 
-        embed.add_field("Servers", str(len(self.bot.guilds)))
-        embed.add_field("Users", str(total_users))
-        embed.add_field("Channels", str(total_channels))
+        embed.add_field("Servers", str(totals["guilds"]))
+        embed.add_field("Users", str(totals["members"]))
+        embed.add_field("Channels", str(totals["channels"]))
         embed.add_field("Bot Latency", f"{round(self.bot.latency * 1000)}ms")
         embed.add_field("Uptime", str(uptime))
         embed.add_field("Python Version", platform.python_version())
 
         await ctx.send(embed=embed.build())
 
+    @commands.command(name='dispatchstats')
+    async def dispatch_stats(self, ctx):
+        
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        dispatcher = self.bot.message_dispatcher
+        embed = EmbedBuilder(
+            "📨 Message Dispatcher",
+            f"Messages classified: **{dispatcher.messages_seen}**\n"
+            f"Registered handlers: **{len(dispatcher.handlers)}**"
+        ).set_color(discord.Color.blue())
+
+        ranked = sorted(dispatcher.stats.items(), key=lambda item: item[1]["total_time"], reverse=True)
+        for name, stats in ranked[:15]:
+            avg_ms = (stats["total_time"] / stats["calls"] * 1000) if stats["calls"] else 0
+            embed.add_field(
+                name,
+                f"Calls: {stats['calls']} | Skipped: {stats['skipped']}\n"
+                f"Avg: {avg_ms:.2f}ms | Max: {stats['max_time'] * 1000:.2f}ms\n"
+                f"Errors: {stats['errors']}"
+            )
+
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name='analyticsdb')
+    async def analytics_db_stats(self, ctx, action: str = None):
+        
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        analytics_db = self.bot.analytics_db
+        compacted = None
+        if action == "compact":
+            compacted = await analytics_db.compact()
+
+        embed = EmbedBuilder(
+            "🗄️ Analytics Writer",
+            f"Events recorded: **{analytics_db.recorded_events}**\n"
+            f"Rows upserted: **{analytics_db.flushed_rows}**\n"
+            f"Pending (user, guild, hour) keys: **{len(analytics_db.pending)}**"
+        ).set_color(discord.Color.blue())
+        if analytics_db.flushed_rows:
+            embed.add_field("Aggregation", f"{analytics_db.recorded_events / analytics_db.flushed_rows:.1f} events per row")
+        embed.add_field("Hourly Retention", f"{analytics_db.hourly_retention_days} days")
+        if compacted is not None:
+            embed.add_field("Compacted", f"{compacted} hourly rows folded into daily rows")
+
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name='dbpools')
+    async def database_pools(self, ctx):
+
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        pools = self.bot.databases.pools
+        embed = EmbedBuilder(
+            "🗄️ Database Pools",
+            f"Open databases: **{sum(1 for pool in pools.values() if pool.writer)}/{len(pools)}**"
+        ).set_color(discord.Color.blue())
+        for path, pool in sorted(pools.items()):
+            stats = pool.stats
+            embed.add_field(
+                os.path.basename(path),
+                f"Readers: {pool.reader_count} | Reads: {stats['reads']} | Writes: {stats['writes']}\n"
+                f"Migrations applied: {stats['migrations']} | Imported rows: {stats['imported_rows']}",
+                inline=False
+            )
+
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name='httpstats')
+    async def http_stats(self, ctx):
+
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        http_client = self.bot.http_client
+        hosts = sorted(http_client.metrics.items(), key=lambda item: item[1]['requests'], reverse=True)
+        embed = EmbedBuilder(
+            "🌐 HTTP Client",
+            f"Connections: **{http_client.limit}** max, **{http_client.limit_per_host}** per host\n"
+            f"Requests: **{sum(stats['requests'] for _, stats in hosts)}** across **{len(hosts)}** hosts"
+        ).set_color(discord.Color.blue())
+        for host, stats in hosts[:10]:
+            average = stats['total_ms'] / max(stats['requests'], 1)
+            embed.add_field(
+                host,
+                f"Requests: {stats['requests']} | Errors: {stats['errors']} | Retries: {stats['retries']}\n"
+                f"Avg: {average:.0f}ms | Max: {stats['max_ms']:.0f}ms",
+                inline=False
+            )
+        scans = self.bot.history_scanner.stats
+        embed.add_field(
+            "History scans",
+            f"Scans: {scans['scans']} | Channels: {scans['channels']} | Pages: {scans['pages']}\n"
+            f"Messages: {scans['messages']} | Last rate: {scans['last_rate']:.0f} msg/s",
+            inline=False
+        )
+
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name='schedstats')
+    async def sched_stats(self, ctx):
+
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        scheduler = self.bot.scheduler
+        kinds = {}
+        for job in scheduler.jobs.values():
+            kinds[job['kind']] = kinds.get(job['kind'], 0) + 1
+        upcoming = min((job['run_at'] for job in scheduler.jobs.values()), default=None)
+        stats = scheduler.stats
+        embed = EmbedBuilder(
+            "⏱️ Scheduler",
+            f"Pending: **{len(scheduler.jobs)}** | Heap: **{len(scheduler.heap)}** | Running: **{len(scheduler.running)}**\n"
+            f"Next: {f'<t:{int(upcoming)}:R>' if upcoming else 'none'}"
+        ).set_color(discord.Color.blue())
+        embed.add_field(
+            "Totals",
+            f"Scheduled: {stats['scheduled']} | Fired: {stats['fired']} | Failed: {stats['failed']} | Cancelled: {stats['cancelled']}\n"
+            f"Max lateness: {stats['max_late_ms']:.0f}ms",
+            inline=False
+        )
+        for kind, count in sorted(kinds.items()):
+            embed.add_field(kind, str(count))
+
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name='startupstats')
+    async def startup_stats(self, ctx):
+
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        timings = self.bot.cog_timings
+        lazy_loaded = [name for name, timing in timings.items() if timing["lazy"]]
+        embed = EmbedBuilder(
+            "🚀 Startup",
+            f"Cogs: **{len(timings)}** in **{self.bot.startup_seconds or 0:.2f}s** | "
+            f"Waiting for first use: **{len(self.bot.lazy_cogs)}** | Activated lazily: **{len(lazy_loaded)}**"
+        ).set_color(discord.Color.blue())
+        slowest = sorted(timings.items(), key=lambda item: item[1]["init"] + item[1]["load"], reverse=True)[:10]
+        for name, timing in slowest:
+            embed.add_field(name, f"init {timing['init']:.0f}ms | load {timing['load']:.0f}ms{' | lazy' if timing['lazy'] else ''}")
+        if self.bot.lazy_cogs:
+            embed.add_field("Not loaded yet", ", ".join(sorted(self.bot.lazy_cogs))[:1024], inline=False)
+
+        await ctx.send(embed=embed.build())
+
+    @commands.command(name='clusterstats')
+    async def cluster_stats(self, ctx):
+        
+        if not self.is_owner(ctx):
+            return await ctx.send("❌ You are not authorized to use this command.")
+
+        layout = self.bot.shard_layout
+        totals = await self.bot.cluster_stats()
+        embed = EmbedBuilder(
+            "🧩 Shard Layout",
+            f"Mode: **{layout.mode}** | Shards: **{layout.shard_count or len(getattr(self.bot, 'shards', {})) or 1}**\n"
+            f"Servers: **{totals['guilds']}** | Users: **{totals['members']}**"
+        ).set_color(discord.Color.blue())
+
+        for cluster_id, stats in sorted(totals["clusters"].items()):
+            if not stats:
+                embed.add_field(f"Cluster {cluster_id}", "No response")
+                continue
+            latency = f"{stats['latency']}ms" if stats["latency"] is not None else "n/a"
+            embed.add_field(
+                f"Cluster {cluster_id}",
+                f"Shards: {', '.join(map(str, stats['shards']))}\n"
+                f"Servers: {stats['guilds']} | Users: {stats['members']}\n"
+                f"Latency: {latency} | Uptime: {timedelta(seconds=int(stats['uptime']))}"
+            )
+
+        await ctx.send(embed=embed.build())
+
     @commands.command()
     async def leaveserver(self, ctx, guild_id: int, *, reason: str = "No reason provided"):
         
@@ -34888,10 +39033,112 @@ class ReadabilityButton(discord.ui.Button):
             ephemeral=True
         )
 
+class BannedWordMatcher:
+    """Matches the whole banned-word list in a single regex pass.
+
+    Words are kept in a character trie that is rendered into one prefix-factored
+    pattern wrapped in ``\\b...\\b``, so a message is scanned once regardless of how
+    many words are banned, with the same boundary rules as one ``\\bword\\b`` regex
+    per word. Adding a word only inserts into the trie and recompiles the pattern.
+    """
+
+    def __init__(self, words=()):
+        self.trie = {}
+        self.words = set()
+        self.pattern = None
+        for word in words:
+            self._insert(word)
+        self._compile()
+
+    def _insert(self, word):
+        word = word.lower()
+        if not word or word in self.words:
+            return False
+        node = self.trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+        self.words.add(word)
+        return True
+
+    def _render(self, node):
+        branches = [re.escape(char) + self._render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        group = '(?:' + '|'.join(branches) + ')'
+        return group + '?' if '' in node else group
+
+    def _compile(self):
+        body = self._render(self.trie)
+        self.pattern = re.compile(rf'\b{body}\b', re.IGNORECASE) if body else None
+
+    def add(self, word):
+        if self._insert(word):
+            self._compile()
+
+    def remove(self, word):
+        word = word.lower()
+        if word in self.words:
+            self.rebuild(self.words - {word})
+
+    def rebuild(self, words):
+        self.trie = {}
+        self.words = set()
+        for word in words:
+            self._insert(word)
+        self._compile()
+
+    def search(self, text):
+        if self.pattern is None:
+            return None
+        match = self.pattern.search(text)
+        return match.group(0).lower() if match else None
+
+    @staticmethod
+    def build_benchmark_corpus(words, size=10000, hit_rate=0.02):
+        filler = ("hey", "what's", "up", "gg", "anyone", "playing", "tonight", "lol", "check",
+                  "this", "out", "nice", "build", "server", "update", "when", "is", "the", "event")
+        rng = random.Random(1337)
+        word_list = sorted(words)
+        corpus = []
+        for _ in range(size):
+            parts = rng.choices(filler, k=rng.randint(3, 25))
+            if word_list and rng.random() < hit_rate:
+                parts.insert(rng.randrange(len(parts) + 1), rng.choice(word_list))
+            corpus.append(" ".join(parts))
+        return corpus
+
+    def benchmark(self, corpus):
+        legacy = {word: re.compile(rf'\b{re.escape(word)}\b', re.IGNORECASE) for word in self.words}
+
+        started = time.perf_counter()
+        legacy_hits = 0
+        for content in corpus:
+            for word, pattern in legacy.items():
+                if pattern.search(content):
+                    legacy_hits += 1
+                    break
+        legacy_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        matcher_hits = sum(1 for content in corpus if self.search(content))
+        matcher_time = time.perf_counter() - started
+
+        return {
+            "messages": len(corpus),
+            "words": len(self.words),
+            "legacy_time": legacy_time,
+            "legacy_hits": legacy_hits,
+            "matcher_time": matcher_time,
+            "matcher_hits": matcher_hits,
+        }
+
+
 class AutoMod(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.spam_check = {}  
         self.caps_threshold = 0.7  
         self.spam_threshold = 5  
         self.spam_interval = 5  
@@ -34903,7 +39150,7 @@ class AutoMod(commands.Cog):
         self.caps_enabled = True
         self.badwords_enabled = True
 
-        self.banned_regex = {word: re.compile(rf'\b{re.escape(word)}\b', re.IGNORECASE) for word in self.banned_words}
+        self.banned_matcher = BannedWordMatcher(self.banned_words)
 
 
     @commands.command()
@@ -35351,22 +39598,17 @@ class AutoMod(commands.Cog):
                     content_to_check.append(field.value.lower())
 
         for content in content_to_check:
-            for word, pattern in self.banned_regex.items():
-                if pattern.search(content):
-                    await asyncio.sleep(1)  
-                    await message.delete()
-                    if not message.webhook_id:
-                        await self.send_warning(message.channel, message.author, "banned_words")
-                    return True
+            if self.banned_matcher.search(content):
+                await asyncio.sleep(1)  
+                await message.delete()
+                if not message.webhook_id:
+                    await self.send_warning(message.channel, message.author, "banned_words")
+                return True
         return False
 
         
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.GUILD | MessageTraits.HUMAN, background=True)
     async def on_message(self, message):
-   
-        if isinstance(message.channel, discord.DMChannel):
-            return
-
         await self.check_message(message)
 
     async def check_message(self, message):
@@ -35394,20 +39636,10 @@ class AutoMod(commands.Cog):
         if not isinstance(message.author, discord.Member):
             return False
             
-        author_id = message.author.id
-        current_time = time.time()
-
-        if author_id not in self.spam_check:
-            self.spam_check[author_id] = {"messages": 1, "last_message": current_time}
-            return False
-
-        if current_time - self.spam_check[author_id]["last_message"] > 5:
-            self.spam_check[author_id] = {"messages": 1, "last_message": current_time}
-            return False
-
-        self.spam_check[author_id]["messages"] += 1
+        recent = self.bot.rate_windows.hit(message.guild.id, message.author.id, "automod_spam", self.spam_interval)
         
-        if self.spam_check[author_id]["messages"] >= 5:
+        if recent >= self.spam_threshold:
+            self.bot.rate_windows.reset(message.guild.id, message.author.id, "automod_spam")
             try:
                 await message.author.timeout(duration=timedelta(minutes=self.spam_timeout_minutes), reason="Spam detection")
                 await self.send_warning(message.channel, message.author, "spam")
@@ -35416,7 +39648,6 @@ class AutoMod(commands.Cog):
                 await message.channel.send("⚠️ Unable to timeout user - missing permissions.")
                 return False
 
-        self.spam_check[author_id]["last_message"] = current_time
         return False
 
 
@@ -35590,7 +39821,7 @@ class AutoMod(commands.Cog):
 
         try:
             if setting == 'spam_threshold':
-                self.spam_check = {}
+                self.bot.rate_windows.reset(action="automod_spam")
                 self.spam_threshold = int(value)
                 self.spam_timeout_minutes = timeout_minutes
 
@@ -35602,6 +39833,7 @@ class AutoMod(commands.Cog):
             elif setting in ['add_banned_word', 'add_whitelist']:
                 if setting == 'add_banned_word':
                     self.banned_words.add(value.lower())
+                    self.banned_matcher.add(value)
                 else:
                     self.link_whitelist.add(value.lower())
                 embed = EmbedBuilder(
@@ -35620,6 +39852,26 @@ class AutoMod(commands.Cog):
             await ctx.send("Invalid value format!")
 
 
+    @commands.command(name="automodbench")
+    @commands.is_owner()
+    async def automod_benchmark(self, ctx, messages: int = 1000):
+        
+        # The legacy loop holds the GIL for the whole run, so keep it short on a live bot
+        messages = max(100, min(messages, 2000))
+        corpus = BannedWordMatcher.build_benchmark_corpus(self.banned_matcher.words, messages)
+        async with ctx.typing():
+            results = await asyncio.to_thread(self.banned_matcher.benchmark, corpus)
+
+        speedup = results["legacy_time"] / results["matcher_time"] if results["matcher_time"] else 0
+        embed = EmbedBuilder(
+            "⏱️ Banned Word Matcher Benchmark",
+            f"{results['messages']} messages against {results['words']} banned words"
+        ).set_color(discord.Color.blue())
+        embed.add_field("Per-word Regex Loop", f"{results['legacy_time'] * 1000:.1f}ms\nHits: {results['legacy_hits']}")
+        embed.add_field("Compiled Matcher", f"{results['matcher_time'] * 1000:.1f}ms\nHits: {results['matcher_hits']}")
+        embed.add_field("Speedup", f"{speedup:.1f}x", inline=False)
+        await ctx.send(embed=embed.build())
+
     @commands.command()
     @commands.has_permissions(administrator=True)
     async def togglecaps(self, ctx):
@@ -37503,11 +41755,8 @@ class UserTracker(commands.Cog):
         self.bot = bot
         self.user_activity = {}
 
-    @commands.Cog.listener()
+    @message_listener(MessageTraits.HUMAN)
     async def on_message(self, message):
-        if message.author.bot:
-            return
-
         user_id = message.author.id
         if user_id not in self.user_activity:
             self.user_activity[user_id] = {
@@ -37558,17 +41807,18 @@ if __name__ == "__main__":
             logging.FileHandler('bot.log')
         ]
     )
-    @bot.event
-    async def on_message(message):
-        await bot.webhook_logger.log_message(message)
-        await bot.process_commands(message)
-
     @bot.event 
     async def on_command(ctx):
         await bot.webhook_logger.log_command(ctx)
 
+    replay_path = os.getenv('GATEWAY_REPLAY', '').split('#')[0].strip()
     try:
-        bot.run(TOKEN)
+        if replay_path and replay_path.lower() != 'none':
+            asyncio.run(bot.gateway_recorder.run_offline(replay_path, speed=float(os.getenv('GATEWAY_REPLAY_SPEED', '0'))))
+        elif SHARD_LAYOUT.is_launcher:
+            asyncio.run(ClusterLauncher(SHARD_LAYOUT, TOKEN).run())
+        else:
+            bot.run(TOKEN)
     except discord.LoginFailure:
         logging.error("Invalid token provided")
     except Exception as e:
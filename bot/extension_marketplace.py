@@ -1,7 +1,6 @@
 
 import discord
 from discord.ext import commands
-import aiohttp
 import json
 import os
 import asyncio
@@ -24,20 +23,19 @@ class ExtensionMarketplace(commands.Cog):
         if not force_refresh and self.cache_time and (datetime.now() - self.cache_time).seconds < self.cache_duration:
             return self.cache
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.api_url, timeout=30) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data.get('success'):
-                            self.cache = data
-                            self.cache_time = datetime.now()
-                            return data
-                        else:
-                            logger.error("API returned success: false")
-                            return None
+            async with self.bot.http_client.get(self.api_url, timeout=30) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    if data.get('success'):
+                        self.cache = data
+                        self.cache_time = datetime.now()
+                        return data
                     else:
-                        logger.error(f"API request failed with status {response.status}")
+                        logger.error("API returned success: false")
                         return None
+                else:
+                    logger.error(f"API request failed with status {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Error fetching extensions: {e}")
             return None
@@ -50,24 +48,23 @@ class ExtensionMarketplace(commands.Cog):
                 extension_id = extension_data['id']
                 download_url = f"https://zygnalbot.de/download_extension.php?id={extension_id}"
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(download_url, timeout=60) as response:
-                    if response.status == 200:
-                        content = await response.text()
-                        filename = f"{extension_data['title'].replace(' ', '_').lower()}.{extension_data['fileType']}"
-                        filename = re.sub(r'[^\w\-_\.]', '', filename)
-                        filepath = os.path.join(self.extensions_folder, filename)
+            async with self.bot.http_client.get(download_url, timeout=60) as response:
+                if response.status == 200:
+                    content = await response.text()
+                    filename = f"{extension_data['title'].replace(' ', '_').lower()}.{extension_data['fileType']}"
+                    filename = re.sub(r'[^\w\-_\.]', '', filename)
+                    filepath = os.path.join(self.extensions_folder, filename)
                         
-                        if not os.path.exists(self.extensions_folder):
-                            os.makedirs(self.extensions_folder)
+                    if not os.path.exists(self.extensions_folder):
+                        os.makedirs(self.extensions_folder)
                         
-                        with open(filepath, 'w', encoding='utf-8') as f:
-                            f.write(content)
+                    with open(filepath, 'w', encoding='utf-8') as f:
+                        f.write(content)
                         
-                        return filepath
-                    else:
-                        logger.error(f"Download failed with status {response.status}")
-                        return None
+                    return filepath
+                else:
+                    logger.error(f"Download failed with status {response.status}")
+                    return None
         except Exception as e:
             logger.error(f"Error downloading extension: {e}")
             return None
@@ -1,6 +1,5 @@
 import discord
 from discord.ext import commands
-import aiohttp
 import json
 import os
 from datetime import datetime, timedelta
@@ -52,18 +51,17 @@ class UpdateChecker(commands.Cog):
             return False
             
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.update_url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        self.latest_version = data.get('version')
-                        self.download_url = data.get('download_url', self.download_url)
-                        self.last_check = datetime.now()
-                        self.save_config()
-                        return True
-                    else:
-                        print(f"Update check failed with status {response.status}")
-                        return False
+            async with self.bot.http_client.get(self.update_url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    self.latest_version = data.get('version')
+                    self.download_url = data.get('download_url', self.download_url)
+                    self.last_check = datetime.now()
+                    self.save_config()
+                    return True
+                else:
+                    print(f"Update check failed with status {response.status}")
+                    return False
         except Exception as e:
             print(f"Error checking for updates: {e}")
             return False